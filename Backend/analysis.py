@@ -0,0 +1,118 @@
+"""
+Named analyses of an article's abstract, with prompt templates kept server-side.
+
+GET /articles/{id}/insights and GET /articles/{id}/risks read the abstract
+from the database, fill in the template and ask the model. Articles without an
+abstract are analyzed from their stored page text (scraped_pages, filled by
+scrape jobs and pmc_xml.py) instead. Each result is stored in
+article_analyses, keyed by (article, kind, template version), and served from
+there on later requests. A stored result is reused only while the source text
+is unchanged, because its sha256 is stored too. Changing a template's
+wording must come with a new version so earlier results are not served for it.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from crud import get_abstract, get_article_analysis, get_scraped_page_by_article, save_article_analysis
+from llm_admission import INTERACTIVE
+from metrics import record_cache
+from sections import sections_text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AnalysisTemplate:
+    version: str
+    system: str
+    max_tokens: int = 512
+    temperature: float = 0.3
+
+    def messages(self, abstract: str):
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": abstract},
+        ]
+
+
+ANALYSIS_TEMPLATES: Dict[str, AnalysisTemplate] = {
+    "insights": AnalysisTemplate(
+        version="1",
+        system="You are an expert in obtaining insights and key words.",
+    ),
+    "risks": AnalysisTemplate(
+        version="1",
+        system=(
+            "You are an expert at identifying risks and proposing practical mitigations from a scientific abstract. "
+            "Respond concisely in Markdown with two sections:\n\n## Risks\n- bullet list\n\n## Mitigations\n- bullet list"
+        ),
+    ),
+}
+
+
+class AbstractNotFound(Exception):
+    """The article has neither an abstract nor stored page text to analyze."""
+
+
+def source_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def source_text(db: Session, article_id: int) -> Optional[str]:
+    """The article's abstract, else the text of its stored page, else None."""
+    abstract = get_abstract(db, article_id=article_id)
+    if abstract is not None and (abstract.abstract or "").strip():
+        return abstract.abstract
+    page = get_scraped_page_by_article(db, article_id)
+    if page is None:
+        return None
+    text = sections_text(page.sections) if page.sections else page.text
+    return text if (text or "").strip() else None
+
+
+async def analyze_article(
+    db: Session,
+    processor,
+    article_id: int,
+    kind: str,
+    client: str = "anonymous",
+    refresh: bool = False,
+) -> Tuple[str, bool]:
+    """Return (content, cached) for the `kind` analysis of an article.
+
+    Raises AbstractNotFound, AdmissionRejected, or the model server error
+    (failed generations are not stored).
+    """
+    template = ANALYSIS_TEMPLATES[kind]
+    text = source_text(db, article_id)
+    if text is None:
+        raise AbstractNotFound(f"Article {article_id} has no abstract or stored page text")
+    digest = source_hash(text)
+
+    stored = None if refresh else get_article_analysis(db, article_id, kind, template.version)
+    hit = stored is not None and stored.source_hash == digest
+    record_cache("article_analysis", hit)
+    if hit:
+        return stored.content, True
+
+    content = await processor.chat(
+        messages=template.messages(text),
+        max_tokens=template.max_tokens,
+        temperature=template.temperature,
+        priority=INTERACTIVE,
+        client=client,
+        raise_errors=True,
+    )
+    try:
+        save_article_analysis(db, article_id, kind, template.version, digest, content, model=processor.model)
+    except SQLAlchemyError as e:
+        # A concurrent request may have stored the same analysis first
+        db.rollback()
+        logger.warning("Could not store %s analysis of article %s: %s", kind, article_id, e)
+    return content, False
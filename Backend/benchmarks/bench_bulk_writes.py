@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compare single-item and bulk article writes through the API.
+
+Runs against the database configured by DATABASE_URL (use a scratch database),
+creates N articles one request at a time and N more with one POST /articles/bulk,
+then removes everything it created.
+
+    python benchmarks/bench_bulk_writes.py --items 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def main_bench() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single vs bulk article inserts")
+    parser.add_argument("--items", type=int, default=1000, help="Number of articles per run")
+    args = parser.parse_args()
+
+    client = TestClient(main.app)
+    payloads = [
+        {"title": f"Benchmark article {i}", "link": f"https://example.org/bench/{i}"}
+        for i in range(args.items)
+    ]
+    created_ids = []
+
+    start = time.perf_counter()
+    for payload in payloads:
+        created_ids.append(client.post("/articles/", json=payload).json()["id"])
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = client.post("/articles/bulk", json=payloads).json()
+    bulk_seconds = time.perf_counter() - start
+    created_ids.extend(r["id"] for r in results if r["status"] == "created")
+
+    client.post("/articles/bulk/delete", json={"ids": created_ids})
+
+    print(f"items:            {args.items}")
+    print(f"single endpoint:  {single_seconds:.3f}s ({args.items / single_seconds:,.0f} rows/s)")
+    print(f"bulk endpoint:    {bulk_seconds:.3f}s ({args.items / bulk_seconds:,.0f} rows/s)")
+    print(f"speedup:          {single_seconds / bulk_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Articles per minute from JATS XML (pmc_xml.py) versus browser scraping.
+
+Generates --articles synthetic JATS articles, PMC-sized, with sections,
+subsections, figures and a reference list. They are packed into one .tar.gz
+like the PMC OA bulk packages. The benchmark times pmc_xml parsing the
+package, and with --store also writing to the database in DATABASE_URL (a
+scratch database created with create_table.py --schema-only: rows are added to
+articles, abstracts and scraped_pages).
+With --scrape-pages it also times WebScraper on as many fixture pages
+(fixture_site.py), which needs playwright.
+
+    python benchmarks/bench_pmc_xml.py --articles 5000 --store --scrape-pages 50
+"""
+
+import argparse
+import asyncio
+import html
+import io
+import os
+import random
+import sys
+import tarfile
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import pmc_xml
+from fixture_site import start_fixture_site
+from synthetic import make_abstract, make_title
+
+SECTIONS = ["Introduction", "Materials and Methods", "Results", "Discussion", "Conclusions"]
+
+
+def render_jats(number: int, paragraphs: int, references: int) -> str:
+    rng = random.Random(number)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<!DOCTYPE article PUBLIC "-//NLM//DTD JATS (Z39.96) Journal Archiving and Interchange DTD v1.2 20190208//EN" '
+        '"JATS-archivearticle1-mathml3.dtd">',
+        '<article xmlns:xlink="http://www.w3.org/1999/xlink"><front><article-meta>',
+        f'<article-id pub-id-type="pmc">PMC{number}</article-id>',
+        f"<title-group><article-title>{html.escape(make_title(rng))}</article-title></title-group>",
+        f"<abstract><p>{html.escape(make_abstract(rng))}</p></abstract>",
+        "</article-meta></front><body>",
+    ]
+    for index, name in enumerate(SECTIONS, 1):
+        parts.append(f'<sec id="s{index}"><title>{index}. {name}</title>')
+        for paragraph in range(paragraphs):
+            if paragraph == paragraphs // 2:
+                parts.append(f"<sec><title>{index}.1. {html.escape(make_title(rng))}</title>")
+            parts.append(f'<p>{html.escape(make_abstract(rng))} [<xref ref-type="bibr" rid="r1">1</xref>]&nbsp;</p>')
+        parts.append("</sec>")
+        parts.append(f'<fig id="f{index}"><label>Figure {index}</label><caption><p>{html.escape(make_abstract(rng))}</p></caption></fig>')
+        parts.append("</sec>")
+    parts.append("</body><back><ref-list>")
+    for ref in range(1, references + 1):
+        parts.append(
+            f'<ref id="r{ref}"><label>{ref}.</label><element-citation><person-group><name><surname>Doe</surname>'
+            f"<given-names>J</given-names></name></person-group><article-title>{html.escape(make_title(rng))}</article-title>"
+            f"<source>Life Sci Space Res</source><year>2020</year></element-citation></ref>"
+        )
+    parts.append("</ref-list></back></article>")
+    return "".join(parts)
+
+
+def write_package(path: str, articles: int, paragraphs: int, references: int) -> int:
+    size = 0
+    with tarfile.open(path, "w:gz") as archive:
+        for number in range(1, articles + 1):
+            data = render_jats(2000000 + number, paragraphs, references).encode("utf-8")
+            size += len(data)
+            info = tarfile.TarInfo(f"oa_package/PMC{2000000 + number}.nxml")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return size
+
+
+def parse_only(path: str) -> int:
+    parsed = 0
+    for _, f in pmc_xml.iter_dump(path):
+        for _ in pmc_xml.iter_articles(f):
+            parsed += 1
+    return parsed
+
+
+def scrape_fixture_pages(pages: int, concurrency: int) -> float:
+    """Seconds WebScraper takes for `pages` fixture pages, or None without playwright."""
+    try:
+        from webScrapper import WebScraper
+    except ImportError as e:
+        print(f"scraping skipped: {e}")
+        return None
+    site = start_fixture_site()
+    urls = [site.article_url(1000000 + i) for i in range(1, pages + 1)]
+
+    async def scrape_all():
+        scraper = WebScraper()
+        await scraper.setup()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def scrape(url):
+            async with semaphore:
+                await scraper.scrape_page(url)
+
+        try:
+            await asyncio.gather(*(scrape(url) for url in urls))
+        finally:
+            await scraper.close()
+
+    try:
+        start = time.perf_counter()
+        asyncio.run(scrape_all())
+        return time.perf_counter() - start
+    except Exception as e:
+        print(f"scraping skipped: {e}")
+        return None
+    finally:
+        site.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JATS XML ingestion against browser scraping")
+    parser.add_argument("--articles", type=int, default=2000, help="Synthetic JATS articles in the package")
+    parser.add_argument("--paragraphs", type=int, default=6, help="Paragraphs per section")
+    parser.add_argument("--references", type=int, default=40, help="References per article")
+    parser.add_argument("--store", action="store_true", help="Also time writing to DATABASE_URL")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--scrape-pages", type=int, default=0, help="Also time WebScraper on this many fixture pages")
+    parser.add_argument("--scrape-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        package = os.path.join(tmp, "oa_package.tar.gz")
+        size = write_package(package, args.articles, args.paragraphs, args.references)
+        print(f"package: {args.articles:,} articles, {size / 1e6:.1f} MB XML, {os.path.getsize(package) / 1e6:.1f} MB gzipped")
+
+        start = time.perf_counter()
+        parsed = parse_only(package)
+        seconds = time.perf_counter() - start
+        print(f"parse:          {parsed / seconds * 60:>10,.0f} articles/min ({seconds:.2f}s)")
+
+        if args.store:
+            totals = pmc_xml.ingest([package], batch_size=args.batch_size)
+            print(f"parse + store:  {totals['parsed'] / totals['seconds'] * 60:>10,.0f} articles/min ({totals['seconds']:.2f}s)")
+
+    if args.scrape_pages:
+        seconds = scrape_fixture_pages(args.scrape_pages, args.scrape_concurrency)
+        if seconds:
+            print(f"WebScraper:     {args.scrape_pages / seconds * 60:>10,.0f} pages/min ({seconds:.2f}s, local fixture pages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Show connection pool saturation under increasing concurrency.
+
+Each worker thread repeatedly checks out a session, runs a query and holds the
+connection for --hold-ms (simulating request work), for --duration seconds.
+Concurrency steps past DB_POOL_SIZE and DB_POOL_SIZE + DB_MAX_OVERFLOW so the
+checkout wait, overflow and timeout columns show where the pool saturates.
+
+    DB_POOL_SIZE=5 DB_MAX_OVERFLOW=5 DB_POOL_TIMEOUT=2 python benchmarks/bench_pool.py
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from config import DB_POOL_SIZE, DB_MAX_OVERFLOW
+from database import SessionLocal, engine
+from pool_metrics import pool_metrics
+
+
+def run_level(concurrency: int, duration: float, hold: float) -> dict:
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    db.execute(text("SELECT 1"))
+                    time.sleep(hold)
+            except PoolTimeoutError:
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    pool_metrics.reset()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = pool_metrics.snapshot(engine)
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "throughput": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "wait_avg_ms": stats["wait_avg_ms"],
+        "wait_max_ms": stats["wait_max_ms"],
+        "max_checked_out": stats["max_checked_out"],
+        "overflow_events": stats["overflow_events"],
+        "timeouts": errors,
+    }
+
+
+def main() -> None:
+    capacity = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    parser = argparse.ArgumentParser(description="Connection pool saturation benchmark")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per concurrency level")
+    parser.add_argument("--hold-ms", type=float, default=20.0, help="How long each worker holds a connection")
+    parser.add_argument(
+        "--levels", type=str,
+        default=",".join(str(n) for n in sorted({1, DB_POOL_SIZE, capacity, capacity * 2})),
+        help="Comma-separated concurrency levels",
+    )
+    args = parser.parse_args()
+
+    print(f"pool_size={DB_POOL_SIZE} max_overflow={DB_MAX_OVERFLOW} pool={type(engine.pool).__name__}")
+    columns = ["concurrency", "throughput", "p50_ms", "p95_ms", "wait_avg_ms", "wait_max_ms",
+               "max_checked_out", "overflow_events", "timeouts"]
+    print(" ".join(f"{c:>15}" for c in columns))
+    for level in (int(n) for n in args.levels.split(",")):
+        row = run_level(level, args.duration, args.hold_ms / 1000)
+        print(" ".join(f"{row[c]:>15.1f}" if isinstance(row[c], float) else f"{row[c]:>15}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Measure prompt processing per call for two layouts of the classification prompt.
+
+- stable prefix: what populate_article_categories sends. The category
+  catalogue is the system prompt and comes first, and only the title varies,
+  at the end. Servers with prefix (KV) caching reuse the catalogue.
+- title first: the title leads and the catalogue follows in one user message,
+  so no two prompts share a prefix.
+
+Every call is streamed (moduleAI.measure_completion). Prompt time is the
+server's own figure when it reports one, else the time to the first chunk.
+Cached tokens are shown when the server reports them.
+
+Point --base-url at a local server (LM Studio, llama.cpp, vLLM with prefix
+caching) to see the real gain. Without it, a fake server simulates prompt
+processing at --prompt-ms-per-1k per 1000 uncached tokens.
+
+    python benchmarks/bench_prompt_prefix.py --base-url http://127.0.0.1:1234/v1 --model qwen2.5-7b-instruct --calls 30
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from llm_pool import Endpoint
+from moduleAI import measure_completion
+from populate_article_categories import build_system_prompt, build_user_prompt, load_category_specs
+from synthetic import make_title
+from loadgen import percentile
+
+
+def stable_prefix(system_prompt: str, title: str):
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": build_user_prompt(title)},
+    ]
+
+
+def title_first(system_prompt: str, title: str):
+    return [{"role": "user", "content": f"{build_user_prompt(title)}\n\n{system_prompt}"}]
+
+
+LAYOUTS = {"stable prefix": stable_prefix, "title first": title_first}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt processing time and tokens per call by prompt layout")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible server (default: a simulated one)")
+    parser.add_argument("--model", default="bench-model")
+    parser.add_argument("--calls", type=int, default=20, help="Calls per layout")
+    parser.add_argument("--prompt-ms-per-1k", type=float, default=200.0, help="Simulated prompt cost without --base-url")
+    args = parser.parse_args()
+
+    if args.base_url is None:
+        from fake_openai import start_fake_openai
+        server = start_fake_openai(latency_ms=5, prompt_ms_per_1k=args.prompt_ms_per_1k)
+        args.base_url = server.base_url
+        print(f"Simulated server, {args.prompt_ms_per_1k:.0f} ms per 1000 uncached prompt tokens")
+
+    client = Endpoint(args.base_url, args.model).client
+    system_prompt = build_system_prompt(load_category_specs(os.path.join(BACKEND_DIR, "categories.json")))
+    rng = random.Random(42)
+    titles = [make_title(rng) for _ in range(args.calls)]
+
+    print(f"{'layout':>14} {'prompt tok':>10} {'cached tok':>10} {'p50 ms':>8} {'p90 ms':>8} {'source':>12}")
+    for name, layout in LAYOUTS.items():
+        timings = []
+        for title in titles:
+            _, timing = measure_completion(client, args.model, messages=layout(system_prompt, title), max_tokens=128, temperature=0.0)
+            timings.append(timing)
+        prompt_ms = sorted(t.prompt_seconds * 1000 for t in timings)
+        prompt_tokens = statistics.mean(t.prompt_tokens or 0 for t in timings)
+        cached = [t.cached_tokens for t in timings if t.cached_tokens is not None]
+        cached_column = f"{statistics.mean(cached):.0f}" if cached else "-"
+        print(
+            f"{name:>14} {prompt_tokens:>10.0f} {cached_column:>10} {percentile(prompt_ms, 0.5):>8.1f} "
+            f"{percentile(prompt_ms, 0.9):>8.1f} {timings[-1].source:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
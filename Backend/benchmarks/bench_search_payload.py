@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Measure DB I/O and bytes on the wire per /abstracts/search/ page.
+
+For each mode, the script runs the search for every term in SEARCH_TERMS with
+--limit rows per page and reports per-page averages of:
+
+- db bytes: column data fetched from the database (sum of value lengths)
+- json bytes: uncompressed response body
+- gzip bytes: response body as sent to a client with Accept-Encoding: gzip
+
+The "abstract column" mode is the previous query, which also fetched the
+full abstract text that the response then dropped.
+
+    python benchmarks/bench_search_payload.py --seed 20000 --limit 100
+"""
+
+import argparse
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fastapi.testclient import TestClient
+
+from config import DATABASE_URL
+from crud import search_abstracts
+from database import SessionLocal
+from models import Article, Abstract
+from synthetic import SEARCH_TERMS, seed_database
+
+MODES = {
+    "abstract column": {},
+    "default": {},
+    "fields=id,title": {"fields": "id,title"},
+    "snippets": {"snippets": "true"},
+}
+
+
+def db_bytes(rows) -> int:
+    return sum(len(str(value)) for row in rows for value in row if value is not None)
+
+
+def fetch_rows(db, mode: str, term: str, limit: int):
+    if mode == "abstract column":
+        return (
+            db.query(Article.id, Article.title, Article.link, Abstract.abstract)
+            .join(Abstract, Article.id == Abstract.id_article)
+            .filter(Abstract.abstract.ilike(f"%{term}%"))
+            .limit(limit)
+            .all()
+        )
+    params = MODES[mode]
+    fields = tuple(params.get("fields", "id,title,link").split(","))
+    return search_abstracts(db, query=term, limit=limit, fields=fields, snippet_width=160 if params.get("snippets") else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB I/O and bytes on the wire per search page")
+    parser.add_argument("--seed", type=int, default=0, help="First seed DATABASE_URL with this many synthetic articles (drops its tables)")
+    parser.add_argument("--limit", type=int, default=100, help="Rows per page")
+    args = parser.parse_args()
+
+    if args.seed:
+        print(f"Seeding {args.seed} synthetic articles...")
+        seed_database(DATABASE_URL, args.seed)
+
+    import main as api
+
+    print(f"{'mode':>18} {'db bytes':>10} {'json bytes':>11} {'gzip bytes':>11}")
+    with TestClient(api.app) as client, SessionLocal() as db:
+        for mode, params in MODES.items():
+            totals = [0, 0, 0]
+            for term in SEARCH_TERMS:
+                totals[0] += db_bytes(fetch_rows(db, mode, term, args.limit))
+                query = {"q": term, "limit": args.limit, **params}
+                plain = client.get("/abstracts/search/", params=query, headers={"Accept-Encoding": "identity"})
+                gzipped = client.get("/abstracts/search/", params=query, headers={"Accept-Encoding": "gzip"})
+                totals[1] += plain.num_bytes_downloaded
+                totals[2] += gzipped.num_bytes_downloaded
+            pages = len(SEARCH_TERMS)
+            # The previous endpoint sent the default body uncompressed
+            compressed = "-" if mode == "abstract column" else totals[2] // pages
+            print(f"{mode:>18} {totals[0] // pages:>10} {totals[1] // pages:>11} {compressed:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compare per-page CPU time of response_model serialization against FastJSONResponse.
+
+For synthetic search pages of --rows rows (tuples, as crud.search_abstracts
+returns them), times:
+
+- response_model: the old endpoint path. Build dicts row by row, then let
+  FastAPI validate them against list[AbstractSearchResult] and serialize the
+  validated models (fastapi.routing.serialize_response, then JSONResponse)
+- fast path: rows_as_dicts + FastJSONResponse.render (no validation)
+
+    python benchmarks/bench_serialization.py --rows 100 --pages 2000
+"""
+
+import argparse
+import inspect
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute, serialize_response
+
+from schemas import AbstractSearchResult
+from serialization import FastJSONResponse, rows_as_dicts
+
+FIELDS = ("id", "title", "link")
+SUPPORTS_DUMP_JSON = "dump_json" in inspect.signature(serialize_response).parameters
+
+
+def make_rows(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    words = ["microgravity", "bone", "loss", "radiation", "plant", "growth", "immune", "response", "mice", "spaceflight"]
+    return [
+        (
+            i,
+            " ".join(rng.choices(words, k=rng.randint(6, 12))).capitalize(),
+            f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{1000000 + i}/",
+            " ".join(rng.choices(words, k=150)),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def run_sync(coro):
+    """Drive a coroutine that never suspends, without event loop overhead."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def response_model_path(rows, field) -> bytes:
+    search_results = []
+    for result in rows:
+        search_results.append({
+            "id": result[0],
+            "title": result[1],
+            "link": result[2],
+            "abstract": result[3],
+        })
+    if SUPPORTS_DUMP_JSON:
+        # Newer FastAPI validates and dumps straight to JSON bytes
+        body = run_sync(serialize_response(field=field, response_content=search_results, dump_json=True))
+        return Response(body, media_type="application/json").body
+    content = run_sync(serialize_response(field=field, response_content=search_results))
+    return JSONResponse(content).body
+
+
+def fast_path(rows, field) -> bytes:
+    return FastJSONResponse(rows_as_dicts(rows, FIELDS)).body
+
+
+def cpu_per_page(fn, rows, field, pages: int) -> float:
+    fn(rows, field)  # warm up
+    start = time.process_time()
+    for _ in range(pages):
+        fn(rows, field)
+    return (time.process_time() - start) / pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page CPU time of search response serialization")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000], help="Rows per page")
+    parser.add_argument("--pages", type=int, default=1000)
+    args = parser.parse_args()
+
+    route = APIRoute("/abstracts/search/", lambda: None, response_model=list[AbstractSearchResult])
+    field = route.response_field
+
+    print(f"{'rows':>6} {'response_model':>16} {'fast path':>12} {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        assert response_model_path(rows, field) == fast_path(rows, field)
+        pages = max(10, args.pages * 100 // count)
+        slow = cpu_per_page(response_model_path, rows, field, pages)
+        fast = cpu_per_page(fast_path, rows, field, pages)
+        print(f"{count:>6} {slow * 1e6:>13.1f} us {fast * 1e6:>9.1f} us {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Cold-load time of the seed files versus a memory-mapped snapshot.
+
+Generates --rows synthetic articles (CSV) and abstracts (JSON) in the seed file
+formats, parses them the way create_table.py does, writes the same data as a
+snapshot and times load_snapshot().
+
+    python benchmarks/bench_snapshot.py --rows 1000000
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snapshot
+
+WORDS = ["microgravity", "bone", "loss", "mice", "spaceflight", "radiation", "plant", "growth",
+         "muscle", "gene", "expression", "immune", "cell", "station", "mission", "stress"]
+
+
+def write_seed_files(directory: str, rows: int) -> None:
+    rng = random.Random(7)
+    with open(os.path.join(directory, "SB_publication_PMC.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Title", "Link"])
+        for i in range(rows):
+            writer.writerow([" ".join(rng.choices(WORDS, k=8)), f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{i}/"])
+    with open(os.path.join(directory, "sample.json"), "w", encoding="utf-8") as f:
+        json.dump([{"title": "", "abstract": " ".join(rng.choices(WORDS, k=60))} for _ in range(rows)], f)
+
+
+def parse_seed_files(directory: str) -> int:
+    with open(os.path.join(directory, "SB_publication_PMC.csv"), "r", encoding="utf-8-sig") as f:
+        articles = [{"title": row["Title"], "link": row["Link"]} for row in csv.DictReader(f)]
+    with open(os.path.join(directory, "sample.json"), "r", encoding="utf-8") as f:
+        abstracts = json.load(f)
+    return len(articles) + len(abstracts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark snapshot cold load")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic articles (and abstracts)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_seed_files(tmp, args.rows)
+
+        start = time.perf_counter()
+        parse_seed_files(tmp)
+        parse_seconds = time.perf_counter() - start
+
+        snapshot_dir = os.path.join(tmp, "snapshot")
+        sources = snapshot.file_sources(tmp)
+        snapshot.write_snapshot(snapshot_dir, {"articles": sources["articles"], "abstracts": sources["abstracts"]})
+
+        start = time.perf_counter()
+        tables = snapshot.load_snapshot(snapshot_dir)
+        load_seconds = time.perf_counter() - start
+        # Touch every title so the mapped pages are really read
+        start = time.perf_counter()
+        title_bytes = sum(chunk.buffers()[2].size for chunk in tables["articles"].column("title").chunks)
+        scan_seconds = time.perf_counter() - start
+
+        print(f"rows:                      {args.rows:,} articles + {args.rows:,} abstracts")
+        print(f"parse CSV + JSON:          {parse_seconds:.2f}s")
+        print(f"load_snapshot (mmap):      {load_seconds * 1000:.1f} ms")
+        print(f"title column ({title_bytes / 1e6:.1f} MB):  {scan_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
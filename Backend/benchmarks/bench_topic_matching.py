@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark PubMedArticleManager topic matching on a synthetic CSV.
+
+Writes a CSV with --rows titles (default 1M), then times the original
+row-by-row matcher against PubMedArticleManager.find_articles_by_topic,
+both cold (CSV parse included) and warm (cached frame), and one batched
+find_articles_by_topics scan against one call per topic.
+
+    python benchmarks/bench_topic_matching.py --rows 1000000 --topic microgravity
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import re
+import tempfile
+import time
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WORDS = [
+    "microgravity", "bone", "loss", "mice", "spaceflight", "radiation", "plant", "growth",
+    "muscle", "atrophy", "gene", "expression", "immune", "response", "cell", "culture",
+    "arabidopsis", "station", "mission", "stress", "oxidative", "cardiovascular", "simulated",
+]
+
+
+def load_article_processing():
+    """Import 'article processing 2.py', whose file name is not a valid module name."""
+    path = os.path.join(REPO_ROOT, "article processing 2.py")
+    spec = importlib.util.spec_from_file_location("article_processing_2", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_synthetic_csv(path: str, rows: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    titles = [" ".join(rng.choices(WORDS, k=rng.randint(4, 12))).capitalize() for _ in range(rows)]
+    links = [f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{1000000 + i}/" for i in range(rows)]
+    pd.DataFrame({"Title": titles, "Link": links}).to_csv(path, index=False)
+
+
+def row_by_row_find(csv_path: str, topic: str, max_articles: int) -> list:
+    """The previous implementation: iterrows, a regex per row, stop at the first max_articles matches."""
+    df = pd.read_csv(csv_path)
+    topic_lower = topic.lower()
+    pattern = r"\b" + re.escape(topic_lower) + r"\b"
+    articles = []
+    for _, row in df.iterrows():
+        link = str(row["Link"])
+        title_lower = str(row["Title"]).lower()
+        if "ncbi.nlm.nih.gov/pmc/articles" in link and re.search(pattern, title_lower):
+            score = (10 if topic_lower in title_lower else 0) + 5 + title_lower.count(topic_lower) * 2
+            score += 3 if title_lower.startswith(topic_lower) else 0
+            articles.append({"Title": row["Title"], "Link": link, "match_score": score})
+            if len(articles) >= max_articles:
+                break
+    articles.sort(key=lambda x: x["match_score"], reverse=True)
+    return articles
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vectorized topic matching")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic CSV")
+    parser.add_argument("--topic", type=str, default="microgravity", help="Topic to search for")
+    parser.add_argument("--max-articles", type=int, default=10, help="Top-k to return")
+    parser.add_argument(
+        "--batch-topics", type=str,
+        default='microgravity|bone loss|plant OR arabidopsis|"gene expression" AND mice',
+        help="'|'-separated topic queries for the batched run",
+    )
+    parser.add_argument("--skip-row-by-row", action="store_true", help="Skip the slow reference implementation")
+    args = parser.parse_args()
+
+    module = load_article_processing()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "synthetic_pmc_articles.csv")
+        _, write_seconds = timed(write_synthetic_csv, csv_path, args.rows)
+        print(f"Wrote {args.rows:,} rows in {write_seconds:.2f}s")
+
+        # The reference stops at the first max_articles matches, so use a topic that never
+        # matches to time the full scan it needs when matches are rare.
+        if not args.skip_row_by_row:
+            _, legacy_seconds = timed(row_by_row_find, csv_path, "no-such-topic", args.max_articles)
+            print(f"row-by-row full scan:        {legacy_seconds:.2f}s")
+
+        manager = module.PubMedArticleManager(csv_path)
+        _, cold_seconds = timed(manager.find_articles_by_topic, args.topic, args.max_articles)
+        top, warm_seconds = timed(manager.find_articles_by_topic, args.topic, args.max_articles)
+        print(f"vectorized (cold, with CSV): {cold_seconds:.2f}s")
+        print(f"vectorized (warm, cached):   {warm_seconds:.2f}s")
+        if top:
+            print(f"best match: {top[0]['Title']}")
+
+        topics = args.batch_topics.split("|")
+        start = time.perf_counter()
+        for topic in topics:
+            manager.find_articles_by_topic(topic, args.max_articles)
+        one_by_one_seconds = time.perf_counter() - start
+        _, batched_seconds = timed(manager.find_articles_by_topics, topics, args.max_articles)
+        print(f"{len(topics)} topics one by one:      {one_by_one_seconds:.2f}s")
+        print(f"{len(topics)} topics batched:         {batched_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Minimal OpenAI-compatible server for benchmarking the LLM code paths offline.
+
+Serves POST /v1/chat/completions and GET /v1/models. Each completion sleeps for
+--latency-ms (plus up to --jitter-ms) to stand in for model time, then answers
+with a canned message: classification prompts (the populate_article_categories
+system prompt) get a JSON category list, everything else gets a short text.
+Token usage is estimated at four characters per token.
+
+With --prompt-ms-per-1k, prompt processing is simulated too: the part of the
+prompt not shared with a recent prompt (a crude prefix cache) costs that many
+milliseconds per 1000 tokens, and the shared part is reported as
+usage.prompt_tokens_details.cached_tokens. "stream": true requests get
+server-sent events, with the first chunk sent after prompt processing.
+
+    python benchmarks/fake_openai.py --port 8099 --latency-ms 200
+    LLM_BASE_URL=http://127.0.0.1:8099/v1 uvicorn main:app
+"""
+
+import argparse
+import json
+import random
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CLASSIFIER_MARKER = "precise classifier"
+CLASSIFIER_CATEGORIES = ["biologia", "microgravedad", "radiacion", "plantas", "tecnologia"]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs add ~40ms per response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": self.server.model, "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        server = self.server
+        messages = request.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        with server.lock:
+            server.requests += 1
+            cached_chars = max((len(os.path.commonprefix([prompt, seen])) for seen in server.recent_prompts), default=0)
+            server.recent_prompts.append(prompt)
+        prompt_tokens = max(1, len(prompt) // 4)
+        cached_tokens = cached_chars // 4
+        time.sleep((prompt_tokens - cached_tokens) * server.prompt_ms_per_1k / 1_000_000)
+
+        if CLASSIFIER_MARKER in prompt:
+            picked = random.sample(CLASSIFIER_CATEGORIES, random.randint(1, 2))
+            content = json.dumps({"categories": picked})
+        else:
+            content = "This synthetic answer stands in for a model response during benchmarking."
+
+        completion_tokens = max(1, len(content) // 4)
+        completion_id = f"chatcmpl-bench-{server.requests}"
+        model = request.get("model", server.model)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        if request.get("stream"):
+            self._stream(completion_id, model, content, usage)
+            return
+
+        time.sleep((server.latency_ms + random.uniform(0, server.jitter_ms)) / 1000)
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, completion_id, model, content, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(choices, chunk_usage=None):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model, "choices": choices}
+            if chunk_usage is not None:
+                chunk["usage"] = chunk_usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        server = self.server
+        send([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        time.sleep((server.latency_ms + random.uniform(0, server.jitter_ms)) / 1000)
+        send([{"index": 0, "delta": {"content": content}, "finish_reason": None}])
+        send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        send([], usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=50.0, jitter_ms=0.0, model="bench-model", prompt_ms_per_1k=0.0):
+        super().__init__((host, port), FakeOpenAIHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.model = model
+        self.prompt_ms_per_1k = prompt_ms_per_1k
+        self.requests = 0
+        # Prompts the simulated prefix cache remembers
+        self.recent_prompts = deque(maxlen=16)
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_fake_openai(**kwargs) -> FakeOpenAIServer:
+    """Start a FakeOpenAIServer on a background thread; call .shutdown() to stop it."""
+    server = FakeOpenAIServer(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--prompt-ms-per-1k", type=float, default=0.0, help="Simulated prompt processing per 1000 uncached prompt tokens")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency_ms, args.jitter_ms, prompt_ms_per_1k=args.prompt_ms_per_1k)
+    print(f"Fake OpenAI server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Local HTTP fixture that serves PMC-style article pages for scraper benchmarks.
+
+GET /pmc/articles/PMC<n>/ returns a deterministic page for article n with the
+markup WebScraper looks for (#main-content, .abstract, numbered .tsec sections
+with subsections and figures, a reference list), so
+scraping runs without network access and without depending on what PMC serves
+that day. --latency-ms delays every response to mimic a remote server.
+
+    python benchmarks/fixture_site.py --port 8098
+"""
+
+import argparse
+import html
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from synthetic import make_abstract, make_title
+
+ARTICLE_PATH = re.compile(r"^/pmc/articles/PMC(\d+)/?$")
+SECTIONS = ["Introduction", "Methods", "Results", "Discussion"]
+
+
+def render_article(number: int, paragraphs: int = 4) -> str:
+    rng = random.Random(number)
+    title = html.escape(make_title(rng))
+    parts = [
+        "<!DOCTYPE html><html><head>",
+        f"<title>{title} - PMC</title>",
+        "</head><body>",
+        "<header><nav>Navigation, search box and other page chrome</nav></header>",
+        '<main id="main-content"><article>',
+        f"<h1>{title}</h1>",
+        f'<section class="abstract"><h2>Abstract</h2><p>{html.escape(make_abstract(rng))}</p></section>',
+    ]
+    for index, name in enumerate(SECTIONS, 1):
+        parts.append(f'<section class="tsec" id="sec{index}"><h2>{index}. {name}</h2>')
+        for paragraph in range(paragraphs):
+            if paragraph == paragraphs // 2:
+                parts.append(f'<section id="sec{index}.1"><h3>{index}.1. {html.escape(make_title(rng))}</h3>')
+            parts.append(f"<p>{html.escape(make_abstract(rng))}</p>")
+        parts.append("</section>")
+        parts.append(
+            f'<figure class="fig"><img alt=""><figcaption>Figure {index}. {html.escape(make_abstract(rng))}</figcaption></figure>'
+        )
+        parts.append("</section>")
+    parts.append('<section class="ref-list"><h2>References</h2><ul>')
+    for ref in range(1, 11):
+        parts.append(f"<li>{ref}. {html.escape(make_title(rng))}. Life Sci Space Res. 2020;{ref}:1-10.</li>")
+    parts.append("</ul></section>")
+    parts.append("</article></main><footer>Footer links</footer></body></html>")
+    return "".join(parts)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs add ~40ms per response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        match = ARTICLE_PATH.match(self.path.split("?", 1)[0])
+        if not match:
+            body, status = b"not found", 404
+        else:
+            if self.server.latency_ms:
+                time.sleep(self.server.latency_ms / 1000)
+            body, status = render_article(int(match.group(1)), self.server.paragraphs).encode("utf-8"), 200
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, paragraphs=4):
+        super().__init__((host, port), FixtureHandler)
+        self.latency_ms = latency_ms
+        self.paragraphs = paragraphs
+
+    def article_url(self, number: int) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/pmc/articles/PMC{number}/"
+
+
+def start_fixture_site(**kwargs) -> FixtureServer:
+    """Start a FixtureServer on a background thread; call .shutdown() to stop it."""
+    server = FixtureServer(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve PMC-style fixture pages for scraper benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--paragraphs", type=int, default=4, help="Paragraphs per section")
+    args = parser.parse_args()
+
+    server = FixtureServer(args.host, args.port, args.latency_ms, args.paragraphs)
+    print(f"Fixture pages at {server.article_url(1)} ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Closed-loop HTTP load generator used by run_suite.py.
+
+Each of `concurrency` worker threads holds one keep-alive connection and sends
+requests back to back for `duration` seconds; a request factory picks the
+method, path and body for every request so scenarios can vary their parameters.
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+from typing import Callable, Optional, Tuple
+from urllib.parse import urlsplit
+
+# (method, path, JSON body or None)
+Request = Tuple[str, str, Optional[dict]]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors: int, elapsed: float, response_bytes: int) -> dict:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if count else 0.0,
+        "bytes_per_response": round(response_bytes / count) if count else 0,
+    }
+
+
+def run_load(
+    base_url: str,
+    make_request: Callable[[random.Random], Request],
+    concurrency: int = 8,
+    duration: float = 10.0,
+    warmup: float = 1.0,
+    seed: int = 42,
+    timeout: float = 60.0,
+) -> dict:
+    """Drive base_url with requests from make_request and return latency statistics.
+
+    Requests finishing during the first `warmup` seconds are not recorded.
+    Non-2xx responses and connection failures count as errors.
+    """
+    parts = urlsplit(base_url)
+    latencies = []
+    errors = 0
+    response_bytes = 0
+    lock = threading.Lock()
+    started = time.perf_counter()
+    record_from = started + warmup
+    deadline = record_from + duration
+
+    def worker(index: int):
+        nonlocal errors, response_bytes
+        rng = random.Random(seed + index)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+        local_latencies, local_errors, local_bytes = [], 0, 0
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            method, path, body = make_request(rng)
+            headers = {"Accept": "application/json"}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body).encode("utf-8")
+                headers["Content-Type"] = "application/json"
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                ok = 200 <= response.status < 300
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+                ok, data = False, b""
+            end = time.perf_counter()
+            if now < record_from:
+                continue
+            if ok:
+                local_latencies.append(end - now)
+                local_bytes += len(data)
+            else:
+                local_errors += 1
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+            response_bytes += local_bytes
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return summarize(latencies, errors, duration, response_bytes)
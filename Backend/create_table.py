@@ -4,15 +4,68 @@ Script to create the articles and abstracts tables in the PostgreSQL database an
 Run this script after setting up your database connection.
 """
 
+import argparse
 import json
 import csv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, insert
 from sqlalchemy.orm import sessionmaker
 from config import DATABASE_URL
-from models import Article, Abstract, Category, ArticleCategory
+from models import Article, Abstract, Category, ArticleCategory, missing_columns
 
-def create_tables_and_populate():
-    """Create the articles and abstracts tables and populate them with data if empty."""
+def populate_from_snapshot(db, snapshot_dir, existing_counts):
+    """Bulk-load the empty tables from a columnar snapshot written by snapshot.py."""
+    from snapshot import load_snapshot
+
+    tables = load_snapshot(snapshot_dir)
+    # Parents first so the foreign keys resolve
+    targets = [
+        ("articles", Article),
+        ("categories", Category),
+        ("abstracts", Abstract),
+        ("article_categories", ArticleCategory),
+    ]
+    for name, model in targets:
+        if name not in tables:
+            print(f"\n⚠️  Snapshot has no {name} table. Skipping.")
+            continue
+        if existing_counts[name] > 0:
+            print(f"\n📊 {name} table already contains {existing_counts[name]} rows. Skipping data insertion.")
+            continue
+
+        table = tables[name]
+        for batch in table.to_batches(max_chunksize=10000):
+            db.execute(insert(model), batch.to_pylist())
+        if name == "articles" and db.bind.dialect.name == "postgresql":
+            # Ids come from the snapshot, so move the sequence past them
+            db.execute(text("SELECT setval(pg_get_serial_sequence('articles', 'id'), COALESCE(MAX(id), 1)) FROM articles"))
+        db.commit()
+        print(f"✅ Successfully inserted {table.num_rows} {name} rows from snapshot!")
+
+def add_missing_columns(engine):
+    """Add columns introduced after a table was created (e.g. scraped_pages.sections).
+
+    Only nullable columns without a server default are added; others are reported.
+    """
+    for column in missing_columns(engine):
+        name = f"{column.table.name}.{column.name}"
+        if not column.nullable or column.server_default is not None:
+            print(f"⚠️  Column {name} is missing and cannot be added automatically")
+            continue
+        preparer = engine.dialect.identifier_preparer
+        column_type = column.type.compile(dialect=engine.dialect)
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE {preparer.format_table(column.table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+            ))
+        print(f"✅ Added column {name}")
+
+def create_tables_and_populate(snapshot_dir=None, schema_only=False):
+    """Create the articles and abstracts tables and populate them with data if empty.
+
+    With snapshot_dir the data comes from a columnar snapshot (see snapshot.py)
+    instead of the CSV and JSON seed files. With schema_only the tables are
+    created and no data is loaded.
+    """
     try:
         # Create engine
         engine = create_engine(DATABASE_URL)
@@ -20,6 +73,7 @@ def create_tables_and_populate():
         # Create tables using SQLAlchemy metadata
         from models import Base
         Base.metadata.create_all(bind=engine)
+        add_missing_columns(engine)
         
         print("✅ Tables created successfully!")
         print("Articles table structure:")
@@ -36,6 +90,12 @@ def create_tables_and_populate():
         print("\nArticle Categories table structure:")
         print("- id_article: INTEGER PRIMARY KEY FOREIGN KEY")
         print("- category: VARCHAR PRIMARY KEY FOREIGN KEY")
+        print("\nArticle Analyses table (stored /insights and /risks results)")
+        print("\nScraped Pages table (page text written by scrape jobs)")
+        print("\nJobs table (background jobs run by worker.py)")
+
+        if schema_only:
+            return
         
         # Check if tables are empty and populate with data
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -48,6 +108,16 @@ def create_tables_and_populate():
             existing_categories_count = db.query(Category).count()
             existing_article_categories_count = db.query(ArticleCategory).count()
             
+            if snapshot_dir:
+                print(f"\n📦 Loading data from snapshot {snapshot_dir}...")
+                populate_from_snapshot(db, snapshot_dir, {
+                    "articles": existing_articles_count,
+                    "abstracts": existing_abstracts_count,
+                    "categories": existing_categories_count,
+                    "article_categories": existing_article_categories_count,
+                })
+                return
+            
             if existing_articles_count == 0:
                 print("\n📄 Articles table is empty. Loading data from CSV...")
                 
@@ -173,4 +243,14 @@ def create_tables_and_populate():
         print("5. All CSV and JSON files exist and are valid")
 
 if __name__ == "__main__":
-    create_tables_and_populate()
+    parser = argparse.ArgumentParser(description="Create the tables and populate them if empty")
+    parser.add_argument("--snapshot", type=str, default=None, help="Load data from a snapshot directory (see snapshot.py) instead of the CSV/JSON files")
+    parser.add_argument("--schema-only", action="store_true", help="Only create the tables, without loading any data")
+    parser.add_argument("--profile", type=str, default=None, help="Write a collapsed-stack (flamegraph) profile of the run to this file")
+    args = parser.parse_args()
+    if args.profile:
+        from profiling import profile_to_file
+        with profile_to_file(args.profile):
+            create_tables_and_populate(snapshot_dir=args.snapshot, schema_only=args.schema_only)
+    else:
+        create_tables_and_populate(snapshot_dir=args.snapshot, schema_only=args.schema_only)
@@ -1,7 +1,9 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from models import Article, Abstract, Category, ArticleCategory
-from schemas import ArticleCreate, ArticleUpdate, AbstractCreate, AbstractUpdate
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_, and_, insert, update, delete, select, func, case
+from sqlalchemy.exc import SQLAlchemyError
+from models import Article, Abstract, Category, ArticleCategory, ArticleAnalysis, ScrapedPage
+from schemas import ArticleCreate, ArticleUpdate, AbstractCreate, AbstractUpdate, ArticleBulkUpdate, AbstractBulkUpdate
 
 def get_article(db: Session, article_id: int):
     return db.query(Article).filter(Article.id == article_id).first()
@@ -9,8 +11,24 @@ def get_article(db: Session, article_id: int):
 def get_articles(db: Session, skip: int = 0, limit: int = 100):
     return db.query(Article).offset(skip).limit(limit).all()
 
+def get_articles_with_details(db: Session, skip: int = 0, limit: int = 100):
+    """
+    List articles together with their abstracts and categories.
+    
+    The relationships are loaded with selectinload, so a page always costs three
+    queries (articles, abstracts, categories) regardless of its size.
+    """
+    return (
+        db.query(Article)
+        .options(selectinload(Article.abstracts), selectinload(Article.categories))
+        .order_by(Article.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
 def create_article(db: Session, article: ArticleCreate):
-    db_article = Article(title=article.title, abstract=article.abstract)
+    db_article = Article(title=article.title, link=article.link)
     db.add(db_article)
     db.commit()
     db.refresh(db_article)
@@ -33,15 +51,102 @@ def delete_article(db: Session, article_id: int):
         db.commit()
     return db_article
 
-def search_articles(db: Session, query: str, skip: int = 0, limit: int = 100):
-    """Search articles by query in title field."""
+# Article columns the search functions can return, by response field name
+ARTICLE_SEARCH_COLUMNS = {"id": Article.id, "title": Article.title, "link": Article.link}
+
+def abstract_snippet(db: Session, query: str, width: int = 160):
+    """
+    SQL expression for a window of `width` characters of the abstract around the
+    first (case-insensitive) match of query, so only the snippet leaves the database.
+    """
+    position = func.strpos if db.bind.dialect.name == "postgresql" else func.instr
+    match = position(func.lower(Abstract.abstract), query.lower())
+    start = case((match > width // 2, match - width // 2), else_=1)
+    return func.substr(Abstract.abstract, start, width).label("snippet")
+
+def search_articles(db: Session, query: str, skip: int = 0, limit: int = 100, fields=("id", "title", "link")):
+    """Search articles by query in title field, selecting only the given fields."""
     search_filter = Article.title.ilike(f"%{query}%")
-    return db.query(Article).filter(search_filter).offset(skip).limit(limit).all()
+    columns = [ARTICLE_SEARCH_COLUMNS[field] for field in fields]
+    return db.query(*columns).filter(search_filter).offset(skip).limit(limit).all()
 
-def search_abstracts(db: Session, query: str, skip: int = 0, limit: int = 100):
-    """Search abstracts by query in abstract field and return article information."""
+def search_abstracts(db: Session, query: str, skip: int = 0, limit: int = 100, fields=("id", "title", "link"), snippet_width: int = None):
+    """
+    Search abstracts by query in abstract field and return article information.
+    
+    Only the given article fields are selected; the abstract text itself is not.
+    With snippet_width a trailing snippet column holds that many characters of
+    the abstract around the match.
+    """
     search_filter = Abstract.abstract.ilike(f"%{query}%")
-    return db.query(Article.id, Article.title, Article.link, Abstract.abstract).join(Abstract, Article.id == Abstract.id_article).filter(search_filter).offset(skip).limit(limit).all()
+    columns = [ARTICLE_SEARCH_COLUMNS[field] for field in fields]
+    if snippet_width:
+        columns.append(abstract_snippet(db, query, snippet_width))
+    return db.query(*columns).select_from(Article).join(Abstract, Article.id == Abstract.id_article).filter(search_filter).offset(skip).limit(limit).all()
+
+def get_articles_batch(db: Session, article_ids: list, include_abstracts: bool = False, include_categories: bool = False):
+    """
+    Fetch many articles by id with one query per table instead of one per article.
+    
+    Args:
+        db: Database session
+        article_ids: List of article IDs to fetch (duplicates are ignored)
+        include_abstracts: Also load the abstracts of every article
+        include_categories: Also load the category IDs of every article
+    
+    Returns:
+        List of dictionaries in the order of article_ids; unknown IDs are skipped
+    """
+    ids = list(dict.fromkeys(article_ids))
+    if not ids:
+        return []
+    
+    articles = db.query(Article.id, Article.title, Article.link).filter(Article.id.in_(ids)).all()
+    by_id = {
+        row[0]: {"id": row[0], "title": row[1], "link": row[2]}
+        for row in articles
+    }
+    
+    if include_abstracts:
+        for item in by_id.values():
+            item["abstracts"] = []
+        for abstract in get_abstracts_batch(db, ids):
+            by_id[abstract.id_article]["abstracts"].append(abstract)
+    
+    if include_categories:
+        for item in by_id.values():
+            item["categories"] = []
+        category_rows = db.query(ArticleCategory.id_article, ArticleCategory.category).filter(ArticleCategory.id_article.in_(ids)).all()
+        for article_id, category in category_rows:
+            by_id[article_id]["categories"].append(category)
+    
+    return [by_id[article_id] for article_id in ids if article_id in by_id]
+
+def iter_articles_with_details(db: Session, batch_size: int = 1000):
+    """
+    Stream every article with its abstracts and category IDs, in id order.
+    
+    Articles are read through a server-side cursor (yield_per) and each batch is
+    completed with two IN queries, so memory use depends on batch_size and not
+    on the size of the corpus.
+    
+    Yields:
+        Lists of at most batch_size dictionaries shaped like ArticleWithDetails
+    """
+    stmt = select(Article.id, Article.title, Article.link).order_by(Article.id).execution_options(yield_per=batch_size)
+    for partition in db.execute(stmt).partitions():
+        ids = [row[0] for row in partition]
+        by_id = {
+            row[0]: {"id": row[0], "title": row[1], "link": row[2], "abstracts": [], "categories": []}
+            for row in partition
+        }
+        abstract_rows = db.execute(select(Abstract.id_article, Abstract.abstract).where(Abstract.id_article.in_(ids))).all()
+        for article_id, abstract in abstract_rows:
+            by_id[article_id]["abstracts"].append({"id_article": article_id, "abstract": abstract})
+        category_rows = db.execute(select(ArticleCategory.id_article, ArticleCategory.category).where(ArticleCategory.id_article.in_(ids))).all()
+        for article_id, category in category_rows:
+            by_id[article_id]["categories"].append(category)
+        yield [by_id[article_id] for article_id in ids]
 
 # Abstract CRUD operations
 def get_abstract(db: Session, article_id: int):
@@ -53,6 +158,16 @@ def get_abstracts(db: Session, skip: int = 0, limit: int = 100):
 def get_abstracts_by_article(db: Session, article_id: int):
     return db.query(Abstract).filter(Abstract.id_article == article_id).all()
 
+def get_abstracts_batch(db: Session, article_ids: list):
+    """Fetch the abstracts of many articles with a single query."""
+    ids = list(dict.fromkeys(article_ids))
+    if not ids:
+        return []
+    abstracts = db.query(Abstract).filter(Abstract.id_article.in_(ids)).all()
+    # Keep the caller's ordering so results line up with the requested ids
+    position = {article_id: i for i, article_id in enumerate(ids)}
+    return sorted(abstracts, key=lambda a: position[a.id_article])
+
 def create_abstract(db: Session, abstract: AbstractCreate):
     db_abstract = Abstract(
         id_article=abstract.id_article,
@@ -80,10 +195,36 @@ def delete_abstract(db: Session, article_id: int):
         db.commit()
     return db_abstract
 
-def search_articles_by_query_and_categories(db: Session, query: str = None, categories: list = None, skip: int = 0, limit: int = 100):
+# Article analysis store
+def get_scraped_page_by_article(db: Session, article_id: int):
+    """The scraped page stored for an article's link, if a scrape job stored one."""
+    return (
+        db.query(ScrapedPage)
+        .join(Article, Article.link == ScrapedPage.url)
+        .filter(Article.id == article_id)
+        .first()
+    )
+
+def get_article_analysis(db: Session, article_id: int, kind: str, template_version: str):
+    return db.get(ArticleAnalysis, (article_id, kind, template_version))
+
+def save_article_analysis(db: Session, article_id: int, kind: str, template_version: str, source_hash: str, content: str, model: str = None):
+    """Insert or replace the stored analysis of an article for one template version."""
+    db_analysis = db.merge(ArticleAnalysis(
+        id_article=article_id,
+        kind=kind,
+        template_version=template_version,
+        source_hash=source_hash,
+        content=content,
+        model=model,
+    ))
+    db.commit()
+    return db_analysis
+
+def search_articles_by_query_and_categories(db: Session, query: str = None, categories: list = None, skip: int = 0, limit: int = 100, fields=("id", "title", "link")):
     """
     Search articles by query in title field and filter by categories.
-    Returns only article.id, article.title, and article.link.
+    Returns only the requested article fields.
     
     Args:
         db: Database session
@@ -91,12 +232,13 @@ def search_articles_by_query_and_categories(db: Session, query: str = None, cate
         categories: List of category IDs to filter by (optional)
         skip: Number of articles to skip
         limit: Maximum number of articles to return
+        fields: Article fields to select (subset of id, title, link)
     
     Returns:
-        List of tuples containing (id, title, link)
+        List of tuples containing the requested fields, in order
     """
     # Start with base query selecting only the required fields
-    base_query = db.query(Article.id, Article.title, Article.link)
+    base_query = db.query(*[ARTICLE_SEARCH_COLUMNS[field] for field in fields]).select_from(Article)
     
     # Apply filters
     filters = []
@@ -137,3 +279,163 @@ def count_articles_by_category(db: Session, category_id: str):
     
     count = db.query(ArticleCategory).filter(ArticleCategory.category == category_id.strip()).count()
     return count
+
+
+# Bulk write operations
+#
+# Each function validates the raw payloads one by one, resolves conflicts and
+# missing rows with a single lookup query, writes every remaining row in one
+# statement and commits once. The result is one status dict per input item,
+# in input order.
+
+def _validate_items(items: list, schema):
+    """Split raw payloads into (index, model) pairs and per-item error results."""
+    valid = []
+    results = {}
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors())
+            results[index] = {"index": index, "status": "invalid", "error": error}
+    return valid, results
+
+def _commit_bulk(db: Session, results: dict, pending: dict, run):
+    """Run the write callback in one transaction; on failure mark pending items as failed."""
+    try:
+        run()
+        db.commit()
+        results.update(pending)
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = str(getattr(e, "orig", None) or e)
+        for index, result in pending.items():
+            results[index] = {"index": index, "status": "failed", "id": result.get("id"), "error": error}
+    return [results[index] for index in sorted(results)]
+
+def bulk_create_articles(db: Session, items: list):
+    """Insert many articles with a single INSERT ... RETURNING and one commit."""
+    valid, results = _validate_items(items, ArticleCreate)
+    pending = {index: {"index": index, "status": "created"} for index, _ in valid}
+
+    def run():
+        if not valid:
+            return
+        rows = [{"title": a.title, "link": a.link} for _, a in valid]
+        stmt = insert(Article).returning(Article.id, sort_by_parameter_order=True)
+        new_ids = db.execute(stmt, rows).scalars().all()
+        for (index, _), new_id in zip(valid, new_ids):
+            pending[index]["id"] = new_id
+
+    return _commit_bulk(db, results, pending, run)
+
+def bulk_create_abstracts(db: Session, items: list):
+    """Insert many abstracts in one transaction, skipping duplicates and unknown articles."""
+    valid, results = _validate_items(items, AbstractCreate)
+    ids = [a.id_article for _, a in valid]
+    existing_articles = {row[0] for row in db.query(Article.id).filter(Article.id.in_(ids)).all()} if ids else set()
+    existing_abstracts = {row[0] for row in db.query(Abstract.id_article).filter(Abstract.id_article.in_(ids)).all()} if ids else set()
+
+    rows = []
+    pending = {}
+    seen = set()
+    for index, abstract in valid:
+        article_id = abstract.id_article
+        if article_id not in existing_articles:
+            results[index] = {"index": index, "status": "not_found", "id": article_id, "error": "Article not found"}
+        elif article_id in existing_abstracts or article_id in seen:
+            results[index] = {"index": index, "status": "conflict", "id": article_id, "error": "Abstract already exists"}
+        else:
+            seen.add(article_id)
+            rows.append({"id_article": article_id, "abstract": abstract.abstract})
+            pending[index] = {"index": index, "status": "created", "id": article_id}
+
+    def run():
+        if rows:
+            db.execute(insert(Abstract), rows)
+
+    return _commit_bulk(db, results, pending, run)
+
+def bulk_update_articles(db: Session, items: list):
+    """Update many articles by primary key with one executemany UPDATE and one commit."""
+    valid, results = _validate_items(items, ArticleBulkUpdate)
+    ids = [a.id for _, a in valid]
+    existing = {row[0] for row in db.query(Article.id).filter(Article.id.in_(ids)).all()} if ids else set()
+
+    rows = []
+    pending = {}
+    for index, article in valid:
+        if article.id not in existing:
+            results[index] = {"index": index, "status": "not_found", "id": article.id, "error": "Article not found"}
+            continue
+        rows.append(article.model_dump(exclude_unset=True))
+        pending[index] = {"index": index, "status": "updated", "id": article.id}
+
+    def run():
+        if rows:
+            db.execute(update(Article), rows)
+
+    return _commit_bulk(db, results, pending, run)
+
+def bulk_update_abstracts(db: Session, items: list):
+    """Update many abstracts by article id with one executemany UPDATE and one commit."""
+    valid, results = _validate_items(items, AbstractBulkUpdate)
+    ids = [a.id_article for _, a in valid]
+    existing = {row[0] for row in db.query(Abstract.id_article).filter(Abstract.id_article.in_(ids)).all()} if ids else set()
+
+    rows = []
+    pending = {}
+    for index, abstract in valid:
+        if abstract.id_article not in existing:
+            results[index] = {"index": index, "status": "not_found", "id": abstract.id_article, "error": "Abstract not found"}
+            continue
+        rows.append(abstract.model_dump(exclude_unset=True))
+        pending[index] = {"index": index, "status": "updated", "id": abstract.id_article}
+
+    def run():
+        if rows:
+            db.execute(update(Abstract), rows)
+
+    return _commit_bulk(db, results, pending, run)
+
+def bulk_delete_articles(db: Session, article_ids: list):
+    """
+    Delete many articles in one transaction.
+    
+    Abstracts, category links and stored analyses of the deleted articles are
+    removed in the same transaction so the foreign keys never block the delete.
+    """
+    existing = {row[0] for row in db.query(Article.id).filter(Article.id.in_(article_ids)).all()} if article_ids else set()
+    results = {}
+    pending = {}
+    for index, article_id in enumerate(article_ids):
+        if article_id in existing:
+            pending[index] = {"index": index, "status": "deleted", "id": article_id}
+        else:
+            results[index] = {"index": index, "status": "not_found", "id": article_id, "error": "Article not found"}
+
+    def run():
+        if existing:
+            db.execute(delete(Abstract).where(Abstract.id_article.in_(existing)))
+            db.execute(delete(ArticleCategory).where(ArticleCategory.id_article.in_(existing)))
+            db.execute(delete(ArticleAnalysis).where(ArticleAnalysis.id_article.in_(existing)))
+            db.execute(delete(Article).where(Article.id.in_(existing)))
+
+    return _commit_bulk(db, results, pending, run)
+
+def bulk_delete_abstracts(db: Session, article_ids: list):
+    """Delete the abstracts of many articles with one DELETE and one commit."""
+    existing = {row[0] for row in db.query(Abstract.id_article).filter(Abstract.id_article.in_(article_ids)).all()} if article_ids else set()
+    results = {}
+    pending = {}
+    for index, article_id in enumerate(article_ids):
+        if article_id in existing:
+            pending[index] = {"index": index, "status": "deleted", "id": article_id}
+        else:
+            results[index] = {"index": index, "status": "not_found", "id": article_id, "error": "Abstract not found"}
+
+    def run():
+        if existing:
+            db.execute(delete(Abstract).where(Abstract.id_article.in_(existing)))
+
+    return _commit_bulk(db, results, pending, run)
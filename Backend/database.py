@@ -1,9 +1,39 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config import DATABASE_URL
+from sqlalchemy.pool import NullPool
+from config import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_PGBOUNCER_MODE
+)
+from pool_metrics import InstrumentedQueuePool, install_pool_listeners
 
-engine = create_engine(DATABASE_URL)
+def engine_options(url: str) -> dict:
+    """Pool settings for create_engine, driven by config.py."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite needs its single shared connection
+        return {}
+
+    if DB_PGBOUNCER_MODE:
+        options = {"poolclass": NullPool, "pool_pre_ping": DB_POOL_PRE_PING}
+        if parsed.get_driver_name() == "psycopg":
+            # psycopg 3 prepares repeated statements server side, which breaks under transaction pooling
+            options["connect_args"] = {"prepare_threshold": None}
+        return options
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+install_pool_listeners(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -0,0 +1,133 @@
+"""
+Streaming serializers for the full-corpus export (GET /export).
+
+Each serializer consumes the batches produced by crud.iter_articles_with_details
+and yields encoded chunks, so a response never holds more than one batch.
+"""
+
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List
+
+from database import SessionLocal
+from crud import iter_articles_with_details
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+CSV_COLUMNS = ["id", "title", "link", "abstract", "categories"]
+
+
+def export_batches(batch_size: int) -> Iterator[List[Dict]]:
+    """Yield article batches from a dedicated session that lives as long as the stream."""
+    db = SessionLocal()
+    try:
+        yield from iter_articles_with_details(db, batch_size=batch_size)
+    finally:
+        db.close()
+
+
+def to_ndjson(batches: Iterable[List[Dict]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in batch).encode("utf-8")
+
+
+def to_csv(batches: Iterable[List[Dict]]) -> Iterator[bytes]:
+    """One row per article; multiple abstracts are joined by a blank line, categories by ';'."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for batch in batches:
+        for item in batch:
+            writer.writerow([
+                item["id"],
+                item["title"],
+                item["link"],
+                "\n\n".join(a["abstract"] or "" for a in item["abstracts"]),
+                ";".join(item["categories"]),
+            ])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator.
+
+    tell() reports the total number of bytes written so far, which the Parquet
+    writer needs to record correct column chunk offsets in the footer.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def to_parquet(batches: Iterable[List[Dict]]) -> Iterator[bytes]:
+    """Write one Parquet row group per batch (requires the optional pyarrow package)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("link", pa.string()),
+        ("abstracts", pa.list_(pa.string())),
+        ("categories", pa.list_(pa.string())),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            table = pa.table({
+                "id": [item["id"] for item in batch],
+                "title": [item["title"] for item in batch],
+                "link": [item["link"] for item in batch],
+                "abstracts": [[a["abstract"] for a in item["abstracts"]] for item in batch],
+                "categories": [item["categories"] for item in batch],
+            }, schema=schema)
+            writer.write_table(table)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+SERIALIZERS = {
+    "ndjson": to_ndjson,
+    "csv": to_csv,
+    "parquet": to_parquet,
+}
@@ -0,0 +1,512 @@
+"""
+Background jobs for long-running AI and ingestion work.
+
+POST /jobs stores a row in the jobs table and returns at once. Worker
+processes (python worker.py) poll the table, claim queued jobs and run them;
+throughput scales by starting more workers, on any machine that reaches the
+database. GET /jobs/{id} reports status, progress and an ETA.
+
+- Claiming is a conditional UPDATE (status still "queued"), so two workers
+  never run the same job and no row locks are needed.
+- A running job's worker updates heartbeat_at every JOB_HEARTBEAT_INTERVAL
+  seconds. A job whose heartbeat is older than JOB_STALE_SECONDS (its worker
+  died) is requeued, or failed once it is out of attempts.
+- A failed attempt is retried up to max_attempts times, after a backoff of
+  JOB_RETRY_BACKOFF seconds doubled per attempt.
+- Cancelling a queued job is immediate. For a running job the worker sees
+  cancel_requested at its next heartbeat or progress update and stops it.
+- Model errors are not swallowed by the handlers: they fail the attempt, so
+  the job is retried instead of succeeding with error text in its result.
+
+Job kinds: summarize, classify, scrape and reindex (see the handlers below).
+Handlers are coroutines taking (JobContext, params) and returning a JSON
+result. A kind may register a cleanup(job_id), run once the job is finished
+(succeeded, failed or cancelled) and will not be retried.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import or_, update, text
+
+from config import (
+    JOB_MAX_ATTEMPTS, JOB_RETRY_BACKOFF, JOB_HEARTBEAT_INTERVAL, JOB_STALE_SECONDS, BATCH_MAX_IDS,
+    SCRAPE_SPOOL_DIR,
+)
+from database import SessionLocal, engine
+from models import Base, Article, Abstract, Job, ScrapedPage
+from sections import sections_text
+from tracing import start_trace
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+class InvalidJob(ValueError):
+    """Unknown job kind or invalid params; maps to a 400."""
+
+
+def utcnow() -> datetime:
+    # Naive UTC, as stored in the jobs table
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# kind -> (handler, params validator, cleanup)
+JOB_KINDS: Dict[str, tuple] = {}
+
+
+def job_kind(name: str, validate: Callable[[dict], None] = None, cleanup: Callable[[int], None] = None):
+    def register(handler):
+        JOB_KINDS[name] = (handler, validate, cleanup)
+        return handler
+    return register
+
+
+def _id_list(params: dict, key: str = "article_ids") -> list:
+    ids = params.get(key)
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+        raise InvalidJob(f"params.{key} must be a non-empty list of integers")
+    if len(ids) > BATCH_MAX_IDS:
+        raise InvalidJob(f"params.{key} accepts at most {BATCH_MAX_IDS} ids")
+    return ids
+
+
+# Job table operations (API side)
+
+def enqueue_job(db, kind: str, params: dict = None, max_attempts: int = None) -> Job:
+    """Validate and store a new queued job."""
+    params = params or {}
+    if kind not in JOB_KINDS:
+        raise InvalidJob(f"Unknown job kind {kind!r}. Choose from: {', '.join(JOB_KINDS)}")
+    validate = JOB_KINDS[kind][1]
+    if validate:
+        validate(params)
+    job = Job(kind=kind, params=params, status=QUEUED, max_attempts=max(1, max_attempts or JOB_MAX_ATTEMPTS))
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_job(db, job_id: int) -> Optional[Job]:
+    return db.get(Job, job_id)
+
+
+def list_jobs(db, status: str = None, kind: str = None, limit: int = 50):
+    query = db.query(Job)
+    if status:
+        query = query.filter(Job.status == status)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return query.order_by(Job.id.desc()).limit(limit).all()
+
+
+def cancel_job(db, job: Job) -> Job:
+    """Cancel a queued job now; ask the worker to stop a running one."""
+    if job.status == QUEUED:
+        db.execute(
+            update(Job).where(Job.id == job.id, Job.status == QUEUED)
+            .values(status=CANCELLED, finished_at=utcnow(), cancel_requested=True)
+        )
+    elif job.status == RUNNING:
+        job.cancel_requested = True
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def job_view(job: Job) -> dict:
+    """Job row as a response dict, with progress as a fraction and an ETA."""
+    progress = None
+    eta_seconds = None
+    if job.progress_total:
+        progress = min(1.0, job.progress_done / job.progress_total)
+        if job.status == RUNNING and job.started_at and 0 < progress < 1:
+            elapsed = (utcnow() - job.started_at).total_seconds()
+            eta_seconds = round(elapsed * (1 - progress) / progress, 1)
+    if job.status == SUCCEEDED:
+        progress = 1.0
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params,
+        "result": job.result,
+        "error": job.error,
+        "progress": progress,
+        "progress_done": job.progress_done,
+        "progress_total": job.progress_total,
+        "eta_seconds": eta_seconds,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "cancel_requested": job.cancel_requested,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+# Worker side
+
+def requeue_stale_jobs(db) -> int:
+    """Take running jobs back from workers that stopped sending heartbeats."""
+    cutoff = utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    stale = (Job.status == RUNNING) & (Job.heartbeat_at < cutoff)
+    failed = db.execute(
+        update(Job).where(stale, Job.attempts >= Job.max_attempts)
+        .values(status=FAILED, error="Worker stopped responding", finished_at=utcnow())
+    ).rowcount
+    requeued = db.execute(
+        update(Job).where(stale, Job.attempts < Job.max_attempts)
+        .values(status=QUEUED, worker=None, error="Worker stopped responding")
+    ).rowcount
+    db.commit()
+    if failed or requeued:
+        logger.warning("Stale jobs: %d requeued, %d failed", requeued, failed)
+    return failed + requeued
+
+
+def claim_job(db, worker_id: str) -> Optional[Job]:
+    """Claim the oldest runnable queued job for this worker, or return None."""
+    now = utcnow()
+    candidates = [
+        row[0] for row in db.query(Job.id)
+        .filter(Job.status == QUEUED, or_(Job.run_after.is_(None), Job.run_after <= now))
+        .order_by(Job.id)
+        .limit(8)
+        .all()
+    ]
+    for job_id in candidates:
+        # A retried attempt starts its progress over
+        claimed = db.execute(
+            update(Job).where(Job.id == job_id, Job.status == QUEUED)
+            .values(
+                status=RUNNING, worker=worker_id, attempts=Job.attempts + 1, started_at=now, heartbeat_at=now,
+                progress_done=0,
+            )
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+    return None
+
+
+class JobContext:
+    """What a handler gets: its params, the LLM processor and progress reporting."""
+
+    def __init__(self, job_id: int, processor=None):
+        self.job_id = job_id
+        self.processor = processor
+        self._last_write = 0.0
+
+    def _update(self, **values) -> bool:
+        """Write values to the job row; returns whether cancellation was requested."""
+        with SessionLocal() as db:
+            db.execute(update(Job).where(Job.id == self.job_id).values(heartbeat_at=utcnow(), **values))
+            db.commit()
+            return bool(db.query(Job.cancel_requested).filter(Job.id == self.job_id).scalar())
+
+    def progress_sync(self, done: int, total: int = None, force: bool = False) -> None:
+        """Record progress (at most once a second unless forced); raises JobCancelled if cancelled.
+
+        Blocks on the database: for handler code running in a thread. Coroutines
+        await progress instead.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_write < 1.0 and (total is None or done < total):
+            return
+        self._last_write = now
+        values = {"progress_done": done}
+        if total is not None:
+            values["progress_total"] = total
+        if self._update(**values):
+            raise JobCancelled()
+
+    async def progress(self, done: int, total: int = None, force: bool = False) -> None:
+        """progress_sync without blocking the event loop."""
+        await asyncio.to_thread(self.progress_sync, done, total, force)
+
+    def heartbeat(self) -> bool:
+        return self._update()
+
+
+def _finish(job_id: int, **values) -> None:
+    with SessionLocal() as db:
+        db.execute(update(Job).where(Job.id == job_id).values(**values))
+        db.commit()
+
+
+async def _clean_up(job: Job) -> None:
+    """Run the kind's cleanup for a job that will not run again."""
+    cleanup = JOB_KINDS[job.kind][2]
+    if cleanup is None:
+        return
+    try:
+        await asyncio.to_thread(cleanup, job.id)
+    except Exception as e:
+        logger.warning("Job %s (%s) cleanup failed: %s", job.id, job.kind, e)
+
+
+async def run_job(job: Job, processor=None) -> str:
+    """Run a claimed job to completion, retry or cancellation; returns its new status.
+
+    The job runs under a trace of its own, so its log lines carry one trace id.
+    """
+    with start_trace(f"job.{job.kind}", job_id=job.id):
+        return await _run_job(job, processor)
+
+
+async def _run_job(job: Job, processor) -> str:
+    handler = JOB_KINDS[job.kind][0] if job.kind in JOB_KINDS else None
+    if handler is None:
+        _finish(job.id, status=FAILED, error=f"Unknown job kind {job.kind!r}", finished_at=utcnow())
+        return FAILED
+
+    context = JobContext(job.id, processor)
+    task = asyncio.ensure_future(handler(context, dict(job.params or {})))
+    cancelled = False
+    try:
+        while not task.done():
+            done, _ = await asyncio.wait({task}, timeout=JOB_HEARTBEAT_INTERVAL)
+            if not done and await asyncio.to_thread(context.heartbeat):
+                cancelled = True
+                task.cancel()
+        result = await task
+    except (JobCancelled, asyncio.CancelledError):
+        if isinstance(sys.exc_info()[1], asyncio.CancelledError) and not cancelled:
+            # The worker is shutting down: stop the handler and give the job
+            # back without counting the attempt. The handler finishes stopping
+            # its work first, so another worker cannot claim the job while it runs
+            task.cancel()
+            await asyncio.wait({task})
+            _finish(job.id, status=QUEUED, worker=None, attempts=Job.attempts - 1)
+            logger.info("Job %s (%s) requeued on worker shutdown", job.id, job.kind)
+            raise
+        _finish(job.id, status=CANCELLED, finished_at=utcnow())
+        logger.info("Job %s (%s) cancelled", job.id, job.kind)
+        await _clean_up(job)
+        return CANCELLED
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        if job.attempts < job.max_attempts:
+            delay = JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            _finish(job.id, status=QUEUED, worker=None, error=error, run_after=utcnow() + timedelta(seconds=delay))
+            logger.warning("Job %s (%s) attempt %d failed, retrying in %.0fs: %s", job.id, job.kind, job.attempts, delay, error)
+            return QUEUED
+        _finish(job.id, status=FAILED, error=error, finished_at=utcnow())
+        logger.error("Job %s (%s) failed: %s", job.id, job.kind, error)
+        await _clean_up(job)
+        return FAILED
+
+    _finish(job.id, status=SUCCEEDED, result=result, error=None, finished_at=utcnow())
+    logger.info("Job %s (%s) succeeded", job.id, job.kind)
+    await _clean_up(job)
+    return SUCCEEDED
+
+
+# Handlers
+
+def _validate_summarize(params: dict) -> None:
+    _id_list(params)
+
+
+@job_kind("summarize", _validate_summarize)
+async def summarize_job(context: JobContext, params: dict) -> dict:
+    """Summarize articles: params {"article_ids": [...]}.
+
+    Uses the scraped page when a scrape job stored one for the article's link:
+    its body sections (sections.SUMMARY_SECTIONS), or its text for pages
+    scraped without sections. Else the abstract. Result:
+    {"summaries": {id: text}, "missing": [ids]}.
+    """
+    ids = _id_list(params)
+    with SessionLocal() as db:
+        rows = (
+            db.query(Article.id, ScrapedPage.sections, ScrapedPage.text, Abstract.abstract)
+            .outerjoin(ScrapedPage, ScrapedPage.url == Article.link)
+            .outerjoin(Abstract, Abstract.id_article == Article.id)
+            .filter(Article.id.in_(ids))
+            .all()
+        )
+    texts = {}
+    for article_id, sections, page_text, abstract in rows:
+        article_text = (sections and sections_text(sections)) or page_text or abstract
+        if article_text:
+            texts[article_id] = article_text
+    missing = [i for i in ids if i not in texts]
+
+    summaries = {}
+    await context.progress(0, len(texts), force=True)
+    # Chunk summaries inside one article already run in parallel; one article
+    # at a time keeps the job's share of the batch slots bounded
+    for article_id, article_text in texts.items():
+        summaries[str(article_id)] = await context.processor.summarize(article_text, raise_errors=True)
+        await context.progress(len(summaries), len(texts))
+    return {"summaries": summaries, "missing": missing}
+
+
+def _validate_classify(params: dict) -> None:
+    if "article_ids" in params:
+        _id_list(params)
+    elif not isinstance(params.get("limit", 50), int) or not isinstance(params.get("skip", 0), int):
+        raise InvalidJob("params.limit and params.skip must be integers")
+
+
+@job_kind("classify", _validate_classify)
+async def classify_job(context: JobContext, params: dict) -> dict:
+    """Assign categories to articles by title: params {"article_ids": [...]} or {"limit": 50, "skip": 0}."""
+    from populate_article_categories import (
+        load_category_specs, fetch_articles, fetch_articles_by_ids, fetch_existing_pairs, classify_titles,
+        persist_article_categories,
+    )
+
+    categories = load_category_specs("categories.json")
+    with SessionLocal() as db:
+        if "article_ids" in params:
+            articles = fetch_articles_by_ids(db, _id_list(params))
+        else:
+            articles = fetch_articles(db, limit=params.get("limit", 50), skip=params.get("skip", 0))
+        existing = fetch_existing_pairs(db)
+    await context.progress(0, len(articles), force=True)
+    id_to_categories = await classify_titles(
+        articles, categories, context.processor, on_progress=context.progress, raise_errors=True,
+    )
+    with SessionLocal() as db:
+        inserted = persist_article_categories(db, id_to_categories, existing)
+    return {"articles": len(articles), "inserted": inserted}
+
+
+def _validate_scrape(params: dict) -> None:
+    if "urls" in params:
+        urls = params["urls"]
+        if not isinstance(urls, list) or not urls or not all(isinstance(u, str) and u.startswith(("http://", "https://")) for u in urls):
+            raise InvalidJob("params.urls must be a non-empty list of http(s) URLs")
+        if len(urls) > BATCH_MAX_IDS:
+            raise InvalidJob(f"params.urls accepts at most {BATCH_MAX_IDS} URLs")
+    else:
+        _id_list(params)
+    for key, default, limit in (("concurrency", 3, 32), ("processes", 1, 64)):
+        value = params.get(key, default)
+        if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= limit:
+            raise InvalidJob(f"params.{key} must be an integer between 1 and {limit}")
+
+
+def _scrape_spool_dir(job_id: int) -> str:
+    return os.path.join(SCRAPE_SPOOL_DIR, f"job-{job_id}")
+
+
+def _clean_up_scrape(job_id: int) -> None:
+    # Attempts of a sharded scrape resume from the spool; once the job is over it goes
+    shutil.rmtree(_scrape_spool_dir(job_id), ignore_errors=True)
+
+
+@job_kind("scrape", _validate_scrape, _clean_up_scrape)
+async def scrape_job(context: JobContext, params: dict) -> dict:
+    """Scrape pages into scraped_pages: params {"urls": [...]} or {"article_ids": [...]} (their links).
+
+    Optional "concurrency" (default 3) pages load at once. With "processes" > 1
+    the URLs are split across that many processes (scrape_shards), each
+    loading "concurrency" pages at once; a retried attempt resumes from the
+    job's spool directory, which is removed once the job is finished. Result: {"scraped": n, "failed": [{"url", "error"}]}.
+    """
+    if "urls" in params:
+        urls = list(dict.fromkeys(params["urls"]))
+    else:
+        with SessionLocal() as db:
+            urls = [row[0] for row in db.query(Article.link).filter(Article.id.in_(_id_list(params))).all() if row[0]]
+    concurrency = params.get("concurrency", 3)
+    processes = params.get("processes", 1)
+    if processes > 1:
+        return await _scrape_sharded_job(context, urls, processes, concurrency)
+
+    from webScrapper import WebScraper
+
+    scraper = WebScraper()
+    await scraper.setup()
+    failed = []
+    scraped = 0
+    try:
+        await context.progress(0, len(urls), force=True)
+        for start in range(0, len(urls), concurrency):
+            pages = await asyncio.gather(*(scraper.scrape_page(url) for url in urls[start:start + concurrency]))
+            with SessionLocal() as db:
+                for page in pages:
+                    if page["success"]:
+                        db.merge(ScrapedPage(url=page["url"], title=page.get("title"), text=page.get("text"), sections=page.get("sections")))
+                        scraped += 1
+                    else:
+                        failed.append({"url": page["url"], "error": page.get("error")})
+                db.commit()
+            await context.progress(start + len(pages), len(urls))
+    finally:
+        await scraper.close()
+    return {"scraped": scraped, "failed": failed}
+
+
+async def _scrape_sharded_job(context: JobContext, urls: list, processes: int, concurrency: int) -> dict:
+    from scrape_shards import scrape_sharded, store_spool
+
+    spool_dir = _scrape_spool_dir(context.job_id)
+    stop = threading.Event()
+    scraping = asyncio.ensure_future(asyncio.to_thread(
+        scrape_sharded, urls, processes, concurrency, spool_dir,
+        on_progress=context.progress_sync, stop=stop,
+    ))
+    try:
+        outcome = await asyncio.shield(scraping)
+    except asyncio.CancelledError:
+        # Cancelled or the worker is shutting down: the thread cannot be
+        # cancelled, so tell it to terminate the shard processes and wait for that
+        stop.set()
+        await asyncio.gather(scraping, return_exceptions=True)
+        raise
+    # Pages go from the spool to the database in batches, never all in memory at once
+    scraped = await asyncio.to_thread(store_spool, spool_dir, urls)
+    return {"scraped": scraped, "failed": outcome["failed"]}
+
+
+def _validate_reindex(params: dict) -> None:
+    tables = params.get("tables")
+    if tables is not None:
+        unknown = [t for t in tables if t not in Base.metadata.tables] if isinstance(tables, list) else ["?"]
+        if unknown:
+            raise InvalidJob(f"Unknown tables: {', '.join(map(str, unknown))}. Choose from: {', '.join(Base.metadata.tables)}")
+
+
+@job_kind("reindex", _validate_reindex)
+async def reindex_job(context: JobContext, params: dict) -> dict:
+    """Rebuild indexes and refresh planner statistics: params {"tables": [...]} (default: all tables)."""
+    tables = params.get("tables") or list(Base.metadata.tables)
+    timings = {}
+
+    def reindex(table: str) -> None:
+        # REINDEX and ANALYZE manage their own transactions
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            quoted = engine.dialect.identifier_preparer.quote(table)
+            conn.execute(text(f"REINDEX TABLE {quoted}" if engine.dialect.name == "postgresql" else f"REINDEX {quoted}"))
+            conn.execute(text(f"ANALYZE {quoted}"))
+
+    await context.progress(0, len(tables), force=True)
+    for done, table in enumerate(tables, 1):
+        started = time.perf_counter()
+        await asyncio.to_thread(reindex, table)
+        timings[table] = round(time.perf_counter() - started, 3)
+        await context.progress(done, len(tables))
+    return {"seconds": timings}
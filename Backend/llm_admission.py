@@ -0,0 +1,216 @@
+"""
+Admission control in front of the model server.
+
+LocalOpenAIProcessor asks an AdmissionController for a slot before every
+generation. At most `max_concurrency` generations are in flight; the rest wait
+in a priority queue where interactive requests (/chat) always go ahead of
+batch work (summarization, classification). Batch requests never take the
+last `interactive_reserved` slots, so a chat request waits for at most one
+generation to finish even while batch jobs keep the model busy.
+
+Within a priority, waiting requests are served round-robin across clients, so
+one client submitting many requests cannot starve the others. A request is
+rejected instead of queued when the queue for its priority is full (503) or,
+for interactive requests, when its client already has `max_queue_per_client`
+requests waiting (429); an interactive request that waits longer than
+`queue_timeout` is dropped (503). Batch callers are our own background jobs,
+so they are only bounded by the queue size. Rejections carry a Retry-After
+estimate derived from recent generation times and the queue depth.
+
+The controller is asyncio-based and must be used from one event loop at a time.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from metrics import counter, histogram
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Dispatch order: earlier priorities are always served first
+PRIORITIES = (INTERACTIVE, BATCH)
+
+LLM_ADMISSION_WAIT = histogram(
+    "llm_admission_wait_seconds", "Time requests spent queued for a model slot.", ("priority",),
+)
+LLM_ADMISSION_REJECTED = counter(
+    "llm_admission_rejected_total", "Requests turned away by the admission controller.", ("priority", "reason"),
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted; maps to an HTTP status with Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("future", "priority", "client", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, priority: str, client: str):
+        self.future = future
+        self.priority = priority
+        self.client = client
+        self.enqueued_at = time.perf_counter()
+
+
+class _FairQueue:
+    """Per-client FIFO queues served round-robin."""
+
+    def __init__(self):
+        self._clients: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self.size = 0
+
+    def waiting(self, client: str) -> int:
+        queue = self._clients.get(client)
+        return len(queue) if queue else 0
+
+    def push(self, waiter: _Waiter) -> None:
+        self._clients.setdefault(waiter.client, deque()).append(waiter)
+        self.size += 1
+
+    def pop(self) -> Optional[_Waiter]:
+        if not self._clients:
+            return None
+        client, queue = next(iter(self._clients.items()))
+        waiter = queue.popleft()
+        # Rotate the client to the back so the next pop serves someone else
+        del self._clients[client]
+        if queue:
+            self._clients[client] = queue
+        self.size -= 1
+        return waiter
+
+    def remove(self, waiter: _Waiter) -> None:
+        queue = self._clients.get(waiter.client)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            self.size -= 1
+            if not queue:
+                del self._clients[waiter.client]
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        interactive_reserved: int = 1,
+        max_queue: int = 64,
+        max_queue_per_client: int = 8,
+        queue_timeout: float = 30.0,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        # Batch work may use every slot but the reserved ones (and at least one)
+        self.batch_limit = max(1, self.max_concurrency - max(0, interactive_reserved))
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.queue_timeout = queue_timeout
+        self.in_flight: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._queues: Dict[str, _FairQueue] = {p: _FairQueue() for p in PRIORITIES}
+        # Moving average of generation time, for Retry-After estimates
+        self._service_time = 2.0
+
+    def stats(self) -> Dict[str, int]:
+        stats = {}
+        for priority in PRIORITIES:
+            stats[f"{priority}_in_flight"] = self.in_flight[priority]
+            stats[f"{priority}_queued"] = self._queues[priority].size
+        return stats
+
+    def _total_in_flight(self) -> int:
+        return sum(self.in_flight.values())
+
+    def _has_capacity(self, priority: str) -> bool:
+        total = self._total_in_flight()
+        if total >= self.max_concurrency:
+            return False
+        return priority == INTERACTIVE or self.in_flight[BATCH] < self.batch_limit
+
+    def _retry_after(self, priority: str) -> int:
+        # Everything queued at this priority or ahead of it has to run first
+        ahead = 0
+        for p in PRIORITIES:
+            ahead += self._queues[p].size
+            if p == priority:
+                break
+        slots = self.max_concurrency if priority == INTERACTIVE else self.batch_limit
+        return max(1, math.ceil((ahead + 1) * self._service_time / slots))
+
+    def _reject(self, priority: str, status_code: int, reason: str, detail: str) -> AdmissionRejected:
+        LLM_ADMISSION_REJECTED.inc(priority=priority, reason=reason)
+        return AdmissionRejected(status_code, detail, self._retry_after(priority))
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, highest priority first."""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue.size and self._has_capacity(priority):
+                waiter = queue.pop()
+                if waiter.future.done():
+                    continue
+                self.in_flight[priority] += 1
+                waiter.future.set_result(None)
+
+    def _release(self, priority: str, started: float) -> None:
+        self.in_flight[priority] -= 1
+        self._service_time = 0.8 * self._service_time + 0.2 * (time.perf_counter() - started)
+        self._dispatch()
+
+    async def _acquire(self, priority: str, client: str) -> None:
+        queue = self._queues[priority]
+        # Run immediately only if nobody at this priority or above is waiting
+        ahead = sum(self._queues[p].size for p in PRIORITIES[:PRIORITIES.index(priority) + 1])
+        if not ahead and self._has_capacity(priority):
+            self.in_flight[priority] += 1
+            LLM_ADMISSION_WAIT.observe(0.0, priority=priority)
+            return
+
+        if priority == INTERACTIVE and queue.waiting(client) >= self.max_queue_per_client:
+            raise self._reject(priority, 429, "client_queue_full", "Too many queued requests for this client")
+        if queue.size >= self.max_queue:
+            raise self._reject(priority, 503, "queue_full", "The model server is overloaded")
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, client)
+        queue.push(waiter)
+        timeout = self.queue_timeout if priority == INTERACTIVE else None
+        try:
+            done, _ = await asyncio.wait({waiter.future}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not done:
+            self._abandon(waiter)
+            raise self._reject(priority, 503, "queue_timeout", "Timed out waiting for the model server")
+        LLM_ADMISSION_WAIT.observe(time.perf_counter() - waiter.enqueued_at, priority=priority)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter.future.done() and not waiter.future.cancelled():
+            # A slot was granted just as the caller gave up; hand it on
+            self.in_flight[waiter.priority] -= 1
+            self._dispatch()
+        else:
+            waiter.future.cancel()
+            self._queues[waiter.priority].remove(waiter)
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE, client: str = "anonymous"):
+        """Hold one generation slot for the duration of the block.
+
+        Raises AdmissionRejected when the request is not admitted.
+        """
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority {priority!r}")
+        await self._acquire(priority, client)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(priority, started)
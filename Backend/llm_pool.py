@@ -0,0 +1,281 @@
+"""
+Pool of OpenAI-compatible model servers with failover.
+
+LocalOpenAIProcessor sends every completion through an EndpointPool:
+
+- Routing: each attempt goes to the available endpoint with the fewest
+  outstanding requests (ties are broken at random). Requests that share a
+  prompt prefix (an affinity key, see moduleAI.prefix_key) prefer the same
+  endpoint while it is at most `affinity_slack` requests busier than the
+  least-loaded one, so servers with prefix/KV caching see the prefix again.
+- Circuit breaker: `failure_threshold` consecutive failures (connection
+  errors, timeouts, 5xx) open an endpoint's breaker and it receives no
+  traffic. After `cooldown` seconds, or as soon as a health check succeeds,
+  it goes half-open. In that state one trial request is let through, and the
+  trial's outcome closes or re-opens the breaker.
+- Health checks: a background thread polls GET {base_url}/models every
+  `health_interval` seconds. Endpoints that fail it are skipped until they
+  pass again.
+- Retries: chat completions have no side effects, so a failed attempt is
+  retried up to `max_attempts` times, on endpoints not tried yet when there
+  are any. 4xx errors other than 429 are returned as they are.
+
+Endpoints are given as "base_url" or "base_url=model" (e.g. LLM_ENDPOINTS=
+"http://10.0.0.5:1234/v1,http://10.0.0.6:1234/v1=qwen2.5-7b-instruct").
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import counter, gauge
+from tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+LLM_ENDPOINT_REQUESTS = counter(
+    "llm_endpoint_requests_total", "Completion attempts by model server endpoint and outcome.", ("endpoint", "outcome"),
+)
+
+
+class NoEndpointAvailable(Exception):
+    """Every endpoint is unhealthy or has an open circuit breaker."""
+
+
+class Endpoint:
+    def __init__(self, base_url: str, model: str):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.outstanding = 0
+        self.healthy = True
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        # Token of the half-open trial request in flight, if any (see EndpointPool.acquire)
+        self.trial: Optional[object] = None
+        self._client = None
+
+    @property
+    def client(self):
+        # openai is imported on first use; the pool does its own retries
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(base_url=self.base_url, api_key="lm-studio", max_retries=0)
+        return self._client
+
+    def stats(self) -> Dict:
+        return {
+            "base_url": self.base_url,
+            "model": self.model,
+            "outstanding": self.outstanding,
+            "healthy": self.healthy,
+            "breaker": self.state,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+def parse_endpoints(spec: str, default_model: str) -> List[Endpoint]:
+    """Parse a comma-separated "base_url[=model]" list."""
+    endpoints = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        base_url, _, model = item.partition("=")
+        endpoints.append(Endpoint(base_url.strip(), model.strip() or default_model))
+    return endpoints
+
+
+def is_retryable(error: Exception) -> bool:
+    """Connection problems, timeouts, 429 and 5xx are worth another attempt."""
+    import openai
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def counts_as_failure(error: Exception) -> bool:
+    """Errors that say the endpoint itself is unwell (a 429 only says it is busy)."""
+    import openai
+    return is_retryable(error) and not isinstance(error, openai.RateLimitError)
+
+
+class EndpointPool:
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        max_attempts: int = 3,
+        health_interval: float = 10.0,
+        health_timeout: float = 2.0,
+        affinity_slack: int = 1,
+    ):
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.max_attempts = max(1, max_attempts)
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.affinity_slack = max(0, affinity_slack)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [endpoint.stats() for endpoint in self.endpoints]
+
+    def _available(self, endpoint: Endpoint, now: float) -> bool:
+        if not endpoint.healthy:
+            return False
+        if endpoint.state == OPEN and now - endpoint.opened_at >= self.cooldown:
+            endpoint.state = HALF_OPEN
+        if endpoint.state == HALF_OPEN:
+            return endpoint.trial is None
+        return endpoint.state == CLOSED
+
+    def acquire(self, exclude=(), affinity: Optional[str] = None) -> Tuple[Endpoint, Optional[object]]:
+        """Pick the least-loaded available endpoint, preferring ones not in exclude.
+
+        With an affinity key, endpoints within affinity_slack of the least
+        loaded are ranked by rendezvous hash, so a key keeps landing on the
+        same endpoint and moves as little as possible when endpoints come and go.
+
+        Returns (endpoint, trial). trial is a token when this attempt is the
+        half-open trial and None otherwise; pass it back to release.
+        """
+        with self._lock:
+            now = time.monotonic()
+            available = [e for e in self.endpoints if self._available(e, now)]
+            candidates = [e for e in available if e not in exclude] or available
+            if not candidates:
+                raise NoEndpointAvailable("No healthy model server endpoint is available")
+            fewest = min(e.outstanding for e in candidates)
+            if affinity is None:
+                endpoint = random.choice([e for e in candidates if e.outstanding == fewest])
+            else:
+                near = [e for e in candidates if e.outstanding <= fewest + self.affinity_slack]
+                endpoint = max(near, key=lambda e: hashlib.sha1(f"{affinity}|{e.base_url}".encode()).digest())
+            endpoint.outstanding += 1
+            trial = None
+            if endpoint.state == HALF_OPEN:
+                trial = endpoint.trial = object()
+            return endpoint, trial
+
+    def release(self, endpoint: Endpoint, failed: Optional[bool], trial: Optional[object] = None) -> None:
+        """Return an attempt's endpoint. failed is None when the attempt did not
+        complete (it was cancelled), which says nothing about the endpoint."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            # Only the trial attempt itself decides the half-open breaker; requests
+            # that started before it opened finish without touching it
+            was_trial = trial is not None and trial is endpoint.trial
+            if was_trial:
+                endpoint.trial = None
+            if failed is None:
+                # A cancelled trial leaves the breaker half-open for the next request to try
+                return
+            if not failed:
+                endpoint.consecutive_failures = 0
+                if was_trial:
+                    endpoint.state = CLOSED
+                    logger.info("LLM endpoint %s recovered, circuit closed", endpoint.base_url)
+                return
+            endpoint.consecutive_failures += 1
+            if was_trial or (endpoint.state == CLOSED and endpoint.consecutive_failures >= self.failure_threshold):
+                endpoint.state = OPEN
+                endpoint.opened_at = time.monotonic()
+                logger.warning(
+                    "LLM endpoint %s failing (%d in a row), circuit opened", endpoint.base_url, endpoint.consecutive_failures,
+                )
+
+    async def call(self, operation: str, fn: Callable, affinity: Optional[str] = None):
+        """Run fn(client, model) in a worker thread, failing over between endpoints.
+
+        Raises the last error when every attempt fails, or NoEndpointAvailable.
+        """
+        tried = []
+        for attempt in range(1, self.max_attempts + 1):
+            endpoint, trial = self.acquire(exclude=tried, affinity=affinity)
+            # Stays None if the attempt is cancelled (asyncio.CancelledError is not an Exception)
+            failed = None
+            try:
+                if endpoint in tried:
+                    # Only endpoints that already failed are left; back off a little
+                    await asyncio.sleep(0.2 * attempt)
+                with start_span(f"llm.{operation}.attempt", endpoint=endpoint.base_url, attempt=attempt):
+                    response = await asyncio.to_thread(fn, endpoint.client, endpoint.model)
+                failed = False
+                LLM_ENDPOINT_REQUESTS.inc(endpoint=endpoint.base_url, outcome="ok")
+                return response
+            except Exception as e:
+                retryable = is_retryable(e)
+                failed = counts_as_failure(e)
+                LLM_ENDPOINT_REQUESTS.inc(endpoint=endpoint.base_url, outcome="retryable_error" if retryable else "error")
+                if not retryable or attempt == self.max_attempts:
+                    raise
+                logger.warning("LLM endpoint %s attempt %d failed (%s), retrying", endpoint.base_url, attempt, type(e).__name__)
+                tried.append(endpoint)
+            finally:
+                self.release(endpoint, failed, trial)
+
+    def check_health(self) -> None:
+        """Probe every endpoint once."""
+        for endpoint in self.endpoints:
+            try:
+                urllib.request.urlopen(endpoint.base_url + "/models", timeout=self.health_timeout).close()
+                ok = True
+            except Exception:
+                ok = False
+            with self._lock:
+                if ok != endpoint.healthy:
+                    logger.log(
+                        logging.INFO if ok else logging.WARNING,
+                        "LLM endpoint %s is %s", endpoint.base_url, "healthy" if ok else "unhealthy",
+                    )
+                endpoint.healthy = ok
+                if ok and endpoint.state == OPEN:
+                    # Let one request through instead of waiting out the cooldown
+                    endpoint.state = HALF_OPEN
+
+    def _health_loop(self) -> None:
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def start_health_checks(self) -> None:
+        if self.health_interval <= 0 or (self._health_thread and self._health_thread.is_alive()):
+            return
+        self._stop.clear()
+        self._health_thread = threading.Thread(target=self._health_loop, name="llm-health", daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self) -> None:
+        self._stop.set()
+
+
+def install_pool_gauge(get_pool: Callable[[], Optional[EndpointPool]]) -> None:
+    """Export per-endpoint outstanding requests, health and breaker state."""
+    def collect():
+        pool = get_pool()
+        if pool is None:
+            return {}
+        values = {}
+        for stats in pool.stats():
+            values[(stats["base_url"], "outstanding")] = stats["outstanding"]
+            values[(stats["base_url"], "healthy")] = int(stats["healthy"])
+            values[(stats["base_url"], "breaker_open")] = int(stats["breaker"] != CLOSED)
+        return values
+
+    gauge("llm_endpoint", "Model server endpoints: outstanding requests, health and open breakers.", collect, ("endpoint", "stat"))
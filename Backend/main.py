@@ -1,21 +1,103 @@
-from fastapi import FastAPI, Depends, HTTPException
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from database import get_db, engine
-from models import Base
+from models import Base, missing_columns
 from schemas import Article, ArticleCreate, ArticleUpdate, Abstract, AbstractCreate, AbstractUpdate, ArticleWithAbstracts, AbstractSearchResult, ArticleSearchResult, CategoryCount
+from schemas import ArticleBatchRequest, AbstractBatchRequest, ArticleBatchResult, ArticleWithDetails
+from schemas import BulkDeleteRequest, BulkItemResult
 from crud import (
     get_article, get_articles, create_article, update_article, delete_article, search_articles,
     get_abstract, get_abstracts, create_abstract, update_abstract, delete_abstract, search_abstracts,
-    get_abstracts_by_article, search_articles_by_query_and_categories, count_articles_by_category
+    get_abstracts_by_article, search_articles_by_query_and_categories, count_articles_by_category,
+    get_articles_batch, get_abstracts_batch, get_articles_with_details,
+    bulk_create_articles, bulk_update_articles, bulk_delete_articles,
+    bulk_create_abstracts, bulk_update_abstracts, bulk_delete_abstracts, get_scraped_page_by_article
 )
-from schemas import ChatRequest, ChatResponse
+from schemas import ChatRequest, ChatResponse, ArticleAnalysisResponse, ArticleSectionsResponse, JobCreate, JobResponse
 from moduleAI import LocalOpenAIProcessor
+from llm_admission import AdmissionRejected, INTERACTIVE
+from llm_pool import install_pool_gauge
+from analysis import ANALYSIS_TEMPLATES, AbstractNotFound, analyze_article
+from sections import SECTION_NAMES, select_sections
+from jobs import InvalidJob, enqueue_job, get_job, list_jobs, cancel_job, job_view, FINISHED
+import asyncio
+import logging
+import os
+import secrets
+import threading
+import uuid
+from config import PROFILE_ADMIN_TOKEN, PROFILE_DIR, PROFILE_INTERVAL_MS
+from config import QUERY_STATS_ENABLED, N_PLUS_ONE_THRESHOLD, BULK_MAX_ITEMS, EXPORT_BATCH_SIZE, EXPORT_MAX_BATCH_SIZE, METRICS_ENABLED, GZIP_MINIMUM_SIZE
+from pool_metrics import pool_metrics
+from metrics import registry, gauge, install_db_metrics, HTTP_REQUEST_DURATION
+from tracing import TracedRoute, start_trace, install_db_tracing, configure_logging
+from profiling import SamplingProfiler
+from serialization import FastJSONResponse, rows_as_dicts, objects_as_dicts, highlight
+from export import EXPORT_FORMATS, SERIALIZERS, export_batches, parquet_available
+from query_stats import install_query_counter, track_queries
+
+# Columns of the Article, AbstractSearchResult and ArticleSearchResult responses
+ARTICLE_FIELDS = ("id", "title", "link")
+
+# Characters of abstract text returned per search result with snippets=true
+SNIPPET_WIDTH = 160
+
+def parse_fields(fields: str = None):
+    """Parse a comma-separated fields= projection into a tuple of ARTICLE_FIELDS."""
+    if not fields or not fields.strip():
+        return ARTICLE_FIELDS
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in ARTICLE_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(ARTICLE_FIELDS)}",
+        )
+    return requested
+
+# Seconds spent in each startup phase, reported once the app is ready
+logger = logging.getLogger("api")
+
+startup_times = {}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_times["import"] = time.perf_counter() - _IMPORT_STARTED
+    started = time.perf_counter()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+    # Tables are created by the migration step (python create_table.py --schema-only),
+    # not on every worker start; only warn if it has not been run
+    try:
+        missing = sorted(set(Base.metadata.tables) - set(inspect(engine).get_table_names()))
+        if missing:
+            logger.warning("Missing tables %s; run `python create_table.py --schema-only`", ", ".join(missing))
+        columns = [f"{c.table.name}.{c.name}" for c in missing_columns(engine)]
+        if columns:
+            logger.warning("Missing columns %s; run `python create_table.py --schema-only`", ", ".join(columns))
+    except Exception as e:
+        logger.warning("Could not check the database schema: %s", e)
 
-app = FastAPI(title="Article API", description="A simple API for managing articles")
+    # Chat endpoint leveraging LocalOpenAIProcessor (LM Studio); the openai client is created on first use
+    app.state.processor = LocalOpenAIProcessor()
+    app.state.processor.pool.start_health_checks()
+
+    startup_times["lifespan"] = time.perf_counter() - started
+    logger.info("Startup: import %.0f ms, lifespan %.0f ms", startup_times["import"] * 1000, startup_times["lifespan"] * 1000)
+    yield
+    app.state.processor.pool.stop_health_checks()
+
+app = FastAPI(title="Article API", description="A simple API for managing articles", lifespan=lifespan)
+app.router.route_class = TracedRoute
+install_db_tracing(engine)
+configure_logging()
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +107,103 @@ app.add_middleware(
     allow_headers=["*"], # Encabezados permitidos
 )
 
+if GZIP_MINIMUM_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
+if QUERY_STATS_ENABLED:
+    install_query_counter(engine)
+
+    @app.middleware("http")
+    async def count_queries(request: Request, call_next):
+        with track_queries() as stats:
+            response = await call_next(request)
+        response.headers["X-Query-Count"] = str(stats.count)
+        for statement, times in stats.repeated(N_PLUS_ONE_THRESHOLD).items():
+            logger.warning("Possible N+1 query on %s %s: %dx %s", request.method, request.url.path, times, statement[:120])
+        return response
+
+if METRICS_ENABLED:
+    install_db_metrics(engine)
+    gauge(
+        "db_pool", "Connection pool statistics (see GET /metrics/pool).",
+        lambda: {(name,): value for name, value in pool_metrics.snapshot(engine).items() if isinstance(value, (int, float))},
+        ("stat",),
+    )
+    gauge(
+        "llm_admission", "In-flight and queued model requests by priority.",
+        lambda: {(name,): value for name, value in app.state.processor.admission.stats().items()} if hasattr(app.state, "processor") else {},
+        ("state",),
+    )
+    install_pool_gauge(lambda: app.state.processor.pool if hasattr(app.state, "processor") else None)
+    gauge(
+        "app_startup_seconds", "Seconds spent importing the app and running the lifespan startup.",
+        lambda: {(phase,): seconds for phase, seconds in startup_times.items()},
+        ("phase",),
+    )
+
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template (/articles/{article_id}) to keep cardinality bounded
+            route = request.scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=request.method,
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
+
+if PROFILE_ADMIN_TOKEN:
+    PROFILE_MODES = ("store", "return")
+    # The sampler sees the whole event loop thread, so one profiled request at a time
+    profile_lock = asyncio.Lock()
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        # ?profile=store|return or X-Profile: store|return
+        mode = request.query_params.get("profile") or request.headers.get("X-Profile")
+        if not mode:
+            return await call_next(request)
+        if not secrets.compare_digest(request.headers.get("X-Admin-Token", ""), PROFILE_ADMIN_TOKEN):
+            return JSONResponse(status_code=403, content={"detail": "Profiling requires a valid X-Admin-Token"})
+        if mode not in PROFILE_MODES:
+            return JSONResponse(status_code=400, content={"detail": f"Unknown profile mode. Use one of: {', '.join(PROFILE_MODES)}"})
+        if profile_lock.locked():
+            return JSONResponse(status_code=409, content={"detail": "Another request is being profiled"})
+
+        # Handlers run on the event loop thread, which is the one being sampled;
+        # other requests running meanwhile still show up in its stacks
+        async with profile_lock:
+            with SamplingProfiler(interval=PROFILE_INTERVAL_MS / 1000, thread_id=threading.get_ident()) as profiler:
+                response = await call_next(request)
+
+        if mode == "return":
+            return PlainTextResponse(profiler.collapsed(), headers={"X-Profile-Scope": "event-loop"})
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        # Server-generated name: the trace id may come from the client
+        path = os.path.join(PROFILE_DIR, f"{uuid.uuid4().hex}.collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profiler.collapsed())
+        response.headers["X-Profile-File"] = path
+        response.headers["X-Profile-Scope"] = "event-loop"
+        return response
+
+# Registered last so it wraps the other middlewares and sees the whole request
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    with start_trace("http.request", request.headers.get("traceparent"), method=request.method, path=request.url.path) as (trace, root):
+        response = await call_next(request)
+        if root is not None:
+            root.set_attribute("status", response.status_code)
+    response.headers["X-Trace-Id"] = trace.trace_id
+    return response
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Article API"}
@@ -36,7 +215,70 @@ async def create_new_article(article: ArticleCreate, db: Session = Depends(get_d
 @app.get("/articles/", response_model=list[Article])
 async def read_articles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     articles = get_articles(db, skip=skip, limit=limit)
-    return articles
+    return FastJSONResponse(objects_as_dicts(articles, ARTICLE_FIELDS))
+
+@app.get("/articles/full/", response_model=list[ArticleWithDetails])
+async def read_articles_with_details(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """
+    List articles with their abstracts and category IDs.
+    
+    Runs a constant number of queries (articles, abstracts, categories) for any page size.
+    
+    - **skip**: Number of articles to skip (default: 0)
+    - **limit**: Maximum number of articles to return (default: 100)
+    """
+    return get_articles_with_details(db, skip=skip, limit=limit)
+
+@app.post("/articles/batch", response_model=list[ArticleBatchResult], response_model_exclude_none=True)
+async def read_articles_batch(payload: ArticleBatchRequest, db: Session = Depends(get_db)):
+    """
+    Fetch many articles by id in a single request.
+    
+    - **ids**: Article IDs to fetch (unknown IDs are skipped, order is preserved)
+    - **include_abstracts**: Also return the abstracts of each article (default: false)
+    - **include_categories**: Also return the category IDs of each article (default: false)
+    """
+    return get_articles_batch(
+        db,
+        article_ids=payload.ids,
+        include_abstracts=payload.include_abstracts,
+        include_categories=payload.include_categories,
+    )
+
+def check_bulk_size(items: list):
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items per bulk request")
+
+# Bulk article endpoints (declared before /articles/{article_id} so "bulk" is not parsed as an id)
+@app.post("/articles/bulk", response_model=list[BulkItemResult], response_model_exclude_none=True)
+async def create_articles_bulk(items: list[dict] = Body(...), db: Session = Depends(get_db)):
+    """
+    Create many articles in a single transaction.
+    
+    Every item is validated as `ArticleCreate`; invalid items are reported and skipped.
+    Returns one status per item, in input order.
+    """
+    check_bulk_size(items)
+    return bulk_create_articles(db, items)
+
+@app.put("/articles/bulk", response_model=list[BulkItemResult], response_model_exclude_none=True)
+async def update_articles_bulk(items: list[dict] = Body(...), db: Session = Depends(get_db)):
+    """
+    Update many articles in a single transaction.
+    
+    Every item is an `ArticleUpdate` plus the `id` of the article to change.
+    """
+    check_bulk_size(items)
+    return bulk_update_articles(db, items)
+
+@app.post("/articles/bulk/delete", response_model=list[BulkItemResult], response_model_exclude_none=True)
+async def delete_articles_bulk(payload: BulkDeleteRequest, db: Session = Depends(get_db)):
+    """
+    Delete many articles, with their abstracts and category links, in a single transaction.
+    
+    - **ids**: Article IDs to delete
+    """
+    return bulk_delete_articles(db, payload.ids)
 
 @app.get("/articles/{article_id}", response_model=Article)
 async def read_article(article_id: int, db: Session = Depends(get_db)):
@@ -64,6 +306,7 @@ async def search_articles_endpoint(
     q: str, 
     skip: int = 0, 
     limit: int = 100, 
+    fields: str = None,
     db: Session = Depends(get_db)
 ):
     """
@@ -72,12 +315,14 @@ async def search_articles_endpoint(
     - **q**: Search query (required)
     - **skip**: Number of articles to skip (default: 0)
     - **limit**: Maximum number of articles to return (default: 100)
+    - **fields**: Comma-separated subset of id,title,link to return (default: all)
     """
     if not q.strip():
         raise HTTPException(status_code=400, detail="Search query cannot be empty")
     
-    articles = search_articles(db, query=q.strip(), skip=skip, limit=limit)
-    return articles
+    fields = parse_fields(fields)
+    articles = search_articles(db, query=q.strip(), skip=skip, limit=limit, fields=fields)
+    return FastJSONResponse(rows_as_dicts(articles, fields))
 
 # Abstract endpoints
 @app.post("/abstracts/", response_model=Abstract)
@@ -89,6 +334,46 @@ async def read_abstracts(skip: int = 0, limit: int = 100, db: Session = Depends(
     abstracts = get_abstracts(db, skip=skip, limit=limit)
     return abstracts
 
+@app.post("/abstracts/batch", response_model=list[Abstract])
+async def read_abstracts_batch(payload: AbstractBatchRequest, db: Session = Depends(get_db)):
+    """
+    Fetch the abstracts of many articles in a single request.
+    
+    - **ids**: Article IDs whose abstracts should be returned
+    """
+    return get_abstracts_batch(db, article_ids=payload.ids)
+
+# Bulk abstract endpoints
+@app.post("/abstracts/bulk", response_model=list[BulkItemResult], response_model_exclude_none=True)
+async def create_abstracts_bulk(items: list[dict] = Body(...), db: Session = Depends(get_db)):
+    """
+    Create many abstracts in a single transaction.
+    
+    Items whose article does not exist or that already have an abstract are
+    reported as `not_found` / `conflict` and skipped.
+    """
+    check_bulk_size(items)
+    return bulk_create_abstracts(db, items)
+
+@app.put("/abstracts/bulk", response_model=list[BulkItemResult], response_model_exclude_none=True)
+async def update_abstracts_bulk(items: list[dict] = Body(...), db: Session = Depends(get_db)):
+    """
+    Update many abstracts in a single transaction.
+    
+    Every item is an `AbstractUpdate` plus the `id_article` it belongs to.
+    """
+    check_bulk_size(items)
+    return bulk_update_abstracts(db, items)
+
+@app.post("/abstracts/bulk/delete", response_model=list[BulkItemResult], response_model_exclude_none=True)
+async def delete_abstracts_bulk(payload: BulkDeleteRequest, db: Session = Depends(get_db)):
+    """
+    Delete the abstracts of many articles in a single transaction.
+    
+    - **ids**: Article IDs whose abstracts should be deleted
+    """
+    return bulk_delete_abstracts(db, payload.ids)
+
 @app.get("/abstracts/{article_id}", response_model=Abstract)
 async def read_abstract(article_id: int, db: Session = Depends(get_db)):
     db_abstract = get_abstract(db, article_id=article_id)
@@ -115,6 +400,8 @@ async def search_abstracts_endpoint(
     q: str, 
     skip: int = 0, 
     limit: int = 100, 
+    fields: str = None,
+    snippets: bool = False,
     db: Session = Depends(get_db)
 ):
     """
@@ -123,21 +410,23 @@ async def search_abstracts_endpoint(
     - **q**: Search query (required)
     - **skip**: Number of abstracts to skip (default: 0)
     - **limit**: Maximum number of abstracts to return (default: 100)
+    - **fields**: Comma-separated subset of id,title,link to return (default: all)
+    - **snippets**: Add a `snippet` with the abstract text around the match, matches wrapped in `<mark>` (default: false)
     """
     if not q.strip():
         raise HTTPException(status_code=400, detail="Search query cannot be empty")
     
-    results = search_abstracts(db, query=q.strip(), skip=skip, limit=limit)
-    # Convert tuple results to dictionary format for the schema
-    search_results = []
-    for result in results:
-        search_results.append({
-            "id": result[0],  # Article.id
-            "title": result[1],  # Article.title
-            "link": result[2],  # Article.link
-            "abstract": result[3]  # Abstract.abstract
-        })
-    return search_results
+    query = q.strip()
+    fields = parse_fields(fields)
+    results = search_abstracts(db, query=query, skip=skip, limit=limit, fields=fields,
+                               snippet_width=SNIPPET_WIDTH if snippets else None)
+    # Rows come straight from the database, so skip response_model validation
+    if not snippets:
+        return FastJSONResponse(rows_as_dicts(results, fields))
+    search_results = rows_as_dicts(results, fields + ("snippet",))
+    for result in search_results:
+        result["snippet"] = highlight(result["snippet"], query)
+    return FastJSONResponse(search_results)
 
 @app.get("/articles/{article_id}/abstracts", response_model=list[Abstract])
 async def get_article_abstracts(article_id: int, db: Session = Depends(get_db)):
@@ -151,16 +440,18 @@ async def search_articles_advanced(
     categories: str = None,
     skip: int = 0, 
     limit: int = 100, 
+    fields: str = None,
     db: Session = Depends(get_db)
 ):
     """
     Advanced search for articles by query and categories.
-    Returns only article.id, article.title, and article.link.
+    Returns only article.id, article.title, and article.link (or the subset in fields).
     
     - **q**: Search query for article title (optional)
     - **categories**: Comma-separated list of category IDs to filter by (optional)
     - **skip**: Number of articles to skip (default: 0)
     - **limit**: Maximum number of articles to return (default: 100)
+    - **fields**: Comma-separated subset of id,title,link to return (default: all)
     
     Example categories: "biologia,microgravedad,tecnologia"
     """
@@ -169,25 +460,20 @@ async def search_articles_advanced(
     if categories and categories.strip():
         category_list = [cat.strip() for cat in categories.split(',') if cat.strip()]
     
+    fields = parse_fields(fields)
+    
     # Search articles using the new CRUD function
     results = search_articles_by_query_and_categories(
         db=db, 
         query=q, 
         categories=category_list, 
         skip=skip, 
-        limit=limit
+        limit=limit,
+        fields=fields
     )
     
-    # Convert tuple results to dictionary format for the schema
-    search_results = []
-    for result in results:
-        search_results.append({
-            "id": result[0],  # Article.id
-            "title": result[1],  # Article.title
-            "link": result[2]   # Article.link
-        })
-    
-    return search_results
+    # Rows come straight from the database, so skip response_model validation
+    return FastJSONResponse(rows_as_dicts(results, fields))
 
 @app.get("/categories/{category_id}/count", response_model=CategoryCount)
 async def get_category_article_count(category_id: str, db: Session = Depends(get_db)):
@@ -208,11 +494,62 @@ async def get_category_article_count(category_id: str, db: Session = Depends(get
         "count": count
     }
 
-# Chat endpoint leveraging LocalOpenAIProcessor (LM Studio)
-processor = LocalOpenAIProcessor()
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of request, DB, LLM, scraper, cache and pool metrics."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/pool")
+async def get_pool_metrics():
+    """
+    Database connection pool statistics.
+    
+    Reports connections currently checked out, checkout wait times, overflow
+    connections opened beyond the pool size and checkout timeouts.
+    """
+    return pool_metrics.snapshot(engine)
+
+@app.get("/metrics/llm")
+async def get_llm_metrics(request: Request):
+    """Model server endpoints (outstanding requests, health, circuit breaker) and admission queue state."""
+    processor = request.app.state.processor
+    return {"endpoints": processor.pool.stats(), "admission": processor.admission.stats()}
+
+@app.get("/export")
+async def export_corpus(format: str = "ndjson", batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=EXPORT_MAX_BATCH_SIZE)):
+    """
+    Stream every article with its abstracts and categories in one response.
+    
+    - **format**: `ndjson` (default), `csv` or `parquet` (parquet needs pyarrow installed)
+    - **batch_size**: Rows fetched per server-side cursor round trip (default: 1000, at most 10000)
+    
+    Rows are read with a server-side cursor and written out batch by batch, so
+    memory use stays flat regardless of corpus size.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires the pyarrow package")
+    stream = SERIALIZERS[format](export_batches(batch_size))
+    return StreamingResponse(
+        stream,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="articles.{format}"'},
+    )
+
+def client_identity(request: Request) -> str:
+    """Caller identity for per-client fairness: X-Client-Id header, else the client address."""
+    return request.headers.get("X-Client-Id") or (request.client.host if request.client else "anonymous")
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(payload: ChatRequest):
+async def chat_endpoint(payload: ChatRequest, request: Request):
+    """
+    Chat with the local model.
+    
+    Requests queue for a model slot ahead of batch work, round-robin per client
+    (X-Client-Id header, else the client address). When the queue is full or the
+    wait is too long the response is 429 or 503 with a Retry-After header.
+    """
     # Ensure system prompt exists for safety
     messages = payload.messages
     if not any(m.role == "system" for m in messages):
@@ -221,9 +558,137 @@ async def chat_endpoint(payload: ChatRequest):
     else:
         messages = [m.model_dump() for m in messages]
 
-    content = await processor.chat(
-        messages=messages,
-        max_tokens=payload.max_tokens or 512,
-        temperature=payload.temperature or 0.3,
-    )
+    client_id = client_identity(request)
+    try:
+        content = await request.app.state.processor.chat(
+            messages=messages,
+            max_tokens=payload.max_tokens or 512,
+            temperature=payload.temperature or 0.3,
+            priority=INTERACTIVE,
+            client=client_id,
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
     return ChatResponse(content=content)
+
+@app.get("/articles/{article_id}/sections", response_model=ArticleSectionsResponse)
+async def get_article_sections(article_id: int, names: str = None, text: bool = True, db: Session = Depends(get_db)):
+    """
+    Sections of an article's scraped page, in page order, with their lengths.
+    
+    - **article_id**: Article whose page was scraped by a scrape job
+    - **names**: Comma-separated section names to return (default: all): abstract, introduction, methods, results, discussion, conclusions, references, back_matter, other
+    - **text**: Include the section text; false returns only names, headings and lengths (default: true)
+    """
+    wanted = None
+    if names:
+        wanted = [n.strip() for n in names.split(",") if n.strip()]
+        unknown = [n for n in wanted if n not in SECTION_NAMES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}. Use: {', '.join(SECTION_NAMES)}")
+    page = get_scraped_page_by_article(db, article_id)
+    if page is None or not page.sections:
+        raise HTTPException(status_code=404, detail="No scraped sections for this article")
+    sections = select_sections(page.sections, wanted)
+    return ArticleSectionsResponse(
+        article_id=article_id,
+        url=page.url,
+        title=page.title,
+        tokens=sum(s["tokens"] for s in sections),
+        sections=[{**s, "text": s["text"] if text else None} for s in sections],
+    )
+
+async def run_article_analysis(kind: str, article_id: int, refresh: bool, request: Request, db: Session):
+    try:
+        content, cached = await analyze_article(
+            db, request.app.state.processor, article_id, kind, client=client_identity(request), refresh=refresh,
+        )
+    except AbstractNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        logger.warning("%s analysis of article %s failed: %s", kind, article_id, e)
+        raise HTTPException(status_code=502, detail="Error contacting local model")
+    return ArticleAnalysisResponse(
+        article_id=article_id,
+        kind=kind,
+        template_version=ANALYSIS_TEMPLATES[kind].version,
+        content=content,
+        cached=cached,
+    )
+
+@app.get("/articles/{article_id}/insights", response_model=ArticleAnalysisResponse)
+async def get_article_insights(article_id: int, request: Request, refresh: bool = False, db: Session = Depends(get_db)):
+    """
+    Insights and key words for an article, generated from its abstract.
+    
+    - **article_id**: Article whose abstract is analyzed
+    - **refresh**: Generate again even if a stored result exists (default: false)
+    
+    Results are stored per (article, template version) and reused while the
+    abstract is unchanged; `cached` tells whether the model was called.
+    """
+    return await run_article_analysis("insights", article_id, refresh, request, db)
+
+@app.get("/articles/{article_id}/risks", response_model=ArticleAnalysisResponse)
+async def get_article_risks(article_id: int, request: Request, refresh: bool = False, db: Session = Depends(get_db)):
+    """
+    Risks and mitigations for an article, as Markdown, generated from its abstract.
+    
+    - **article_id**: Article whose abstract is analyzed
+    - **refresh**: Generate again even if a stored result exists (default: false)
+    
+    Results are stored per (article, template version) and reused while the
+    abstract is unchanged; `cached` tells whether the model was called.
+    """
+    return await run_article_analysis("risks", article_id, refresh, request, db)
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(payload: JobCreate, db: Session = Depends(get_db)):
+    """
+    Queue a background job; a worker process (python worker.py) runs it.
+    
+    - **kind**: summarize, classify, scrape or reindex
+    - **params**: Job parameters (see the README), e.g. {"article_ids": [1, 2, 3]}
+    - **max_attempts**: Attempts before the job fails (default: JOB_MAX_ATTEMPTS)
+    
+    Poll GET /jobs/{id} for status, progress and result.
+    """
+    try:
+        job = enqueue_job(db, payload.kind, payload.params, payload.max_attempts)
+    except InvalidJob as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job_view(job)
+
+@app.get("/jobs", response_model=list[JobResponse])
+async def read_jobs(status: str = None, kind: str = None, limit: int = 50, db: Session = Depends(get_db)):
+    """
+    List jobs, newest first.
+    
+    - **status**: Only jobs in this status: queued, running, succeeded, failed or cancelled (optional)
+    - **kind**: Only jobs of this kind (optional)
+    - **limit**: Maximum number of jobs to return (default: 50)
+    """
+    return [job_view(job) for job in list_jobs(db, status=status, kind=kind, limit=limit)]
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def read_job(job_id: int, db: Session = Depends(get_db)):
+    """Status, progress (done/total and fraction), ETA and result of a job."""
+    job = get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_existing_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Cancel a job. A queued job is cancelled at once; a running job stops at its
+    worker's next heartbeat or progress update. Finished jobs are returned unchanged.
+    """
+    job = get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status not in FINISHED:
+        job = cancel_job(db, job)
+    return job_view(job)
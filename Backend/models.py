@@ -1,11 +1,13 @@
-from sqlalchemy import Column, BigInteger, String, Integer, ForeignKey
+from sqlalchemy import Column, BigInteger, String, Integer, Boolean, ForeignKey, DateTime, JSON, func, inspect
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
 from database import Base
 
 class Article(Base):
     __tablename__ = "articles"
 
-    id = Column(BigInteger, primary_key=True, index=True)
+    # SQLite only autoincrements an INTEGER PRIMARY KEY (a rowid alias), not BIGINT
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True)
     title = Column(String, index=True)
     link = Column(String)
 
@@ -34,5 +36,68 @@ class ArticleCategory(Base):
     category = Column(String, ForeignKey("categories.id"), primary_key=True, nullable=False, index=True)
     
     # Relationships
-    article = relationship("Article")
+    article = relationship("Article", back_populates="categories")
     category_ref = relationship("Category")
+
+Article.categories = relationship("ArticleCategory", back_populates="article")
+
+class ArticleAnalysis(Base):
+    """Stored output of an analysis prompt template (see analysis.py) for one article."""
+    __tablename__ = "article_analyses"
+
+    id_article = Column(Integer, ForeignKey("articles.id"), primary_key=True, nullable=False, index=True)
+    kind = Column(String, primary_key=True, nullable=False)
+    template_version = Column(String, primary_key=True, nullable=False)
+    # sha256 of the abstract the content was generated from; a changed abstract is a cache miss
+    source_hash = Column(String, nullable=False)
+    content = Column(String, nullable=False)
+    model = Column(String)
+    created_at = Column(DateTime, server_default=func.now())
+
+class ScrapedPage(Base):
+    """Text of an article page, written by scrape jobs (see jobs.py) and pmc_xml.py."""
+    __tablename__ = "scraped_pages"
+
+    url = Column(String, primary_key=True)
+    title = Column(String)
+    text = Column(String)
+    # [{"name", "heading", "text", "chars", "tokens"}] in page order (see sections.py)
+    sections = Column(JSON)
+    scraped_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class Job(Base):
+    """Background job run by worker.py (see jobs.py)."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    # queued, running, succeeded, failed or cancelled
+    status = Column(String, nullable=False, default="queued", index=True)
+    params = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON)
+    error = Column(String)
+    progress_done = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    worker = Column(String)
+    # Earliest time a queued job may be claimed (retry backoff)
+    run_after = Column(DateTime)
+    # Naive UTC, set by the API and workers so every process agrees on the clock
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+
+def missing_columns(bind):
+    """Model columns absent from tables that already exist (create_all does not add them)."""
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.columns if column.name not in existing)
+    return missing
@@ -1,19 +1,184 @@
-from openai import OpenAI
 import asyncio
-from typing import List, Dict
-from gtts import gTTS
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Optional
+from config import LLM_ENDPOINTS, LLM_MODEL, LLM_MEASURE_PROMPTS
+from config import LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN, LLM_MAX_ATTEMPTS, LLM_HEALTH_INTERVAL
+from config import LLM_MAX_CONCURRENCY, LLM_INTERACTIVE_RESERVED, LLM_MAX_QUEUE, LLM_MAX_QUEUE_PER_CLIENT, LLM_QUEUE_TIMEOUT
+from llm_admission import AdmissionController, AdmissionRejected, INTERACTIVE, BATCH
+from llm_pool import EndpointPool, parse_endpoints
+from metrics import LLM_REQUEST_DURATION, LLM_PROMPT_DURATION, cached_prompt_tokens, counter, record_llm_usage
+from tokens import TokenBudget, budget_for, chunk_text, count_tokens, fit_messages, truncate_to_tokens
+from tracing import start_span
+
+LLM_COALESCED = counter(
+    "llm_coalesced_total", "Requests answered by joining an identical in-flight model call.", ("operation",),
+)
+
+
+SUMMARY_SYSTEM_PROMPT = "You are an expert scientific research summarizer. Provide clear, concise summaries of research articles."
+SUMMARY_INSTRUCTION = (
+    "Summarize the following scientific article text in 3-4 concise sentences, "
+    "focusing on the research goal, methods, key findings, and conclusions:\n\n"
+)
+# Variable parts (the section label, the text) come after the fixed wording so
+# every chunk call shares the longest possible prompt prefix
+CHUNK_INSTRUCTION = (
+    "The following is one part of a longer scientific article. Summarize it in 2-3 sentences, "
+    "keeping the methods, quantitative results and claims it contains.\n\nPart: {label}\n\n"
+)
+REDUCE_INSTRUCTION = (
+    "The following are summaries of consecutive parts of one scientific article. Combine them into a summary "
+    "of the whole article in 3-4 concise sentences, focusing on the research goal, methods, key findings, "
+    "and conclusions:\n\n"
+)
+SUMMARY_MAX_TOKENS = 350
+CHUNK_SUMMARY_MAX_TOKENS = 200
+# System prompt, instruction and chat template around the text of a summarization call
+SUMMARY_OVERHEAD_TOKENS = 150
+
+
+def flight_key(messages: List[Dict[str, str]], **params) -> str:
+    """Key identifying a completion: messages with whitespace and role case normalized, plus parameters."""
+    normalized = [
+        [str(m.get("role", "")).strip().lower(), " ".join(str(m.get("content", "")).split())]
+        for m in messages
+    ]
+    payload = json.dumps([normalized, sorted(params.items())], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def system_first(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Move system messages ahead of the conversation, keeping their order.
+
+    Requests with the same system prompt then start with the same bytes, which
+    is what prefix (KV) caching on the model server matches on.
+    """
+    system = [m for m in messages if m.get("role") == "system"]
+    if all(m.get("role") == "system" for m in messages[:len(system)]):
+        return messages
+    return system + [m for m in messages if m.get("role") != "system"]
+
+
+def prefix_key(messages: List[Dict[str, str]]) -> Optional[str]:
+    """Hash of the leading system messages, used to route a shared prefix to one endpoint."""
+    prefix = []
+    for m in messages:
+        if m.get("role") != "system":
+            break
+        prefix.append(str(m.get("content", "")))
+    if not prefix:
+        return None
+    return hashlib.sha256("\x00".join(prefix).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PromptTiming:
+    prompt_tokens: Optional[int]
+    cached_tokens: Optional[int]
+    prompt_seconds: float
+    total_seconds: float
+    # "server" when the server reported its prompt time, else "first_token"
+    source: str
+
+
+def measure_completion(openai_client, model: str, **params):
+    """Run a chat completion as a stream and time its prompt processing.
+
+    Prompt time is the server's own figure when it reports one (llama.cpp
+    `timings`), otherwise the time to the first streamed chunk. Returns the
+    reassembled ChatCompletion and a PromptTiming.
+    """
+    from openai.types.chat import ChatCompletion
+
+    start = time.perf_counter()
+    first_chunk = None
+    parts = []
+    finish_reason = "stop"
+    usage = None
+    timings = {}
+    last = None
+    stream = openai_client.chat.completions.create(
+        model=model, stream=True, stream_options={"include_usage": True}, **params,
+    )
+    for chunk in stream:
+        last = chunk
+        if chunk.choices:
+            if first_chunk is None:
+                first_chunk = time.perf_counter()
+            parts.append(chunk.choices[0].delta.content or "")
+            finish_reason = chunk.choices[0].finish_reason or finish_reason
+        if chunk.usage is not None:
+            usage = chunk.usage
+        timings = (chunk.model_extra or {}).get("timings") or timings
+    end = time.perf_counter()
+
+    response = ChatCompletion(
+        id=last.id if last else "",
+        object="chat.completion",
+        created=last.created if last else int(time.time()),
+        model=last.model if last else model,
+        choices=[{"index": 0, "finish_reason": finish_reason, "message": {"role": "assistant", "content": "".join(parts)}}],
+        usage=usage,
+    )
+    if "prompt_ms" in timings:
+        prompt_seconds, source = timings["prompt_ms"] / 1000, "server"
+    else:
+        prompt_seconds, source = (first_chunk or end) - start, "first_token"
+    cached = cached_prompt_tokens(usage) if usage is not None else None
+    timing = PromptTiming(
+        prompt_tokens=getattr(usage, "prompt_tokens", None) or timings.get("prompt_n"),
+        cached_tokens=cached if cached is not None else timings.get("cache_n"),
+        prompt_seconds=prompt_seconds,
+        total_seconds=end - start,
+        source=source,
+    )
+    return response, timing
+
 
 class LocalOpenAIProcessor:
-    def __init__(self, base_url: str = "http://192.168.137.1:1234/v1", model: str = "openai/gpt-oss-20b"):
-        self.base_url = base_url
-        self.model = model
-
-        # Initialize OpenAI client for local LM Studio
-        self.client = OpenAI(
-            base_url=base_url,
-            api_key="lm-studio"  # not needed for LM Studio, but required by client
+    def __init__(
+        self,
+        base_url: str = None,
+        model: str = LLM_MODEL,
+        admission: AdmissionController = None,
+        pool: EndpointPool = None,
+        measure_prompts: bool = LLM_MEASURE_PROMPTS,
+    ):
+        # An explicit base_url (or comma-separated list of them) replaces LLM_ENDPOINTS
+        self.pool = pool or EndpointPool(
+            parse_endpoints(base_url or LLM_ENDPOINTS, model),
+            failure_threshold=LLM_BREAKER_FAILURES,
+            cooldown=LLM_BREAKER_COOLDOWN,
+            max_attempts=LLM_MAX_ATTEMPTS,
+            health_interval=LLM_HEALTH_INTERVAL,
+        )
+        self.base_url = self.pool.endpoints[0].base_url
+        self.model = self.pool.endpoints[0].model
+        # Stream completions and log prompt processing time per call (see measure_completion)
+        self.measure_prompts = measure_prompts
+        # In-flight chat calls by flight_key, shared by identical concurrent requests
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        # Every generation holds one of the controller's slots
+        self.admission = admission or AdmissionController(
+            max_concurrency=LLM_MAX_CONCURRENCY,
+            interactive_reserved=LLM_INTERACTIVE_RESERVED,
+            max_queue=LLM_MAX_QUEUE,
+            max_queue_per_client=LLM_MAX_QUEUE_PER_CLIENT,
+            queue_timeout=LLM_QUEUE_TIMEOUT,
         )
 
+    @property
+    def client(self):
+        """OpenAI client of the first endpoint, created on first use.
+
+        openai takes a few hundred milliseconds to import, so it is only loaded
+        once a request actually needs the model.
+        """
+        return self.pool.endpoints[0].client
+
     async def process_scraped_data(self, data: List[Dict]) -> List[Dict]:
         """Process scraped data with local OpenAI API"""
         processed_data = []
@@ -32,6 +197,7 @@ class LocalOpenAIProcessor:
                 summary = await self._summarize_with_local_model(item['text'])
 
                 # Generate audio from summary
+                from gtts import gTTS
                 audio = gTTS(text=summary, lang='en', slow=False)
                 audio.save("transcript.mp3")
 
@@ -47,87 +213,241 @@ class LocalOpenAIProcessor:
 
         return processed_data
 
-    async def _summarize_with_local_model(self, text: str) -> str:
-        """Generate a summary using local OpenAI model"""
+    @property
+    def budget(self) -> TokenBudget:
+        """Token budget of the smallest context window among the pool's models."""
+        return min((budget_for(e.model) for e in self.pool.endpoints), key=lambda b: b.context)
+
+    async def summarize(self, text: str, raise_errors: bool = False) -> str:
+        """Summary of an article's text at batch priority (see _summarize_with_local_model)."""
+        return await self._summarize_with_local_model(text, raise_errors=raise_errors)
+
+    async def _summarize_with_local_model(self, text: str, raise_errors: bool = False) -> str:
+        """Generate a summary using local OpenAI model.
+
+        Text that fits in one call (LLM_CHUNK_TOKENS, or less for small context
+        windows) is summarized directly. Longer text is split on section
+        boundaries, the chunks are summarized concurrently and the partial
+        summaries are combined into the final summary.
+
+        When the model server fails, returns an error message with the start of
+        the text, or raises the error if raise_errors is set.
+        """
         if not text.strip():
             return "No content available"
 
-        # Truncate text to avoid token limits
-        truncated_text = text[:4000]  # reasonable limit
-
+        limit = self.budget.chunk_limit(SUMMARY_OVERHEAD_TOKENS, SUMMARY_MAX_TOKENS)
         try:
-            # Use asyncio.to_thread to make the sync API call async
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert scientific research summarizer. Provide clear, concise summaries of research articles."
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            "Summarize the following scientific article text in 3-4 concise sentences, "
-                            "focusing on the research goal, methods, key findings, and conclusions:\n\n"
-                            f"{truncated_text}"
-                        )
-                    }
-                ],
-                max_tokens=350,
-                temperature=0.3
-            )
-
-            # Extract the summary from response
-            if response.choices and len(response.choices) > 0:
-                return response.choices[0].message.content.strip()
-            else:
-                return "Summary generation failed - no response content"
+            if count_tokens(text) <= limit:
+                return await self._summary_call("summarize", SUMMARY_INSTRUCTION + text, SUMMARY_MAX_TOKENS)
+            return await self._map_reduce_summary(text, limit)
 
+        except AdmissionRejected:
+            raise
         except Exception as e:
             print(f"Local OpenAI API error: {e}")
+            if raise_errors:
+                raise
             # Fallback: return first 200 characters if API fails
             return f"Error generating summary. First 200 chars: {text[:200]}..."
 
+    async def _summary_call(self, operation: str, prompt: str, max_tokens: int) -> str:
+        response = await self._complete(
+            operation,
+            BATCH,
+            "summarize",
+            messages=[
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=max_tokens,
+            temperature=0.3
+        )
+        if response.choices and len(response.choices) > 0:
+            return response.choices[0].message.content.strip()
+        return "Summary generation failed - no response content"
+
+    async def _map_reduce_summary(self, text: str, limit: int) -> str:
+        chunks = chunk_text(text, limit)
+        print(f"Summarizing {count_tokens(text)} tokens in {len(chunks)} chunks")
+        # Submit no more chunks at once than batch work may run, so one long
+        # paper cannot fill the admission queue
+        fan_out = asyncio.Semaphore(self.admission.batch_limit)
+
+        async def summarize(operation: str, instruction: str, part: str, max_tokens: int) -> str:
+            async with fan_out:
+                return await self._summary_call(operation, instruction + part, max_tokens)
+
+        results = await asyncio.gather(
+            *(
+                summarize("summarize_chunk", CHUNK_INSTRUCTION.format(label=label), chunk, CHUNK_SUMMARY_MAX_TOKENS)
+                for label, chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+        partials = []
+        for (label, _), result in zip(chunks, results):
+            if isinstance(result, AdmissionRejected):
+                raise result
+            if isinstance(result, Exception):
+                print(f"Chunk summary failed ({label}): {result}")
+                continue
+            partials.append(f"[{label}] {result}")
+        if not partials:
+            raise next(r for r in results if isinstance(r, Exception))
+
+        # Combine in several rounds while the partial summaries exceed one call
+        while count_tokens("\n\n".join(partials)) > limit:
+            groups: List[List[str]] = [[]]
+            for partial in partials:
+                if groups[-1] and count_tokens("\n\n".join(groups[-1] + [partial])) > limit:
+                    groups.append([])
+                groups[-1].append(partial)
+            if len(groups) == len(partials):
+                # Every partial summary fills a call on its own; nothing left to merge
+                partials = [truncate_to_tokens("\n\n".join(partials), limit)]
+                break
+            partials = await asyncio.gather(
+                *(
+                    summarize("summarize_reduce", REDUCE_INSTRUCTION, "\n\n".join(group), CHUNK_SUMMARY_MAX_TOKENS)
+                    if len(group) > 1 else asyncio.sleep(0, group[0])
+                    for group in groups
+                )
+            )
+        return await self._summary_call("summarize_reduce", REDUCE_INSTRUCTION + "\n\n".join(partials), SUMMARY_MAX_TOKENS)
+
+    async def _complete(self, operation: str, priority: str, client: str, **params):
+        """Run one chat completion in an admission slot, timed and traced.
+
+        The endpoint pool picks the model server and fails over between them;
+        requests with the same system prompt prefer the same server so its
+        prefix cache can be reused. Raises AdmissionRejected when no slot is
+        granted; API errors propagate.
+        """
+        affinity = prefix_key(params.get("messages") or [])
+        async with self.admission.slot(priority, client):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                with start_span(f"llm.{operation}", max_tokens=params.get("max_tokens")):
+                    if self.measure_prompts:
+                        response, timing = await self.pool.call(
+                            operation,
+                            lambda openai_client, model: measure_completion(openai_client, model, **params),
+                            affinity=affinity,
+                        )
+                    else:
+                        response = await self.pool.call(
+                            operation,
+                            lambda openai_client, model: openai_client.chat.completions.create(model=model, **params),
+                            affinity=affinity,
+                        )
+                outcome = "ok"
+            finally:
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+        record_llm_usage(operation, response)
+        if self.measure_prompts:
+            LLM_PROMPT_DURATION.observe(timing.prompt_seconds, operation=operation)
+            print(
+                f"LLM {operation}: {timing.prompt_tokens} prompt tokens ({timing.cached_tokens} cached), "
+                f"prompt {timing.prompt_seconds * 1000:.0f} ms ({timing.source}), total {timing.total_seconds * 1000:.0f} ms"
+            )
+        return response
+
     def test_connection(self) -> bool:
-        """Test connection to local OpenAI API"""
-        try:
-            models = self.client.models.list()
-            print("Connected to local OpenAI API. Available models:")
-            for model in models.data:
-                print(f" - {model.id}")
-            return True
-        except Exception as e:
-            print(f"Failed to connect to local OpenAI API: {e}")
+        """Test connection to every local OpenAI API endpoint; True if any answers"""
+        connected = False
+        for endpoint in self.pool.endpoints:
+            try:
+                models = endpoint.client.models.list()
+                print(f"Connected to local OpenAI API at {endpoint.base_url}. Available models:")
+                for model in models.data:
+                    print(f" - {model.id}")
+                connected = True
+            except Exception as e:
+                print(f"Failed to connect to local OpenAI API at {endpoint.base_url}: {e}")
+        if not connected:
             print("Make sure LM Studio is running with the server active")
-            return False
+        return connected
 
-    async def chat(self, messages: List[Dict[str, str]], max_tokens: int = 512, temperature: float = 0.3) -> str:
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 512,
+        temperature: float = 0.3,
+        priority: str = INTERACTIVE,
+        client: str = "anonymous",
+        raise_errors: bool = False,
+    ) -> str:
         """Chat with the local model using an array of role/content messages.
 
         Args:
             messages: List of dicts with keys 'role' and 'content'.
             max_tokens: Max tokens for response.
             temperature: Sampling temperature.
+            priority: INTERACTIVE (user-facing) or BATCH (background work).
+            client: Caller identity for per-client fairness in the admission queue.
+            raise_errors: Raise model server errors instead of returning an error message.
+
+        Concurrent calls with the same normalized messages and parameters
+        (single-flight) share one upstream call and all receive its result, so
+        a burst of identical requests costs the model one generation, whichever
+        clients send them. Only the caller that starts the call is admitted
+        (and counted against its client's queue bound); callers that join it
+        add no load and take no slot. The shared call keeps running if the
+        caller that started it goes away.
+
+        System messages are moved to the front so the static prefix is
+        byte-identical across calls. Messages that do not fit the model's
+        context window next to max_tokens are trimmed first (see
+        tokens.fit_messages).
 
         Returns:
             Assistant message content as a string.
+
+        Raises:
+            AdmissionRejected: The admission controller turned the request away.
+            Exception: The model server call failed and raise_errors is set.
         """
         if not messages or not isinstance(messages, list):
             return "Invalid input messages"
 
+        messages = fit_messages(system_first(messages), self.budget.prompt_limit(max_tokens))
+        key = flight_key(messages, max_tokens=max_tokens, temperature=temperature, priority=priority, model=self.model)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._chat_once(messages, max_tokens, temperature, priority, client))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish_flight(key, done))
+        else:
+            LLM_COALESCED.inc(operation="chat")
         try:
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.model,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-            )
-
-            if response.choices and len(response.choices) > 0:
-                return response.choices[0].message.content.strip()
-            return "No response generated"
+            return await asyncio.shield(task)
+        except AdmissionRejected:
+            raise
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Local OpenAI API chat error: {e}")
-            return "Error contacting local model"
\ No newline at end of file
+            return "Error contacting local model"
+
+    def _finish_flight(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the error as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _chat_once(self, messages, max_tokens, temperature, priority, client) -> str:
+        response = await self._complete(
+            "chat",
+            priority,
+            client,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+
+        if response.choices and len(response.choices) > 0:
+            return response.choices[0].message.content.strip()
+        return "No response generated"
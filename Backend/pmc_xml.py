@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Ingest PMC articles from JATS XML instead of scraping their pages.
+
+The PMC Open Access subset is published as JATS XML: one .nxml/.xml file per
+article, gzip files, and .tar.gz bulk packages. Reading those files does the
+same job as WebScraper without a browser. Each file is stream-parsed with
+iterparse, and each <article> is cleared once it has been read, so memory
+stays flat on dumps and article sets of any size. Every article yields:
+
+- its title and PMC link, for the articles table. Articles are matched by
+  link, so the ones loaded from SB_publication_PMC.csv keep their id.
+- its abstract, for the abstracts table (only where the article has none).
+- its sections (sections.py), for scraped_pages, the same cache that scrape
+  jobs fill. Summarize jobs and GET /articles/{id}/sections read it.
+
+    python pmc_xml.py --dump /data/pmc_oa --only-existing --batch-size 500
+"""
+
+import argparse
+import gzip
+import html.entities
+import os
+import re
+import tarfile
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sections import sections_text, structure_sections
+
+PMC_LINK = "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{number}/"
+XML_SUFFIXES = (".xml", ".nxml", ".xml.gz", ".nxml.gz")
+TAR_SUFFIXES = (".tar.gz", ".tgz")
+# Not prose: figures, tables, display formulas and their captions
+SKIP_TAGS = {
+    "fig", "fig-group", "table-wrap", "table-wrap-group", "table", "disp-formula",
+    "supplementary-material", "graphic", "inline-graphic", "media", "object-id", "label", "tex-math",
+}
+SPACED_TAGS = {"element-citation", "person-group", "name"}
+# Abstract types that are not the article's abstract
+SECONDARY_ABSTRACTS = {"graphical", "teaser", "toc", "video", "editor-summary", "web-summary"}
+
+
+def _local(tag) -> str:
+    """Tag name without its namespace (article sets from efetch use one)."""
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _text(elem, sep: str = "") -> str:
+    """Text of elem and its descendants, leaving out SKIP_TAGS."""
+    # Structured citations and names hold their fields without spaces between them
+    if _local(elem.tag) in SPACED_TAGS:
+        sep = " "
+    parts = [elem.text or ""]
+    for child in elem:
+        if _local(child.tag) not in SKIP_TAGS:
+            parts.append(_text(child, sep))
+            parts.append(sep)
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _paragraphs(elem) -> List[str]:
+    """Paragraphs of a section, with subsection titles as their own lines."""
+    paragraphs = []
+    for child in elem:
+        tag = _local(child.tag)
+        if tag in SKIP_TAGS or tag == "title":
+            continue
+        if tag == "sec":
+            title = child.find("./{*}title")
+            if title is not None and _clean(_text(title)):
+                paragraphs.append(_clean(_text(title)))
+            paragraphs.extend(_paragraphs(child))
+        elif tag in ("list", "def-list"):
+            paragraphs.extend(_clean(_text(item)) for item in child if _clean(_text(item)))
+        else:
+            text = _clean(_text(child))
+            if text:
+                paragraphs.append(text)
+    return paragraphs
+
+
+def _section_block(elem, default_heading: str = "") -> Dict:
+    title = elem.find("./{*}title")
+    heading = _clean(_text(title)) if title is not None else ""
+    return {"heading": heading or default_heading, "text": "\n\n".join(_paragraphs(elem))}
+
+
+def _abstract(meta) -> Optional[str]:
+    abstracts = meta.findall("./{*}abstract")
+    main = [a for a in abstracts if a.get("abstract-type") not in SECONDARY_ABSTRACTS] or abstracts
+    if not main:
+        return None
+    # Structured abstracts keep their labels: "Background: ..."
+    parts = []
+    for child in main[0]:
+        tag = _local(child.tag)
+        if tag == "sec":
+            block = _section_block(child)
+            text = block["text"].replace("\n\n", " ")
+            parts.append(f"{block['heading']}: {text}" if block["heading"] else text)
+        elif tag not in SKIP_TAGS and tag != "title":
+            parts.append(_clean(_text(child)))
+    return "\n".join(p for p in parts if p) or None
+
+
+def _pmc_number(meta) -> Optional[str]:
+    for article_id in meta.findall("./{*}article-id"):
+        if article_id.get("pub-id-type") in ("pmc", "pmcid"):
+            match = re.search(r"(\d+)", article_id.text or "")
+            if match:
+                return match.group(1)
+    return None
+
+
+def parse_article(article) -> Optional[Dict]:
+    """Record of one <article> element, or None when it has no PMC id.
+
+    Returns {"pmcid", "link", "title", "abstract", "sections", "text"}, with
+    sections and text shaped like WebScraper.scrape_page results.
+    """
+    meta = article.find("./{*}front/{*}article-meta")
+    if meta is None:
+        return None
+    number = _pmc_number(meta)
+    if number is None:
+        return None
+    title = meta.find("./{*}title-group/{*}article-title")
+    abstract = _abstract(meta)
+
+    blocks = []
+    if abstract:
+        blocks.append({"heading": "Abstract", "text": abstract})
+    body = article.find("./{*}body")
+    if body is not None:
+        # Paragraphs before the first <sec> form an untitled block
+        loose = [child for child in body if _local(child.tag) != "sec"]
+        if loose:
+            wrapper = ET.Element("sec")
+            wrapper.extend(loose)
+            blocks.append(_section_block(wrapper))
+        blocks.extend(_section_block(sec) for sec in body.findall("./{*}sec"))
+    back = article.find("./{*}back")
+    if back is not None:
+        for child in back:
+            tag = _local(child.tag)
+            if tag == "ack":
+                blocks.append(_section_block(child, "Acknowledgments"))
+            elif tag == "ref-list":
+                refs = [_clean(_text(ref)) for ref in child.iter() if _local(ref.tag) == "ref"]
+                blocks.append({"heading": "References", "text": "\n\n".join(r for r in refs if r)})
+            elif tag in ("sec", "fn-group", "notes"):
+                blocks.append(_section_block(child))
+
+    sections = structure_sections(blocks)
+    return {
+        "pmcid": f"PMC{number}",
+        "link": PMC_LINK.format(number=number),
+        "title": _clean(_text(title)) if title is not None else "",
+        "abstract": abstract,
+        "sections": sections,
+        "text": sections_text(sections),
+    }
+
+
+def _xml_parser() -> ET.XMLParser:
+    # JATS files declare an external DTD that is never fetched; its named
+    # entities (&nbsp;, &ndash;, ...) are resolved from the HTML set instead
+    parser = ET.XMLParser()
+    parser.entity.update(html.entities.entitydefs)
+    return parser
+
+
+def iter_articles(source) -> Iterator[Dict]:
+    """Stream-parse one JATS file (a path or binary file object) into article records.
+
+    Handles a single <article> as well as article sets; each article is
+    cleared from memory once its record has been built.
+    """
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end"), parser=_xml_parser()):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if _local(elem.tag) == "article":
+            record = parse_article(elem)
+            if record is not None:
+                yield record
+            elem.clear()
+            if root is not elem:
+                root.clear()
+
+
+def iter_dump(path: str) -> Iterator[Tuple[str, object]]:
+    """(name, binary file object) for every JATS file in a file, directory or .tar.gz package."""
+    if os.path.isdir(path):
+        for directory, _, files in os.walk(path):
+            for name in sorted(files):
+                yield from iter_dump(os.path.join(directory, name))
+    elif path.endswith(TAR_SUFFIXES):
+        # Streaming mode: members are read in order without an index of the archive
+        with tarfile.open(path, "r|gz") as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(XML_SUFFIXES):
+                    yield f"{path}:{member.name}", archive.extractfile(member)
+    elif path.endswith(XML_SUFFIXES):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            yield path, f
+
+
+def store_batch(db, records: List[Dict], only_existing: bool = False) -> Dict[str, int]:
+    """Write a batch of article records; returns counts per table.
+
+    Articles are matched on link. Unknown articles are inserted unless
+    only_existing. Abstracts are only added where an article has none.
+    scraped_pages rows are replaced.
+    """
+    from sqlalchemy import delete, insert
+    from models import Article, Abstract, ScrapedPage
+
+    records = list({r["link"]: r for r in records}.values())
+    links = [r["link"] for r in records]
+    ids = dict(db.query(Article.link, Article.id).filter(Article.link.in_(links)).all())
+    new = [r for r in records if r["link"] not in ids]
+    counts = {"articles": 0, "abstracts": 0, "pages": 0}
+    if new and not only_existing:
+        stmt = insert(Article).returning(Article.id, sort_by_parameter_order=True)
+        new_ids = db.execute(stmt, [{"title": r["title"], "link": r["link"]} for r in new]).scalars().all()
+        ids.update(zip((r["link"] for r in new), new_ids))
+        counts["articles"] = len(new)
+
+    known = [r for r in records if r["link"] in ids]
+    with_abstract = {
+        row[0] for row in db.query(Abstract.id_article).filter(Abstract.id_article.in_([ids[r["link"]] for r in known])).all()
+    }
+    abstracts = [
+        {"id_article": ids[r["link"]], "abstract": r["abstract"]}
+        for r in known if r["abstract"] and ids[r["link"]] not in with_abstract
+    ]
+    if abstracts:
+        db.execute(insert(Abstract), abstracts)
+        counts["abstracts"] = len(abstracts)
+
+    pages = [{"url": r["link"], "title": r["title"], "text": r["text"], "sections": r["sections"]} for r in known if r["sections"]]
+    if pages:
+        db.execute(delete(ScrapedPage).where(ScrapedPage.url.in_([p["url"] for p in pages])))
+        db.execute(insert(ScrapedPage), pages)
+        counts["pages"] = len(pages)
+    db.commit()
+    return counts
+
+
+def ingest(paths: List[str], batch_size: int = 500, only_existing: bool = False, limit: int = None) -> Dict:
+    """Parse every JATS file under paths and store the articles in batches of batch_size."""
+    from database import SessionLocal
+
+    totals = {"files": 0, "failed_files": 0, "parsed": 0, "articles": 0, "abstracts": 0, "pages": 0}
+    started = time.perf_counter()
+    batch: List[Dict] = []
+
+    def flush():
+        with SessionLocal() as db:
+            for key, value in store_batch(db, batch, only_existing).items():
+                totals[key] += value
+        batch.clear()
+        elapsed = time.perf_counter() - started
+        print(f"Parsed {totals['parsed']} articles from {totals['files']} files ({totals['parsed'] / elapsed * 60:.0f}/min)")
+
+    for path in paths:
+        for name, f in iter_dump(path):
+            totals["files"] += 1
+            try:
+                for record in iter_articles(f):
+                    batch.append(record)
+                    totals["parsed"] += 1
+                    if len(batch) >= batch_size:
+                        flush()
+                    if limit and totals["parsed"] >= limit:
+                        break
+            except (ET.ParseError, OSError, EOFError) as e:
+                totals["failed_files"] += 1
+                print(f"Skipping {name}: {e}")
+            if limit and totals["parsed"] >= limit:
+                break
+        if limit and totals["parsed"] >= limit:
+            break
+    if batch:
+        flush()
+    totals["seconds"] = round(time.perf_counter() - started, 3)
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load PMC JATS XML into articles, abstracts and scraped_pages")
+    parser.add_argument("--dump", nargs="+", required=True, help="JATS files, directories or .tar.gz packages")
+    parser.add_argument("--batch-size", type=int, default=500, help="Articles written per transaction")
+    parser.add_argument("--only-existing", action="store_true", help="Only update articles already in the articles table")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many articles")
+    args = parser.parse_args()
+
+    totals = ingest(args.dump, args.batch_size, args.only_existing, args.limit)
+    print(
+        f"{totals['parsed']} articles in {totals['seconds']} s: {totals['articles']} new articles, "
+        f"{totals['abstracts']} abstracts, {totals['pages']} pages stored"
+    )
+    if totals["failed_files"]:
+        print(f"{totals['failed_files']} files could not be parsed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Connection pool instrumentation.
+
+InstrumentedQueuePool times every checkout request, so the time a request
+spends waiting for a free connection is visible, together with overflow
+connections and checkout timeouts. Pool events keep the checked-out count for
+any pool class, including NullPool in PgBouncer mode.
+"""
+
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checked_out = 0
+            self.max_checked_out = 0
+            self.connections_created = 0
+            self.overflow_events = 0
+            self.timeouts = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, overflowed: bool) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self, seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def snapshot(self, engine: Engine) -> Dict:
+        pool = engine.pool
+        with self._lock:
+            data = {
+                "pool_class": type(pool).__name__,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "connections_created": self.connections_created,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "overflow": pool.overflow(),
+                "idle": pool.checkedin(),
+            })
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports checkout wait time, overflow and timeouts to pool_metrics."""
+
+    def _do_get(self):
+        overflow_before = self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout(time.perf_counter() - start)
+            raise
+        # overflow() counts up from -pool_size, so only positive growth means a connection beyond pool_size
+        overflowed = self.overflow() > max(overflow_before, 0)
+        pool_metrics.record_wait(time.perf_counter() - start, overflowed)
+        return connection
+
+
+def install_pool_listeners(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_metrics.record_connect()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        pool_metrics.record_checkin()
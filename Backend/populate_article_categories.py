@@ -3,13 +3,14 @@ import asyncio
 import argparse
 import json
 from dataclasses import dataclass
-from typing import List, Dict, Set, Tuple
+from typing import Awaitable, Callable, List, Dict, Optional, Set, Tuple
 
 from sqlalchemy.orm import Session
 
 from database import SessionLocal
 from models import Article, ArticleCategory
 from moduleAI import LocalOpenAIProcessor
+from llm_admission import BATCH
 
 
 @dataclass
@@ -38,6 +39,11 @@ def fetch_articles(session: Session, limit: int = 100, skip: int = 0) -> List[Tu
     return [(a.id, a.title or "") for a in articles]
 
 
+def fetch_articles_by_ids(session: Session, article_ids: List[int]) -> List[Tuple[int, str]]:
+    articles = session.query(Article).filter(Article.id.in_(article_ids)).order_by(Article.id).all()
+    return [(a.id, a.title or "") for a in articles]
+
+
 def fetch_existing_pairs(session: Session) -> Set[Tuple[int, str]]:
     pairs: Set[Tuple[int, str]] = set()
     for ac in session.query(ArticleCategory).all():
@@ -70,7 +76,14 @@ async def classify_titles(
     articles: List[Tuple[int, str]],
     categories: List[CategorySpec],
     processor: LocalOpenAIProcessor,
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    raise_errors: bool = False,
 ) -> Dict[int, List[str]]:
+    """Classify each title; on_progress(done, total) is awaited after every article.
+
+    A failed model call leaves the article without categories, or is raised
+    when raise_errors is set.
+    """
     system_prompt = build_system_prompt(categories)
     id_to_categories: Dict[int, List[str]] = {}
 
@@ -78,6 +91,8 @@ async def classify_titles(
         if not title:
             id_to_categories[article_id] = []
             print(f"Processed article {article_id}: 0 categories")
+            if on_progress:
+                await on_progress(len(id_to_categories), len(articles))
             continue
 
         messages = [
@@ -86,8 +101,13 @@ async def classify_titles(
         ]
 
         try:
-            content = await processor.chat(messages=messages, max_tokens=128, temperature=0.0)
+            content = await processor.chat(
+                messages=messages, max_tokens=128, temperature=0.0, priority=BATCH, client="classification",
+                raise_errors=raise_errors,
+            )
         except Exception:
+            if raise_errors:
+                raise
             content = "{}"
 
         chosen: List[str] = []
@@ -108,6 +128,8 @@ async def classify_titles(
             pass
 
         id_to_categories[article_id] = chosen
+        if on_progress:
+            await on_progress(len(id_to_categories), len(articles))
 
     return id_to_categories
 
@@ -130,12 +152,7 @@ def persist_article_categories(
     return inserted
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Populate article_categories by classifying article titles with AI")
-    parser.add_argument("--limit", type=int, default=50, help="Number of articles to process")
-    parser.add_argument("--skip", type=int, default=0, help="Number of articles to skip from the start")
-    args = parser.parse_args()
-
+def run(args) -> None:
     categories = load_category_specs("categories.json")
     processor = LocalOpenAIProcessor()  # Uses local LM Studio per moduleAI configuration
 
@@ -152,6 +169,21 @@ def main() -> None:
         session.close()
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Populate article_categories by classifying article titles with AI")
+    parser.add_argument("--limit", type=int, default=50, help="Number of articles to process")
+    parser.add_argument("--skip", type=int, default=0, help="Number of articles to skip from the start")
+    parser.add_argument("--profile", type=str, default=None, help="Write a collapsed-stack (flamegraph) profile of the run to this file")
+    args = parser.parse_args()
+
+    if args.profile:
+        from profiling import profile_to_file
+        with profile_to_file(args.profile):
+            run(args)
+    else:
+        run(args)
+
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,64 @@
+"""
+Per-request SQL statement counting.
+
+A single engine listener records every statement into the QueryStats object of
+the active context, so a request (or a block of test code) can see how many
+queries it ran and which statements were repeated, the usual sign of an N+1
+pattern caused by lazy relationship loads.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    def __init__(self):
+        self.statements: Counter = Counter()
+
+    @property
+    def count(self) -> int:
+        return sum(self.statements.values())
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Return statements executed at least `threshold` times."""
+        return {stmt: n for stmt, n in self.statements.items() if n >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_installed_engines = set()
+
+
+def install_query_counter(engine: Engine) -> None:
+    """Attach the statement listener to an engine (idempotent)."""
+    if id(engine) in _installed_engines:
+        return
+    _installed_engines.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record_statement(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.statements[statement] += 1
+
+
+@contextmanager
+def track_queries():
+    """Count statements executed inside the block.
+
+    Usage:
+        with track_queries() as stats:
+            client.get("/articles/full/?limit=50")
+        assert stats.count <= 3
+        assert not stats.repeated(2)
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
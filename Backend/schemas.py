@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime
+from typing import Any, Dict, Optional, List
+from config import BATCH_MAX_IDS, BULK_MAX_ITEMS
 
 class ArticleBase(BaseModel):
     title: str
@@ -35,11 +37,52 @@ class Abstract(AbstractBase):
 class ArticleWithAbstracts(Article):
     abstracts: List[Abstract] = []
 
+class ArticleWithDetails(ArticleWithAbstracts):
+    categories: List[str] = []
+
+    @field_validator("categories", mode="before")
+    @classmethod
+    def category_ids(cls, value):
+        # Accept ArticleCategory rows straight from the ORM relationship
+        return [getattr(item, "category", item) for item in value]
+
+# Batch fetch schemas
+class ArticleBatchRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=BATCH_MAX_IDS)
+    include_abstracts: bool = False
+    include_categories: bool = False
+
+class AbstractBatchRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=BATCH_MAX_IDS)
+
+class ArticleBatchResult(Article):
+    abstracts: Optional[List[Abstract]] = None
+    categories: Optional[List[str]] = None
+
+# Bulk write schemas
+class ArticleBulkUpdate(ArticleUpdate):
+    id: int
+
+class AbstractBulkUpdate(AbstractUpdate):
+    id_article: int
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=BULK_MAX_ITEMS)
+
+class BulkItemResult(BaseModel):
+    index: int
+    # created | updated | deleted | invalid | not_found | conflict | failed
+    status: str
+    id: Optional[int] = None
+    error: Optional[str] = None
+
 class AbstractSearchResult(BaseModel):
     id: int
     title: str
     link: str
     # abstract: str
+    # Only with snippets=true: the abstract text around the match, with matches in <mark>
+    snippet: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -72,3 +115,47 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     content: str
+
+class ArticleAnalysisResponse(BaseModel):
+    article_id: int
+    kind: str
+    template_version: str
+    content: str
+    cached: bool
+
+class ArticleSection(BaseModel):
+    name: str
+    heading: str
+    chars: int
+    tokens: int
+    text: Optional[str] = None
+
+class ArticleSectionsResponse(BaseModel):
+    article_id: int
+    url: str
+    title: Optional[str] = None
+    tokens: int
+    sections: List[ArticleSection]
+
+class JobCreate(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+    max_attempts: Optional[int] = Field(default=None, ge=1, le=10)
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    params: Dict[str, Any]
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    progress: Optional[float] = None
+    progress_done: int
+    progress_total: Optional[int] = None
+    eta_seconds: Optional[float] = None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Sharded scraping across worker processes.
+
+One event loop driving one browser tops out well below what a many-core
+machine can do for tens of thousands of PMC links. scrape_sharded splits the
+URL list round-robin into one shard per process. Each process runs its own
+event loop and Chromium (WebScraper) with `concurrency` pages open at once.
+
+- Every result is appended to the shard's spool file (spool_dir/shard-N.jsonl)
+  as soon as it is scraped. A rerun with the same spool_dir skips URLs already
+  scraped successfully.
+- The spool files are the only channel between the processes: the parent
+  counts progress from the lines appended to them. Nothing is shared that a
+  killed shard could leave locked, so the others keep going when one dies.
+- A shard that exits early is reported. When no shard has finished a page for
+  `stall_timeout` seconds, the remaining shards are terminated.
+- Setting the `stop` event (from another thread) terminates the shards; the
+  spool keeps what they scraped.
+- When the shards are done, the parent reads the spool files for each URL's
+  status only. URLs missing from them, because their process died or was
+  terminated, are reported as failed, and errors are counted by message.
+  store_spool streams the scraped pages into scraped_pages in batches, so page
+  text is never held for the whole run.
+
+    python scrape_shards.py --csv SB_publication_PMC.csv --processes 8 --concurrency 4 --spool scrape_spool --store
+"""
+
+import argparse
+import asyncio
+import csv
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_SCRAPER = "webScrapper:WebScraper"
+# Seconds without any finished page before the remaining shards are terminated
+STALL_TIMEOUT = 300.0
+POLL_INTERVAL = 0.5
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeStopped(Exception):
+    """Raised by scrape_sharded when its stop event was set."""
+
+
+def spool_path(spool_dir: str, shard: int) -> str:
+    return os.path.join(spool_dir, f"shard-{shard}.jsonl")
+
+
+def read_spool(spool_dir: str) -> Iterator[Dict]:
+    """Scraped results in every spool file; a line cut off by a crash is skipped."""
+    if not os.path.isdir(spool_dir):
+        return
+    for name in sorted(os.listdir(spool_dir)):
+        if not (name.startswith("shard-") and name.endswith(".jsonl")):
+            continue
+        with open(os.path.join(spool_dir, name), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+class _SpoolTail:
+    """Counts the complete lines appended to one spool file since the last read."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        if os.path.exists(path):
+            # A line cut off by a crash must not swallow the first line appended after it
+            with open(path, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                self.offset = f.tell()
+                if self.offset:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                        self.offset += 1
+
+    def read(self) -> int:
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                lines = 0
+                while True:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        # Not finished yet: read it again next time
+                        return lines
+                    self.offset += len(line)
+                    lines += 1
+        except FileNotFoundError:
+            return 0
+
+
+def _load_scraper(path: str):
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+async def _scrape_shard(urls: List[str], path: str, concurrency: int, scraper_path: str) -> None:
+    scraper = _load_scraper(scraper_path)()
+    await scraper.setup()
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        with open(path, "a", encoding="utf-8") as spool:
+            async def scrape(url):
+                async with semaphore:
+                    result = await scraper.scrape_page(url)
+                spool.write(json.dumps(result, ensure_ascii=False) + "\n")
+                spool.flush()
+
+            await asyncio.gather(*(scrape(url) for url in urls))
+    finally:
+        await scraper.close()
+
+
+def _shard_main(shard: int, urls: List[str], spool_dir: str, concurrency: int, scraper_path: str) -> None:
+    """Entry point of a shard process."""
+    asyncio.run(_scrape_shard(urls, spool_path(spool_dir, shard), concurrency, scraper_path))
+
+
+def _stop_workers(workers) -> None:
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()
+    for worker in workers:
+        if worker.pid is None:
+            continue
+        worker.join(timeout=5)
+        if worker.is_alive():
+            worker.kill()
+            worker.join()
+
+
+def scrape_sharded(
+    urls: List[str],
+    processes: int = None,
+    concurrency: int = 4,
+    spool_dir: str = "scrape_spool",
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    scraper_path: str = DEFAULT_SCRAPER,
+    stop: Optional[threading.Event] = None,
+    stall_timeout: Optional[float] = STALL_TIMEOUT,
+) -> Dict:
+    """Scrape urls with `processes` worker processes (default: one per core).
+
+    Returns {"scraped": n, "failed": [{"url", "error"}], "errors": {message:
+    count}, "seconds": s}. Pages stay in spool_dir (see store_spool); those
+    scraped by an earlier run into the same spool_dir count as scraped.
+    on_progress(done, total) is called in this process as pages finish; an
+    exception it raises stops the shards and propagates. Setting stop stops
+    them too and raises ScrapeStopped.
+    """
+    stop = stop or threading.Event()
+    os.makedirs(spool_dir, exist_ok=True)
+    urls = list(dict.fromkeys(urls))
+    done_before = {r["url"] for r in read_spool(spool_dir) if r.get("success")}
+    pending = [url for url in urls if url not in done_before]
+    processes = max(1, min(processes or os.cpu_count() or 1, len(pending) or 1))
+    shards = [pending[i::processes] for i in range(processes)]
+
+    # spawn: a fresh interpreter per shard, with no event loop or browser state copied from this one
+    context = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+    workers = {
+        i: context.Process(target=_shard_main, args=(i, shard, spool_dir, concurrency, scraper_path), name=f"scrape-shard-{i}")
+        for i, shard in enumerate(shards) if shard
+    }
+    tails = [_SpoolTail(spool_path(spool_dir, i)) for i in workers]
+    # Why each shard's missing URLs are missing: exit code, or stopped for stalling
+    ended: Dict[int, str] = {}
+    total = len(urls)
+    done = len(done_before)
+    try:
+        for worker in workers.values():
+            if stop.is_set():
+                raise ScrapeStopped()
+            worker.start()
+        if on_progress:
+            on_progress(done, total)
+        last_progress = time.monotonic()
+        while True:
+            running = [worker for worker in workers.values() if worker.is_alive()]
+            # Read after checking liveness, so the last lines of a finished shard are counted
+            finished = sum(tail.read() for tail in tails)
+            if finished:
+                done += finished
+                last_progress = time.monotonic()
+                if on_progress:
+                    on_progress(done, total)
+            for i, worker in workers.items():
+                if i not in ended and worker.exitcode:
+                    ended[i] = f"Shard process {worker.name} exited with code {worker.exitcode}"
+                    logger.warning("%s; the other shards continue", ended[i])
+            if not running:
+                break
+            if stall_timeout and time.monotonic() - last_progress > stall_timeout:
+                logger.warning("No page finished in %.0f s; stopping %d shard processes", stall_timeout, len(running))
+                for i, worker in workers.items():
+                    if worker.is_alive():
+                        ended[i] = f"Shard process {worker.name} stopped after {stall_timeout:.0f} s without progress"
+                break
+            if stop.wait(POLL_INTERVAL):
+                raise ScrapeStopped()
+    finally:
+        # Interrupted, stopped, stalled or cancelled through on_progress; the spool keeps their work
+        _stop_workers(workers.values())
+
+    # Status per URL only; a later success replaces an earlier failure of the same URL
+    errors: Dict[str, Optional[str]] = {}
+    for result in read_spool(spool_dir):
+        if result.get("success"):
+            errors[result["url"]] = None
+        elif errors.get(result["url"], "") is not None:
+            errors[result["url"]] = result.get("error") or "Unknown scraping error"
+    missing = {url: ended.get(i, "Shard process exited without a result") for i, shard in enumerate(shards) for url in shard}
+    failed = []
+    for url in urls:
+        if url not in errors:
+            failed.append({"url": url, "error": missing.get(url, "No result")})
+        elif errors[url] is not None:
+            failed.append({"url": url, "error": errors[url]})
+    return {
+        "scraped": sum(1 for url in urls if url in errors and errors[url] is None),
+        "failed": failed,
+        "errors": dict(Counter(f["error"].splitlines()[0][:200] for f in failed).most_common()),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def iter_scraped(spool_dir: str, urls: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """Successful results in spool_dir, once per URL (only those in urls, if given)."""
+    wanted = set(urls) if urls is not None else None
+    seen = set()
+    for result in read_spool(spool_dir):
+        url = result.get("url")
+        if not result.get("success") or url in seen or (wanted is not None and url not in wanted):
+            continue
+        seen.add(url)
+        yield result
+
+
+def store_spool(spool_dir: str, urls: Optional[Iterable[str]] = None, batch_size: int = 200) -> int:
+    """Write the successful results in spool_dir to scraped_pages, batch_size pages per transaction."""
+    from sqlalchemy import delete, insert
+    from database import SessionLocal
+    from models import ScrapedPage
+
+    stored = 0
+    batch: List[Dict] = []
+
+    def flush(db):
+        db.execute(delete(ScrapedPage).where(ScrapedPage.url.in_([page["url"] for page in batch])))
+        db.execute(insert(ScrapedPage), batch)
+        db.commit()
+        batch.clear()
+
+    with SessionLocal() as db:
+        for result in iter_scraped(spool_dir, urls):
+            batch.append({"url": result["url"], "title": result.get("title"), "text": result.get("text"), "sections": result.get("sections")})
+            stored += 1
+            if len(batch) >= batch_size:
+                flush(db)
+        if batch:
+            flush(db)
+    return stored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scrape article pages with several worker processes")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV with a Link column (e.g. SB_publication_PMC.csv)")
+    source.add_argument("--from-db", action="store_true", help="Scrape the links of the articles table")
+    parser.add_argument("--limit", type=int, default=None, help="Scrape at most this many links")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Pages open at once per process")
+    parser.add_argument("--spool", default="scrape_spool", help="Spool directory; rerunning with it resumes")
+    parser.add_argument("--stall-timeout", type=float, default=STALL_TIMEOUT, help="Stop the shards after this many seconds without a finished page (0 waits forever)")
+    parser.add_argument("--output", default=None, help="Write the scraped pages as JSON lines to this file")
+    parser.add_argument("--store", action="store_true", help="Store successful pages in scraped_pages")
+    parser.add_argument("--batch-size", type=int, default=200, help="Pages written per transaction with --store")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.csv:
+        with open(args.csv, encoding="utf-8-sig") as f:
+            urls = [row["Link"] for row in csv.DictReader(f) if row.get("Link")]
+    else:
+        from database import SessionLocal
+        from models import Article
+        with SessionLocal() as db:
+            urls = [row[0] for row in db.query(Article.link).order_by(Article.id).all() if row[0]]
+    urls = urls[:args.limit] if args.limit else urls
+
+    def report(done, total):
+        if done == total or done % 100 == 0:
+            print(f"Scraped {done}/{total}")
+
+    outcome = scrape_sharded(urls, args.processes, args.concurrency, args.spool, on_progress=report, stall_timeout=args.stall_timeout)
+    ok = outcome["scraped"]
+    print(f"{ok}/{len(urls)} pages scraped in {outcome['seconds']} s ({ok / max(outcome['seconds'], 0.001):.1f} pages/s)")
+    for error, count in outcome["errors"].items():
+        print(f"  {count} x {error}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for result in iter_scraped(args.spool, urls):
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        print(f"Results written to {args.output}")
+    if args.store:
+        print(f"Stored {store_spool(args.spool, urls, args.batch_size)} pages in scraped_pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Structured article sections from scraped PMC pages.
+
+WebScraper.scrape_page extracts one block per top-level section of the page:
+its heading and its paragraphs, without figures, tables and page chrome.
+structure_sections maps each heading to a canonical name and records the
+block's length, so summarization and retrieval can take only the sections
+they need instead of the whole page text.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+from tokens import count_tokens
+
+ABSTRACT = "abstract"
+INTRODUCTION = "introduction"
+METHODS = "methods"
+RESULTS = "results"
+DISCUSSION = "discussion"
+CONCLUSIONS = "conclusions"
+REFERENCES = "references"
+BACK_MATTER = "back_matter"
+OTHER = "other"
+
+SECTION_NAMES = (ABSTRACT, INTRODUCTION, METHODS, RESULTS, DISCUSSION, CONCLUSIONS, REFERENCES, BACK_MATTER, OTHER)
+# What a summary is written from: the article body without references and back matter
+SUMMARY_SECTIONS = (ABSTRACT, INTRODUCTION, METHODS, RESULTS, DISCUSSION, CONCLUSIONS, OTHER)
+
+# First match wins; headings are matched after numbering ("2.1.") is stripped
+CANONICAL_HEADINGS = [
+    (ABSTRACT, re.compile(r"^((graphical |structured )?abstract|summary|significance|highlights)$")),
+    (INTRODUCTION, re.compile(r"^(introduction|background)\b")),
+    (RESULTS, re.compile(r"^results?\b")),
+    (METHODS, re.compile(r"^((materials?|patients|subjects) and methods|methods?|methodology|experimental|study design)\b")),
+    (DISCUSSION, re.compile(r"^discussion\b")),
+    (CONCLUSIONS, re.compile(r"^(conclusions?|concluding remarks|summary and conclusions?)\b")),
+    (REFERENCES, re.compile(r"^(references|bibliography|literature cited)\b")),
+    (BACK_MATTER, re.compile(
+        r"^(acknowledge?ments?|funding|author contributions|conflicts? of interest|competing interests|"
+        r"data availability|supplementary|footnotes|associated data|abbreviations|ethics)"
+    )),
+]
+NUMBERING = re.compile(r"^\s*(?:[IVX]+|\d+(?:\.\d+)*)\.?\s+")
+
+
+def canonical_section(heading: str) -> str:
+    """Canonical name of a section heading ("2. Materials and Methods" -> "methods"); OTHER when unknown."""
+    normalized = NUMBERING.sub("", heading or "").strip().lower()
+    for name, pattern in CANONICAL_HEADINGS:
+        if pattern.match(normalized):
+            return name
+    return OTHER
+
+
+def structure_sections(blocks: Iterable[Dict]) -> List[Dict]:
+    """Turn scraped {"heading", "text"} blocks into sections in page order.
+
+    Each section is {"name", "heading", "text", "chars", "tokens"}. Empty
+    blocks are dropped.
+    """
+    sections = []
+    for block in blocks:
+        text = re.sub(r"\n{3,}", "\n\n", (block.get("text") or "").strip())
+        if not text:
+            continue
+        heading = " ".join((block.get("heading") or "").split())
+        sections.append({
+            "name": canonical_section(heading),
+            "heading": heading,
+            "text": text,
+            "chars": len(text),
+            "tokens": count_tokens(text),
+        })
+    return sections
+
+
+def select_sections(sections: List[Dict], names: Optional[Iterable[str]] = None) -> List[Dict]:
+    """Sections whose canonical name is in names (all of them when names is None)."""
+    if names is None:
+        return list(sections)
+    wanted = set(names)
+    return [s for s in sections if s["name"] in wanted]
+
+
+def sections_text(sections: List[Dict], names: Optional[Iterable[str]] = SUMMARY_SECTIONS) -> str:
+    """Selected sections as text, each under its heading (what tokens.chunk_text splits on)."""
+    return "\n\n".join(
+        f"{s['heading']}\n{s['text']}" if s["heading"] else s["text"] for s in select_sections(sections, names)
+    )
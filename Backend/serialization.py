@@ -0,0 +1,48 @@
+"""
+Fast JSON responses for endpoints that return rows straight from the database.
+
+Returning a dict list from an endpoint with a response_model makes FastAPI
+validate every row against the Pydantic model and then serialize the validated
+copy. For rows we selected ourselves that validation is redundant, so these
+endpoints build plain dicts and return a FastJSONResponse, which encodes them
+to bytes in one pass with pydantic-core's serializer. The response_model stays
+on the route for the OpenAPI schema.
+"""
+
+import html
+import re
+from typing import Any, Iterable, List, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by pydantic-core instead of json.dumps."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def rows_as_dicts(rows: Iterable[Sequence], fields: Sequence[str]) -> List[dict]:
+    """Map result tuples (or Row objects) to dicts keyed by `fields`, in column order."""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def objects_as_dicts(objects: Iterable[Any], fields: Sequence[str]) -> List[dict]:
+    """Map ORM instances to dicts of the given attributes."""
+    return [{field: getattr(obj, field) for field in fields} for obj in objects]
+
+
+def highlight(text: Optional[str], query: str, tag: str = "mark") -> Optional[str]:
+    """HTML-escape text and wrap case-insensitive matches of query in <tag>."""
+    if not text or not query:
+        return text
+    parts = []
+    last = 0
+    for match in re.finditer(re.escape(query), text, re.IGNORECASE):
+        parts.append(html.escape(text[last:match.start()]))
+        parts.append(f"<{tag}>{html.escape(match.group())}</{tag}>")
+        last = match.end()
+    parts.append(html.escape(text[last:]))
+    return "".join(parts)
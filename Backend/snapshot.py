@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Columnar corpus snapshots (Arrow IPC).
+
+A snapshot is a directory holding one uncompressed Arrow IPC file per table:
+
+    articles.arrow            id, title, link
+    abstracts.arrow           id_article, abstract
+    categories.arrow          id, title, description
+    article_categories.arrow  id_article, category
+    summaries.arrow           title, url, summary   (optional)
+
+Uncompressed IPC files can be memory-mapped, so load_snapshot() returns tables
+that read straight from the page cache without parsing or copying. Requires
+the pyarrow package.
+
+Usage:
+    python snapshot.py write snapshot/ --from-files
+    python snapshot.py write snapshot/ --from-db --summaries processed_articles_all.csv
+    python snapshot.py inspect snapshot/
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pyarrow as pa
+
+SCHEMAS = {
+    "articles": pa.schema([("id", pa.int64()), ("title", pa.string()), ("link", pa.string())]),
+    "abstracts": pa.schema([("id_article", pa.int64()), ("abstract", pa.string())]),
+    "categories": pa.schema([("id", pa.string()), ("title", pa.string()), ("description", pa.string())]),
+    "article_categories": pa.schema([("id_article", pa.int64()), ("category", pa.string())]),
+    "summaries": pa.schema([("title", pa.string()), ("url", pa.string()), ("summary", pa.string())]),
+}
+
+BATCH_ROWS = 50_000
+
+
+def table_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"{name}.arrow")
+
+
+def write_table(directory: str, name: str, batches: Iterable[List[Dict]]) -> int:
+    """Write row batches (lists of dicts) to <directory>/<name>.arrow; returns the row count."""
+    schema = SCHEMAS[name]
+    rows = 0
+    with pa.OSFile(table_path(directory, name), "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                if batch:
+                    writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                    rows += len(batch)
+    return rows
+
+
+def read_table(directory: str, name: str) -> pa.Table:
+    """Memory-map one snapshot table (zero-copy)."""
+    source = pa.memory_map(table_path(directory, name), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_snapshot(directory: str) -> Dict[str, pa.Table]:
+    """Memory-map every table present in the snapshot directory."""
+    return {
+        name: read_table(directory, name)
+        for name in SCHEMAS
+        if os.path.exists(table_path(directory, name))
+    }
+
+
+def _chunked(rows: Iterable[Dict], size: int = BATCH_ROWS) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Sources
+
+def file_sources(base_dir: str = ".") -> Dict[str, Iterable[List[Dict]]]:
+    """The seed files used by create_table.py, with the same id assignment (1-based row order)."""
+    def articles():
+        with open(os.path.join(base_dir, "SB_publication_PMC.csv"), "r", encoding="utf-8-sig") as f:
+            rows = ({"id": i, "title": row["Title"], "link": row["Link"]}
+                    for i, row in enumerate(csv.DictReader(f), 1))
+            yield from _chunked(rows)
+
+    def abstracts():
+        with open(os.path.join(base_dir, "sample.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        yield from _chunked({"id_article": i, "abstract": item["abstract"]} for i, item in enumerate(data, 1))
+
+    def categories():
+        with open(os.path.join(base_dir, "categories.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        yield [{"id": c["id"], "title": c["title"], "description": c.get("description")} for c in data]
+
+    def article_categories():
+        with open(os.path.join(base_dir, "articleCategories.csv"), "r", encoding="utf-8") as f:
+            rows = ({"id_article": int(row["id_article"]), "category": row["category"]}
+                    for row in csv.DictReader(f) if row["id_article"] and row["category"])
+            yield from _chunked(rows)
+
+    return {
+        "articles": articles(),
+        "abstracts": abstracts(),
+        "categories": categories(),
+        "article_categories": article_categories(),
+    }
+
+
+def db_sources(db) -> Dict[str, Iterable[List[Dict]]]:
+    """Stream every table from the database with server-side cursors."""
+    from sqlalchemy import select
+    from models import Article, Abstract, Category, ArticleCategory
+
+    def stream(*columns):
+        stmt = select(*columns).execution_options(yield_per=BATCH_ROWS)
+        for partition in db.execute(stmt).partitions():
+            yield [row._asdict() for row in partition]
+
+    return {
+        "articles": stream(Article.id, Article.title, Article.link),
+        "abstracts": stream(Abstract.id_article, Abstract.abstract),
+        "categories": stream(Category.id, Category.title, Category.description),
+        "article_categories": stream(ArticleCategory.id_article, ArticleCategory.category),
+    }
+
+
+def summary_source(paths: List[str]) -> Iterable[List[Dict]]:
+    """Summaries from the results CSVs written by PubMedArticleManager.save_results."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = ({"title": row.get("Title", ""), "url": row.get("url", ""), "summary": row.get("summary", "")}
+                    for row in csv.DictReader(f) if row.get("summary"))
+            yield from _chunked(rows)
+
+
+def write_snapshot(directory: str, sources: Dict[str, Iterable[List[Dict]]], summaries: Optional[List[str]] = None) -> Dict[str, int]:
+    os.makedirs(directory, exist_ok=True)
+    if summaries:
+        sources = {**sources, "summaries": summary_source(summaries)}
+    return {name: write_table(directory, name, batches) for name, batches in sources.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write or inspect a columnar corpus snapshot")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    write = sub.add_parser("write", help="Write a snapshot directory")
+    write.add_argument("directory", help="Output directory")
+    source = write.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-files", action="store_true", help="Read the seed CSV/JSON files (like create_table.py)")
+    source.add_argument("--from-db", action="store_true", help="Read the tables from DATABASE_URL")
+    write.add_argument("--summaries", nargs="*", default=[], help="Results CSVs with a 'summary' column to include")
+
+    inspect = sub.add_parser("inspect", help="Memory-map a snapshot and report row counts and load time")
+    inspect.add_argument("directory", help="Snapshot directory")
+
+    args = parser.parse_args()
+
+    if args.command == "write":
+        start = time.perf_counter()
+        if args.from_db:
+            from database import SessionLocal
+            db = SessionLocal()
+            try:
+                counts = write_snapshot(args.directory, db_sources(db), args.summaries)
+            finally:
+                db.close()
+        else:
+            counts = write_snapshot(args.directory, file_sources(), args.summaries)
+        for name, rows in counts.items():
+            print(f"  {name}: {rows} rows")
+        print(f"✅ Snapshot written to {args.directory} in {time.perf_counter() - start:.2f}s")
+    else:
+        start = time.perf_counter()
+        tables = load_snapshot(args.directory)
+        elapsed = time.perf_counter() - start
+        for name, table in tables.items():
+            print(f"  {name}: {table.num_rows} rows, {table.nbytes / 1e6:.1f} MB")
+        print(f"Loaded {len(tables)} tables in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
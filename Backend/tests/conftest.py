@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# The app reads its configuration at import time: point it at a scratch SQLite
+# database and turn on per-request query counting before main is imported
+_DB_DIR = tempfile.mkdtemp(prefix="encartai-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["QUERY_STATS_ENABLED"] = "true"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
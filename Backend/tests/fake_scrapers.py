@@ -0,0 +1,37 @@
+"""Stand-ins for WebScraper in scrape_shards tests, loaded by the shard processes via scraper_path."""
+
+import asyncio
+import os
+
+
+class FakeScraper:
+    async def setup(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def scrape_page(self, url):
+        await asyncio.sleep(0.01)
+        if "broken" in url:
+            return {"url": url, "success": False, "error": "Timeout 30000ms exceeded"}
+        return {"url": url, "success": True, "title": url.rsplit("/", 1)[-1], "text": f"Text of {url}", "sections": []}
+
+
+class CrashingScraper(FakeScraper):
+    """Kills its process on a "crash" URL, as the OOM killer would."""
+
+    async def scrape_page(self, url):
+        if "crash" in url:
+            await asyncio.sleep(0.2)
+            os._exit(3)
+        return await super().scrape_page(url)
+
+
+class HangingScraper(FakeScraper):
+    """Never finishes a "hang" URL."""
+
+    async def scrape_page(self, url):
+        if "hang" in url:
+            await asyncio.Event().wait()
+        return await super().scrape_page(url)
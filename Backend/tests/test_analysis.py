@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from analysis import AbstractNotFound, analyze_article
+from database import Base, SessionLocal, engine
+from models import Abstract, Article, ScrapedPage
+from sections import structure_sections
+
+
+class RecordingProcessor:
+    model = "test-model"
+
+    def __init__(self):
+        self.prompts = []
+
+    async def chat(self, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        return f"analysis {len(self.prompts)}"
+
+
+@pytest.fixture()
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        for i in (1, 2, 3):
+            session.add(Article(id=i, title=f"Study {i}", link=f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{i}/"))
+        session.flush()
+        session.add(Abstract(id_article=1, abstract="Abstract of study 1"))
+        sections = structure_sections([
+            {"heading": "Results", "text": "Roots grew longer."},
+            {"heading": "References", "text": "Doe J. 2020."},
+        ])
+        session.add(ScrapedPage(url="https://www.ncbi.nlm.nih.gov/pmc/articles/PMC2/", title="Study 2", text="full page", sections=sections))
+        session.commit()
+        yield session
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_analysis_uses_the_abstract_first(db):
+    processor = RecordingProcessor()
+    content, cached = asyncio.run(analyze_article(db, processor, 1, "insights"))
+    assert (content, cached) == ("analysis 1", False)
+    assert processor.prompts == ["Abstract of study 1"]
+
+
+def test_analysis_falls_back_to_stored_page_sections(db):
+    processor = RecordingProcessor()
+    asyncio.run(analyze_article(db, processor, 2, "insights"))
+    assert processor.prompts == ["Results\nRoots grew longer."]
+
+    # Reused while the page is unchanged, generated again once it changes
+    assert asyncio.run(analyze_article(db, processor, 2, "insights")) == ("analysis 1", True)
+    page = db.get(ScrapedPage, "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC2/")
+    page.sections = structure_sections([{"heading": "Results", "text": "Roots grew shorter."}])
+    db.commit()
+    assert asyncio.run(analyze_article(db, processor, 2, "insights")) == ("analysis 2", False)
+
+
+def test_analysis_without_any_text(db):
+    with pytest.raises(AbstractNotFound):
+        asyncio.run(analyze_article(db, RecordingProcessor(), 3, "risks"))
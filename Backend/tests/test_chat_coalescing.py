@@ -0,0 +1,42 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from fake_openai import start_fake_openai
+from moduleAI import LocalOpenAIProcessor
+
+MESSAGES = [
+    {"role": "system", "content": "You are an expert in obtaining insights and key words."},
+    {"role": "user", "content": "Abstract of a microgravity study"},
+]
+
+
+@pytest.fixture()
+def server():
+    server = start_fake_openai(latency_ms=200)
+    yield server
+    server.shutdown()
+
+
+def chat_concurrently(server, clients):
+    processor = LocalOpenAIProcessor(base_url=server.base_url, measure_prompts=False)
+
+    async def run():
+        return await asyncio.gather(*(processor.chat(MESSAGES, client=client) for client in clients))
+
+    return asyncio.run(run())
+
+
+def test_identical_chats_from_different_clients_share_one_call(server):
+    contents = chat_concurrently(server, ["alice", "bob"])
+    assert server.requests == 1
+    assert contents[0] == contents[1]
+    assert not contents[0].startswith("Error")
+
+
+def test_identical_chats_from_many_clients_share_one_call(server):
+    chat_concurrently(server, [f"client-{i}" for i in range(5)])
+    assert server.requests == 1
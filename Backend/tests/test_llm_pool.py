@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+from llm_pool import CLOSED, HALF_OPEN, Endpoint, EndpointPool
+
+
+def half_open_pool():
+    endpoint = Endpoint("http://127.0.0.1:9/v1", "test-model")
+    endpoint._client = object()
+    endpoint.state = HALF_OPEN
+    return EndpointPool([endpoint], health_interval=0), endpoint
+
+
+def test_cancelled_trial_leaves_breaker_half_open():
+    pool, endpoint = half_open_pool()
+    started = threading.Event()
+    finish = threading.Event()
+
+    def slow_completion(client, model):
+        started.set()
+        finish.wait(5)
+        return "late"
+
+    async def run():
+        attempt = asyncio.ensure_future(pool.call("chat", slow_completion))
+        await asyncio.to_thread(started.wait, 5)
+        assert endpoint.trial is not None
+        attempt.cancel()
+        try:
+            await attempt
+        except asyncio.CancelledError:
+            pass
+        finish.set()
+
+    asyncio.run(run())
+    assert endpoint.state == HALF_OPEN
+    assert endpoint.trial is None
+    assert endpoint.outstanding == 0
+
+
+def test_successful_trial_closes_breaker():
+    pool, endpoint = half_open_pool()
+    assert asyncio.run(pool.call("chat", lambda client, model: "ok")) == "ok"
+    assert endpoint.state == CLOSED
+    assert endpoint.trial is None
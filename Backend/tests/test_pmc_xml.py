@@ -0,0 +1,142 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+import pmc_xml
+from database import Base, SessionLocal, engine
+from models import Abstract, Article, ScrapedPage
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures", "pmc_xml")
+
+
+def parse(name):
+    return list(pmc_xml.iter_articles(os.path.join(FIXTURES, name)))
+
+
+def section(record, name):
+    return next(s for s in record["sections"] if s["name"] == name)
+
+
+def test_single_article():
+    [record] = parse("PMC4136787.nxml")
+    assert record["pmcid"] == "PMC4136787"
+    assert record["link"] == "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC4136787/"
+    assert record["title"] == "Mice in Bion-M 1 space mission: training and selection"
+
+
+def test_structured_abstract_keeps_labels_and_skips_graphical_abstract():
+    [record] = parse("PMC4136787.nxml")
+    assert record["abstract"] == (
+        "Background: Fixture text: background of the study in two sentences. It sets out the question.\n"
+        "Results: Fixture text: the main finding, with a range of 10–20 days."
+    )
+    assert "Graphical abstract" not in record["text"]
+
+
+def test_section_names_in_page_order():
+    [record] = parse("PMC4136787.nxml")
+    assert [(s["name"], s["heading"]) for s in record["sections"]] == [
+        ("abstract", "Abstract"),
+        ("other", ""),
+        ("introduction", "1. Introduction"),
+        ("methods", "2. Materials and Methods"),
+        ("results", "3. Results"),
+        ("discussion", "4. Discussion"),
+        ("back_matter", "Acknowledgments"),
+        ("references", "References"),
+    ]
+    methods = section(record, "methods")["text"]
+    # Subsection titles and list items stay, as their own paragraphs
+    assert "2.1. Animals" in methods and "Second criterion." in methods
+    assert "the statistical test, p below 0.05" in methods
+
+
+def test_figures_and_tables_are_skipped():
+    [record] = parse("PMC4136787.nxml")
+    results = section(record, "results")["text"]
+    assert results == "Fixture text: results, shown in Figure 1."
+    assert "caption that should not be extracted" not in record["text"]
+    assert "table cell" not in record["text"]
+
+
+def test_references_keep_spaces_between_citation_fields():
+    [record] = parse("PMC4136787.nxml")
+    references = section(record, "references")["text"].split("\n\n")
+    assert references[0].startswith("Doe J A fixture reference Fixture Journal 2014")
+    assert references[1] == "Roe R. Another fixture reference. Fixture Journal. 2013;1:1–2."
+
+
+def test_article_set_skips_records_without_pmc_id():
+    records = parse("articleset.xml")
+    assert [r["pmcid"] for r in records] == ["PMC11988870", "PMC9000001"]
+    assert [s["name"] for s in records[0]["sections"]] == [
+        "abstract", "introduction", "other", "conclusions", "back_matter", "references",
+    ]
+
+
+def test_namespaced_article_set():
+    [record] = parse("articleset_ns.xml")
+    assert record["pmcid"] == "PMC9000002"
+    assert record["title"] == "Fixture article in a namespaced article set"
+    assert record["abstract"] == "Fixture text: abstract of a namespaced article."
+    assert [s["name"] for s in record["sections"]] == ["abstract", "methods", "results"]
+    assert "namespaced table cell" not in record["text"]
+
+
+def test_iter_dump_reads_directories_and_tar_packages(tmp_path):
+    names = sorted(os.path.basename(name) for name, _ in pmc_xml.iter_dump(FIXTURES))
+    assert names == ["PMC4136787.nxml", "articleset.xml", "articleset_ns.xml"]
+
+    package = tmp_path / "oa_package.tar.gz"
+    with tarfile.open(package, "w:gz") as archive:
+        for name in names:
+            archive.add(os.path.join(FIXTURES, name), arcname=f"oa_package/{name}")
+        readme = b"not an article"
+        info = tarfile.TarInfo("oa_package/README.txt")
+        info.size = len(readme)
+        archive.addfile(info, io.BytesIO(readme))
+    pmcids = [r["pmcid"] for _, f in pmc_xml.iter_dump(str(package)) for r in pmc_xml.iter_articles(f)]
+    assert pmcids == ["PMC4136787", "PMC11988870", "PMC9000001", "PMC9000002"]
+
+
+@pytest.fixture()
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        # Known article with an abstract of its own, and a stale scraped page
+        session.add(Article(id=7, title="Stem cells", link="https://www.ncbi.nlm.nih.gov/pmc/articles/PMC11988870/"))
+        session.flush()
+        session.add(Abstract(id_article=7, abstract="Abstract from the seed data"))
+        session.add(ScrapedPage(url="https://www.ncbi.nlm.nih.gov/pmc/articles/PMC11988870/", title="old", text="old page"))
+        session.commit()
+        yield session
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_store_batch_only_existing(db):
+    counts = pmc_xml.store_batch(db, parse("articleset.xml"), only_existing=True)
+    assert counts == {"articles": 0, "abstracts": 0, "pages": 1}
+    assert db.query(Article).count() == 1
+    page = db.get(ScrapedPage, "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC11988870/")
+    assert page.title == "Stem Cell Health and Tissue Regeneration in Microgravity"
+    assert [s["name"] for s in page.sections][:2] == ["abstract", "introduction"]
+    # The article keeps its own abstract
+    assert [a.abstract for a in db.query(Abstract).all()] == ["Abstract from the seed data"]
+
+
+def test_store_batch_inserts_unknown_articles(db):
+    records = parse("articleset.xml") + parse("articleset_ns.xml")
+    counts = pmc_xml.store_batch(db, records)
+    assert counts == {"articles": 2, "abstracts": 2, "pages": 3}
+    links = dict(db.query(Article.link, Article.id).all())
+    assert links["https://www.ncbi.nlm.nih.gov/pmc/articles/PMC11988870/"] == 7
+    new_id = links["https://www.ncbi.nlm.nih.gov/pmc/articles/PMC9000002/"]
+    assert db.query(Abstract.abstract).filter(Abstract.id_article == new_id).scalar() == (
+        "Fixture text: abstract of a namespaced article."
+    )
+    # Storing the same records again replaces pages and adds nothing
+    assert pmc_xml.store_batch(db, records) == {"articles": 0, "abstracts": 0, "pages": 3}
+    assert db.query(ScrapedPage).count() == 3
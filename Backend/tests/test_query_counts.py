@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from crud import get_articles_with_details
+from database import Base, SessionLocal, engine
+from models import Abstract, Article, ArticleCategory, Category
+from query_stats import install_query_counter, track_queries
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add_all([Category(id=c, title=c, description="") for c in ("biology", "plants")])
+        for i in range(1, 61):
+            db.add(Article(id=i, title=f"Microgravity study {i}", link=f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{i}/"))
+        db.flush()
+        for i in range(1, 61):
+            db.add(Abstract(id_article=i, abstract=f"Abstract {i}"))
+            db.add(ArticleCategory(id_article=i, category="biology" if i % 2 else "plants"))
+        db.commit()
+
+    from main import app
+    # Without the lifespan: no model processor is needed for these endpoints
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_articles_full_query_count_is_constant(client):
+    counts = {}
+    for limit in (1, 10, 50):
+        response = client.get(f"/articles/full/?limit={limit}")
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        counts[limit] = int(response.headers["X-Query-Count"])
+    assert len(set(counts.values())) == 1, counts
+
+
+def test_articles_with_details_has_no_repeated_statements():
+    install_query_counter(engine)
+    with SessionLocal() as db:
+        with track_queries() as stats:
+            articles = get_articles_with_details(db, limit=50)
+            for article in articles:
+                # Already loaded: touching the relationships must not query again
+                assert article.abstracts and article.categories
+    assert stats.count == 3
+    assert not stats.repeated(2)
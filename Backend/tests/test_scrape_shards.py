@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from database import Base, SessionLocal, engine
+from models import ScrapedPage
+from scrape_shards import ScrapeStopped, iter_scraped, scrape_sharded, store_spool
+
+URLS = [f"https://example.org/page/{i}" for i in range(12)]
+
+
+def test_scrape_and_store_from_spool(tmp_path):
+    spool = str(tmp_path / "spool")
+    urls = URLS + ["https://example.org/broken/1"]
+    outcome = scrape_sharded(urls, processes=3, concurrency=2, spool_dir=spool, scraper_path="fake_scrapers:FakeScraper")
+    assert outcome["scraped"] == 12
+    assert outcome["failed"] == [{"url": "https://example.org/broken/1", "error": "Timeout 30000ms exceeded"}]
+    assert "results" not in outcome
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        # Only the requested URLs, in batches; storing again replaces the rows
+        assert store_spool(spool, URLS[:5], batch_size=2) == 5
+        assert store_spool(spool, batch_size=2) == 12
+        with SessionLocal() as db:
+            assert db.query(ScrapedPage).count() == 12
+            assert db.get(ScrapedPage, URLS[3]).text == f"Text of {URLS[3]}"
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.mark.parametrize("run", range(3))
+def test_a_crashed_shard_does_not_hang_the_others(tmp_path, run):
+    urls = URLS + ["https://example.org/crash/1"]
+    started = time.monotonic()
+    outcome = scrape_sharded(
+        urls, processes=3, concurrency=2, spool_dir=str(tmp_path / "spool"),
+        scraper_path="fake_scrapers:CrashingScraper", stall_timeout=30,
+    )
+    assert time.monotonic() - started < 20
+    crashed = [f for f in outcome["failed"] if "exited with code 3" in f["error"]]
+    assert {"url": "https://example.org/crash/1", "error": crashed[0]["error"]} in crashed
+    # Every URL is either scraped or reported, and the other shards finished theirs
+    assert outcome["scraped"] + len(outcome["failed"]) == len(urls)
+    assert outcome["scraped"] >= 8
+
+
+def test_stalled_shards_are_stopped(tmp_path):
+    urls = URLS[:4] + ["https://example.org/hang/1"]
+    outcome = scrape_sharded(
+        urls, processes=2, concurrency=2, spool_dir=str(tmp_path / "spool"),
+        scraper_path="fake_scrapers:HangingScraper", stall_timeout=2,
+    )
+    assert outcome["scraped"] == 4
+    assert outcome["failed"][0]["url"] == "https://example.org/hang/1"
+    assert "without progress" in outcome["failed"][0]["error"]
+
+
+def test_stop_event_terminates_the_shards(tmp_path):
+    stop = threading.Event()
+    threading.Timer(1, stop.set).start()
+    with pytest.raises(ScrapeStopped):
+        scrape_sharded(
+            URLS[:2] + ["https://example.org/hang/1"], processes=2, concurrency=1, spool_dir=str(tmp_path / "spool"),
+            scraper_path="fake_scrapers:HangingScraper", stop=stop,
+        )
+    # What finished before the stop stays in the spool for a rerun
+    assert {r["url"] for r in iter_scraped(str(tmp_path / "spool"))} <= set(URLS[:2])
@@ -0,0 +1,13 @@
+import logging
+
+from tracing import install_log_trace_ids, start_trace
+
+
+def test_log_records_carry_the_trace_id(caplog):
+    install_log_trace_ids()
+    logger = logging.getLogger("test_tracing")
+    with caplog.at_level(logging.INFO, logger="test_tracing"):
+        with start_trace("job.test", traceparent="00-" + "ab" * 16 + "-" + "cd" * 8 + "-01"):
+            logger.info("inside")
+        logger.info("outside")
+    assert [r.trace_id for r in caplog.records] == ["ab" * 16, "-"]
@@ -0,0 +1,204 @@
+"""
+Token counting, per-model token budgets and section-aware text chunking.
+
+count_tokens uses tiktoken's o200k_base encoding when tiktoken is installed
+(optional; close to the gpt-oss and recent GPT tokenizers) and otherwise
+estimates CHARS_PER_TOKEN characters per token, which overcounts slightly for
+English prose so budgets stay on the safe side.
+
+Budgets come from config: LLM_CONTEXT_TOKENS is the default context window,
+LLM_MODEL_CONTEXT_TOKENS overrides it per model ("model=tokens,..."), and
+LLM_CHUNK_TOKENS caps the input of a single summarization call so per-call
+latency stays bounded however long the paper is.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from config import LLM_CONTEXT_TOKENS, LLM_MODEL_CONTEXT_TOKENS, LLM_CHUNK_TOKENS
+
+CHARS_PER_TOKEN = 3.5
+# Role markers and separators the chat template adds around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens tokens, at a word boundary where possible."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    cut = text[:int(max_tokens * CHARS_PER_TOKEN)]
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) // 2 else cut
+
+
+def _parse_model_budgets(spec: str) -> Dict[str, int]:
+    budgets = {}
+    for item in spec.split(","):
+        model, _, tokens = item.strip().rpartition("=")
+        if model and tokens.strip().isdigit():
+            budgets[model.strip()] = int(tokens)
+    return budgets
+
+
+MODEL_CONTEXT_TOKENS = _parse_model_budgets(LLM_MODEL_CONTEXT_TOKENS)
+
+
+@dataclass
+class TokenBudget:
+    context: int
+    chunk: int
+
+    def prompt_limit(self, max_output_tokens: int) -> int:
+        """Tokens left for the prompt once the response is reserved."""
+        return max(0, self.context - max_output_tokens)
+
+    def chunk_limit(self, overhead_tokens: int, max_output_tokens: int) -> int:
+        """Input tokens per call: the chunk cap, or less if the context is smaller."""
+        return max(1, min(self.chunk, self.context - overhead_tokens - max_output_tokens))
+
+
+def budget_for(model: str) -> TokenBudget:
+    context = MODEL_CONTEXT_TOKENS.get(model, LLM_CONTEXT_TOKENS)
+    return TokenBudget(context=context, chunk=min(LLM_CHUNK_TOKENS, context))
+
+
+def messages_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(count_tokens(str(m.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def fit_messages(messages: List[Dict[str, str]], max_prompt_tokens: int) -> List[Dict[str, str]]:
+    """Make messages fit max_prompt_tokens.
+
+    The oldest turns between the system prompt and the latest message are
+    dropped first; if that is not enough the longest remaining non-system
+    message is truncated (its beginning is kept). System prompts are left
+    intact so the request keeps its cacheable prefix.
+    """
+    if messages_tokens(messages) <= max_prompt_tokens:
+        return messages
+    fitted = [dict(m) for m in messages]
+    while messages_tokens(fitted) > max_prompt_tokens:
+        droppable = [i for i, m in enumerate(fitted[:-1]) if m.get("role") != "system"]
+        if not droppable:
+            break
+        del fitted[droppable[0]]
+    excess = messages_tokens(fitted) - max_prompt_tokens
+    if excess > 0:
+        candidates = [m for m in fitted if m.get("role") != "system"] or fitted
+        longest = max(candidates, key=lambda m: count_tokens(str(m.get("content", ""))))
+        content = str(longest.get("content", ""))
+        longest["content"] = truncate_to_tokens(content, max(0, count_tokens(content) - excess))
+    return fitted
+
+
+# Section headings of scientific articles as they appear in scraped text,
+# optionally numbered ("2. Methods", "3 Results and Discussion")
+SECTION_HEADING = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*\.?\s+)?"
+    r"(abstract|summary|introduction|background|(?:materials? and )?methods?|methodology|experimental(?: procedures)?"
+    r"|results?(?: and discussion)?|discussion|conclusions?|limitations|"
+    r"acknowledge?ments?|references|bibliography|supplementary (?:material|data|information)|funding|author contributions"
+    r"|conflicts? of interest|data availability)\s*:?\s*$",
+    re.IGNORECASE,
+)
+# Sections that add nothing to a summary; everything from the first of them on is skipped
+BACK_MATTER = ("acknowledg", "references", "bibliography", "supplementary", "funding", "author contributions", "conflict", "data availability")
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split scraped article text into (heading, body) pairs at section headings.
+
+    Text before the first heading gets the heading "Front matter". Back matter
+    (references, acknowledgements, funding, ...) is dropped.
+    """
+    sections: List[Tuple[str, List[str]]] = [("Front matter", [])]
+    for line in text.splitlines():
+        match = SECTION_HEADING.match(line)
+        if match:
+            heading = match.group(1).strip()
+            if heading.lower().startswith(BACK_MATTER):
+                break
+            sections.append((heading.capitalize(), []))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, "\n".join(lines).strip()) for heading, lines in sections if "\n".join(lines).strip()]
+
+
+def _split_oversized(text: str, max_tokens: int) -> List[str]:
+    """Split text on paragraphs, then sentences, then hard cuts, into pieces of at most max_tokens."""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            while count_tokens(sentence) > max_tokens:
+                head = truncate_to_tokens(sentence, max_tokens)
+                pieces.append(head)
+                sentence = sentence[len(head):].lstrip()
+            if sentence:
+                pieces.append(sentence)
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int) -> List[Tuple[str, str]]:
+    """Pack article sections into (label, text) chunks of at most max_tokens tokens.
+
+    Whole sections are packed together while they fit; a section larger than
+    a chunk is split on paragraph and sentence boundaries.
+    """
+    chunks: List[Tuple[str, str]] = []
+    labels: List[str] = []
+    parts: List[str] = []
+    size = 0
+
+    def flush():
+        nonlocal labels, parts, size
+        if parts:
+            chunks.append((", ".join(dict.fromkeys(labels)), "\n\n".join(parts)))
+        labels, parts, size = [], [], 0
+
+    for heading, body in split_sections(text):
+        block = f"{heading}\n{body}"
+        pieces = [block] if count_tokens(block) <= max_tokens else _split_oversized(body, max_tokens)
+        for piece in pieces:
+            tokens = count_tokens(piece)
+            if size + tokens > max_tokens:
+                flush()
+            labels.append(heading)
+            parts.append(piece)
+            size += tokens
+    flush()
+    return chunks
@@ -0,0 +1,350 @@
+"""
+Lightweight request tracing.
+
+Every request gets a trace id (taken from an incoming W3C `traceparent` header
+when present) that is returned in the X-Trace-Id response header and attached
+to log records as `trace_id`, which configure_logging puts on every log line.
+Background jobs run under a trace of their own (see jobs.run_job). A sampled fraction of requests (TRACE_SAMPLE_RATE)
+also records spans:
+
+    http.request                 middleware, whole request
+      route.handler              FastAPI handler: dependencies, endpoint, serialization
+        endpoint                 the path operation function
+          db.query               one per SQL statement
+          llm.chat / llm.summarize
+        response.serialize       from endpoint return to handler return
+
+Finished traces are handed to a background exporter that appends JSON lines to
+TRACE_FILE or posts OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT, so the request path
+only pays for creating span objects, and nothing at all when not sampled.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi.routing import APIRoute
+
+from config import LOG_LEVEL, TRACE_SAMPLE_RATE, TRACE_EXPORTER, TRACE_FILE, TRACE_OTLP_ENDPOINT
+
+SERVICE_NAME = "encartai-backend"
+LOG_FORMAT = "%(asctime)s %(levelname)s [trace=%(trace_id)s] %(name)s: %(message)s"
+
+
+class Span:
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.spans.append(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    __slots__ = ("trace_id", "sampled", "spans")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+def begin_span(name: str, **attributes) -> Optional[Span]:
+    """Create a child of the current span without activating it (for leaf spans)."""
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        return None
+    parent = _current_span.get()
+    return Span(trace, name, parent.span_id if parent else None, attributes)
+
+
+@contextmanager
+def start_span(name: str, **attributes):
+    """Record a span around the block and make it the parent of spans opened inside it."""
+    span = begin_span(name, **attributes)
+    if span is None:
+        yield None
+        return
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = repr(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+# traceparent: version-traceid-parentid-flags, lowercase hex
+TRACEPARENT = re.compile(r"[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}")
+
+
+def _parse_traceparent(header: Optional[str]):
+    """Return (trace_id, parent_span_id) from a W3C traceparent header, or (None, None).
+
+    The trace id ends up in response headers, logs, exports and profile file
+    names, so anything but a well-formed header with non-zero ids is ignored.
+    """
+    match = TRACEPARENT.fullmatch((header or "").strip())
+    if match is None:
+        return None, None
+    trace_id, parent_id = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None, None
+    return trace_id, parent_id
+
+
+@contextmanager
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes):
+    """Open a new trace (root span) for the block; yields the Trace."""
+    trace_id, remote_parent = _parse_traceparent(traceparent)
+    trace = Trace(trace_id or os.urandom(16).hex(), random.random() < TRACE_SAMPLE_RATE)
+    trace_token = _current_trace.set(trace)
+    try:
+        with start_span(name, **attributes) as root:
+            if root is not None:
+                root.parent_id = remote_parent
+            yield trace, root
+    finally:
+        _current_trace.reset(trace_token)
+        if trace.sampled and trace.spans:
+            exporter.submit(trace)
+
+
+# Route instrumentation
+
+# Mutable holder the endpoint wrapper fills with its end time; a holder rather than
+# a plain value so sync endpoints (run in a copied context) can write to it too
+_endpoint_end: ContextVar[Optional[list]] = ContextVar("endpoint_end", default=None)
+
+
+class TracedRoute(APIRoute):
+    """APIRoute that adds route.handler, endpoint and response.serialize spans."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _trace_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route_path = self.path
+
+        async def traced_handler(request):
+            with start_span("route.handler", route=route_path) as span:
+                if span is None:
+                    return await handler(request)
+                holder = []
+                token = _endpoint_end.set(holder)
+                try:
+                    response = await handler(request)
+                finally:
+                    _endpoint_end.reset(token)
+                if holder:
+                    serialize = Span(span.trace, "response.serialize", span.span_id, {})
+                    serialize.start_ns = holder[0]
+                    serialize.end()
+                return response
+
+        return traced_handler
+
+
+def _trace_endpoint(endpoint):
+    # functools.wraps sets __wrapped__, so FastAPI still reads the original signature
+    @contextmanager
+    def endpoint_span():
+        with start_span("endpoint", function=endpoint.__name__) as span:
+            yield
+        holder = _endpoint_end.get()
+        if span is not None and holder is not None:
+            holder.append(span.end_ns)
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            with endpoint_span():
+                return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            with endpoint_span():
+                return endpoint(*args, **kwargs)
+    return wrapper
+
+
+# SQL statement spans
+
+def install_db_tracing(engine) -> None:
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _begin(conn, cursor, statement, parameters, context, executemany):
+        span = begin_span("db.query", statement=statement[:200])
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        span = spans.pop() if spans else None
+        if span is not None:
+            span.end()
+
+
+# Logging
+
+def install_log_trace_ids() -> None:
+    """Give every log record a trace_id attribute, usable as %(trace_id)s in log formats."""
+    factory = logging.getLogRecordFactory()
+    if getattr(factory, "adds_trace_id", False):
+        return
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        record.trace_id = current_trace_id() or "-"
+        return record
+
+    record_factory.adds_trace_id = True
+    logging.setLogRecordFactory(record_factory)
+
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    """Add trace ids to log records and log to stderr with LOG_FORMAT.
+
+    A root handler set up elsewhere (e.g. uvicorn --log-config) is left as it
+    is; its format can use %(trace_id)s too.
+    """
+    install_log_trace_ids()
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+# Export
+
+class _Exporter:
+    """Background thread that writes finished traces to a file or an OTLP/HTTP collector."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=10000)
+        self._thread = None
+
+    def submit(self, trace: Trace) -> None:
+        if self.kind == "none":
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            pass  # drop rather than slow down requests
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 100:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if self.kind == "file":
+                    self._write_file(batch)
+                elif self.kind == "otlp":
+                    self._post_otlp(batch)
+            except Exception as e:
+                print(f"Trace export failed: {e}")
+
+    def _write_file(self, traces: List[Trace]) -> None:
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            for trace in traces:
+                for span in trace.spans:
+                    f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def _post_otlp(self, traces: List[Trace]) -> None:
+        spans = [_otlp_span(span) for trace in traces for span in trace.spans]
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+            }]
+        }
+        request = urllib.request.Request(
+            TRACE_OTLP_ENDPOINT,
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        urllib.request.urlopen(request, timeout=5).close()
+
+
+def _otlp_attribute(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span: Span) -> Dict:
+    data = {
+        "traceId": span.trace.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+exporter = _Exporter(TRACE_EXPORTER)
@@ -1,6 +1,63 @@
 import asyncio
+import time
 from playwright.async_api import async_playwright
 from typing import Dict
+from metrics import SCRAPER_PAGE_DURATION
+from sections import sections_text, structure_sections
+
+# Runs in the page. Returns {text, blocks}: text is the innerText of the main
+# content area (the flat fallback), blocks one {heading, text} per top-level
+# section (the abstract, each body section with an <h2>, the reference list).
+EXTRACT_SCRIPT = """
+() => {
+    // Try multiple selectors for PubMed content
+    const selectors = [
+        '#main-content',
+        '.article-body',
+        '.tsec',
+        '.abstract',
+        'article',
+        '.jig-ncbiinpagenav',
+        '.body'
+    ];
+    let root = null;
+    for (const selector of selectors) {
+        root = document.querySelector(selector);
+        if (root) break;
+    }
+    root = root || document.body;
+    // A matched container can be empty (e.g. a placeholder); fall back to the whole page
+    const rootText = root ? root.innerText : '';
+    const text = rootText.trim() ? rootText : (document.body ? document.body.innerText : '');
+
+    const SKIP = 'figure, .fig, .table-wrap, .tw, table, nav, button, script, style, .caption, .fig-caption, .d-panel';
+    const BLOCKS = 'p, li, h3, h4, h5, pre, blockquote, .ref-cit-blk, .citation';
+    const candidates = root
+        ? Array.from(root.querySelectorAll('section, .tsec, .sec, .abstract, .ref-list'))
+            .filter(el => el.querySelector(':scope > h2, :scope > .head > h2, :scope > h2.head'))
+        : [];
+    // Top-level sections only; subsections stay part of their parent
+    const top = candidates.filter(el => !candidates.some(other => other !== el && other.contains(el)));
+
+    const blocks = top.map(el => {
+        const heading = el.querySelector(':scope > h2, :scope > .head > h2, :scope > h2.head');
+        const clone = el.cloneNode(true);
+        clone.querySelectorAll(SKIP).forEach(n => n.remove());
+        const headingClone = clone.querySelector(':scope > h2, :scope > .head > h2, :scope > h2.head');
+        if (headingClone) headingClone.remove();
+        // Outermost text blocks only, so a <p> inside an <li> is not read twice
+        const parts = Array.from(clone.querySelectorAll(BLOCKS))
+            .filter(n => !n.parentElement.closest(BLOCKS))
+            .map(n => n.textContent.replace(/\\s+/g, ' ').trim())
+            .filter(Boolean);
+        return {
+            heading: heading ? heading.textContent.trim() : '',
+            text: parts.length ? parts.join('\\n\\n') : clone.textContent.replace(/\\s+/g, ' ').trim()
+        };
+    });
+    return {text, blocks};
+}
+"""
 
 class WebScraper:
     def __init__(self):
@@ -22,6 +79,8 @@ class WebScraper:
     async def scrape_page(self, url: str) -> Dict:
         """Scrape a single page"""
         page = await self.browser.new_page()
+        start = time.perf_counter()
+        outcome = "error"
 
         try:
             await page.goto(url, wait_until='domcontentloaded', timeout=30000)
@@ -29,43 +88,19 @@ class WebScraper:
             # Extract content - more specific for PubMed articles
             title = await page.title()
 
-            # Try to get the main content area for PubMed articles
-            content = await page.evaluate("""
-                () => {
-                    // Try multiple selectors for PubMed content
-                    const selectors = [
-                        '#main-content',
-                        '.article-body',
-                        '.tsec',
-                        '.abstract',
-                        'article',
-                        '.jig-ncbiinpagenav',
-                        '.body'
-                    ];
-                    
-                    let content = '';
-                    for (const selector of selectors) {
-                        const element = document.querySelector(selector);
-                        if (element) {
-                            content = element.innerText;
-                            break;
-                        }
-                    }
-                    
-                    // Fallback to body if no specific content found
-                    if (!content) {
-                        const body = document.querySelector('body');
-                        content = body ? body.innerText : '';
-                    }
-                    
-                    return content;
-                }
-            """)
+            # Try to get the main content area for PubMed articles, and its
+            # sections without figures, tables and page chrome
+            extracted = await page.evaluate(EXTRACT_SCRIPT)
+            sections = structure_sections(extracted['blocks'])
+            body = sections_text(sections)
 
+            outcome = "ok"
             return {
                 'url': url,
                 'title': title,
-                'text': content.strip(),
+                # Flat page text only when the page has no recognizable sections
+                'text': body or extracted['text'].strip(),
+                'sections': sections,
                 'success': True
             }
 
@@ -76,4 +111,5 @@ class WebScraper:
                 'success': False
             }
         finally:
-            await page.close()
\ No newline at end of file
+            await page.close()
+            SCRAPER_PAGE_DURATION.observe(time.perf_counter() - start, outcome=outcome)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Job worker: claims queued jobs from the jobs table and runs them (see jobs.py).
+
+Each process runs up to --concurrency jobs at once and shares one
+LocalOpenAIProcessor between them, so the LLM admission limits apply across
+its jobs. Start more processes, on this or other machines, to add capacity.
+SIGINT/SIGTERM stop the worker; jobs still running go back to the queue.
+
+    python worker.py --concurrency 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+
+from config import JOB_CONCURRENCY, JOB_POLL_INTERVAL, JOB_STALE_SECONDS
+from database import SessionLocal
+from jobs import claim_job, requeue_stale_jobs, run_job
+from moduleAI import LocalOpenAIProcessor
+from tracing import configure_logging
+
+logger = logging.getLogger("worker")
+
+
+def claim(worker_id: str):
+    with SessionLocal() as db:
+        job = claim_job(db, worker_id)
+        if job is not None:
+            db.expunge(job)
+        return job
+
+
+def requeue_stale() -> None:
+    with SessionLocal() as db:
+        requeue_stale_jobs(db)
+
+
+async def job_loop(worker_id: str, processor, stop: asyncio.Event, poll_interval: float) -> None:
+    while not stop.is_set():
+        job = await asyncio.to_thread(claim, worker_id)
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        logger.info("[%s] Running job %s (%s, attempt %d/%d)", worker_id, job.id, job.kind, job.attempts, job.max_attempts)
+        await run_job(job, processor)
+
+
+async def stale_job_loop(stop: asyncio.Event) -> None:
+    interval = max(1.0, JOB_STALE_SECONDS / 4)
+    while not stop.is_set():
+        await asyncio.to_thread(requeue_stale)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_worker(concurrency: int, poll_interval: float) -> None:
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    processor = LocalOpenAIProcessor()
+    processor.pool.start_health_checks()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Worker %s started with %d job slots", worker_id, concurrency)
+    loops = [asyncio.ensure_future(job_loop(f"{worker_id}/{i}", processor, stop, poll_interval)) for i in range(concurrency)]
+    loops.append(asyncio.ensure_future(stale_job_loop(stop)))
+    await stop.wait()
+    logger.info("Worker %s stopping", worker_id)
+    for task in loops:
+        task.cancel()
+    await asyncio.gather(*loops, return_exceptions=True)
+    processor.pool.stop_health_checks()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background jobs from the jobs table")
+    parser.add_argument("--concurrency", type=int, default=JOB_CONCURRENCY, help="Jobs this process runs at once")
+    parser.add_argument("--poll-interval", type=float, default=JOB_POLL_INTERVAL, help="Seconds between polls when idle")
+    args = parser.parse_args()
+    configure_logging()
+    asyncio.run(run_worker(max(1, args.concurrency), args.poll_interval))
+
+
+if __name__ == "__main__":
+    main()
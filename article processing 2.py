@@ -187,120 +187,182 @@ class LocalOpenAIProcessor:
             return False
 
 
+def parse_topic_query(topic: str) -> List[List[str]]:
+    """
+    Parse a topic query into OR-groups of AND-ed lower-cased terms.
+
+    A query without quotes or upper-case AND/OR is a single phrase, so plain
+    topics keep matching as before. Otherwise quoted text is a phrase, other
+    words are separate terms, adjacent terms are AND-ed and AND binds tighter
+    than OR:
+
+        'bone loss'                         -> [['bone loss']]
+        'microgravity AND "bone loss" OR mice' -> [['microgravity', 'bone loss'], ['mice']]
+    """
+    text = topic.strip()
+    if '"' not in text and not re.search(r'\b(?:AND|OR)\b', text):
+        return [[text.lower()]] if text else []
+
+    groups: List[List[str]] = [[]]
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        if word == 'OR':
+            groups.append([])
+            continue
+        if word == 'AND':
+            continue
+        term = (phrase or word).strip().lower()
+        if term:
+            groups[-1].append(term)
+    return [group for group in groups if group]
+
+
 class PubMedArticleManager:
+    PMC_LINK_MARKER = 'ncbi.nlm.nih.gov/pmc/articles'
+
     def __init__(self, csv_path: str):
         self.csv_path = csv_path
+        self._articles: Optional[pd.DataFrame] = None
+        self._articles_mtime: Optional[float] = None
 
-    def find_articles_by_topic(self, topic: str, max_articles: int = 10) -> List[Dict]:
+    def _load_articles(self) -> pd.DataFrame:
         """
-        Find articles related to a specific topic in the CSV file.
+        Load the PubMed Central rows of the CSV once and cache them.
 
-        Args:
-            topic: String to search for in article titles (case-insensitive)
-            max_articles: Maximum number of articles to return (default: 10)
-
-        Returns:
-            List of article dictionaries matching the topic
+        The frame is reloaded only when the file changes on disk. Besides 'Title'
+        and 'Link' it keeps a lower-cased copy of the titles for matching.
+        csv_path may also point at the articles.arrow file of a corpus snapshot
+        (Backend/snapshot.py), which loads without parsing.
         """
-        articles = []
+        mtime = os.path.getmtime(self.csv_path)
+        if self._articles is not None and self._articles_mtime == mtime:
+            return self._articles
 
-        try:
+        if self.csv_path.endswith('.arrow'):
+            df = self._read_snapshot(self.csv_path)
+        else:
             df = pd.read_csv(self.csv_path)
 
-            # Validate required columns
-            if 'Title' not in df.columns or 'Link' not in df.columns:
-                raise ValueError("CSV must contain 'title' and 'Link' columns")
-
-            print(f"Searching for articles about '{topic}'...")
+        # Validate required columns
+        if 'Title' not in df.columns or 'Link' not in df.columns:
+            raise ValueError("CSV must contain 'Title' and 'Link' columns")
 
-            # Filter for PubMed Central articles that match the topic
-            matching_count = 0
-            for _, row in df.iterrows():
-                link = str(row['Link'])
-                title = str(row['Title'])
+        df = df[['Title', 'Link']].astype(str)
+        df = df[df['Link'].str.contains(self.PMC_LINK_MARKER, regex=False)].reset_index(drop=True)
+        df['title_lower'] = df['Title'].str.lower()
 
-                # Check if it's a PubMed article and matches the topic
-                if ('ncbi.nlm.nih.gov/pmc/articles' in link and
-                        self._matches_topic(title, topic)):
+        self._articles = df
+        self._articles_mtime = mtime
+        return df
 
-                    articles.append({
-                        'Title': title,
-                        'Link': link,
-                        'match_score': self._calculate_match_score(title, topic)
-                    })
-                    matching_count += 1
+    @staticmethod
+    def _read_snapshot(path: str) -> pd.DataFrame:
+        """Memory-map a snapshot articles table and expose it with the CSV column names."""
+        import pyarrow as pa
 
-                    # Stop if we've reached the maximum
-                    if matching_count >= max_articles:
-                        break
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.select(['title', 'link']).rename_columns(['Title', 'Link']).to_pandas()
 
-            # Sort by match score (higher score = better match)
-            articles.sort(key=lambda x: x['match_score'], reverse=True)
-
-            # Remove match_score from final result
-            for article in articles:
-                del article['match_score']
+    def find_articles_by_topic(self, topic: str, max_articles: int = 10) -> List[Dict]:
+        """
+        Find articles related to a specific topic in the CSV file.
 
-            print(f"Found {len(articles)} articles about '{topic}'")
-            return articles
+        Args:
+            topic: Topic query matched against article titles (case-insensitive).
+                A plain string is matched as one phrase. Quoted phrases, AND and OR
+                combine several terms, e.g. 'microgravity AND "bone loss" OR osteoporosis'
+                (see parse_topic_query)
+            max_articles: Maximum number of articles to return (default: 10)
 
-        except Exception as e:
-            print(f"Error searching articles: {e}")
-            return []
+        Returns:
+            The best max_articles matches, highest match score first
+        """
+        return self.find_articles_by_topics([topic], max_articles)[topic]
 
-    def _matches_topic(self, title: str, topic: str) -> bool:
-        """Check if title matches the topic (case-insensitive with word boundaries)"""
-        # Create a regex pattern that matches whole words
-        pattern = r'\b' + re.escape(topic.lower()) + r'\b'
-        return re.search(pattern, title.lower()) is not None
+    def find_articles_by_topics(self, topics: List[str], max_articles: int = 10) -> Dict[str, List[Dict]]:
+        """
+        Answer several topic queries with a single scan over the titles.
 
-    def _calculate_match_score(self, title: str, topic: str) -> int:
-        """Calculate how well the title matches the topic"""
-        title_lower = title.lower()
-        topic_lower = topic.lower()
+        All terms of all queries are compiled into one matcher, so batching topics
+        here is much cheaper than calling find_articles_by_topic once per topic.
 
-        score = 0
+        Returns:
+            Dictionary mapping each topic to its best max_articles matches
+        """
+        results: Dict[str, List[Dict]] = {topic: [] for topic in topics}
 
-        # Exact match gets highest score
-        if topic_lower in title_lower:
-            score += 10
+        try:
+            df = self._load_articles()
+
+            queries = {topic: parse_topic_query(topic) for topic in topics}
+            terms = sorted({term for groups in queries.values() for group in groups for term in group})
+            if not terms:
+                return results
+
+            print(f"Searching for articles about {', '.join(repr(t) for t in topics)}...")
+
+            counts, starts = self._term_matches(df['title_lower'], terms)
+            candidates = df.loc[counts.index]
+            present = counts > 0
+            # Per-term score: 10 for containing the term, 5 for the whole-word match,
+            # 2 per occurrence and 3 when the title starts with it
+            term_scores = present.astype(int) * 15 + counts * 2 + starts.astype(int) * 3
+
+            for topic, groups in queries.items():
+                if not groups:
+                    continue
+                matched = pd.Series(False, index=candidates.index)
+                for group in groups:
+                    matched |= present[group].all(axis=1)
+                query_terms = sorted({term for group in groups for term in group})
+                scores = term_scores[query_terms].sum(axis=1)
+
+                matches = candidates.assign(match_score=scores)[matched]
+                # Top-k over all matches; ties keep file order
+                top = matches.nlargest(max_articles, 'match_score', keep='first')
+                results[topic] = top[['Title', 'Link']].to_dict('records')
+
+                print(f"Found {len(results[topic])} articles about '{topic}' ({len(matches)} matches in total)")
+            return results
 
-        # Word boundary matches get good score
-        if re.search(r'\b' + re.escape(topic_lower) + r'\b', title_lower):
-            score += 5
+        except Exception as e:
+            print(f"Error searching articles: {e}")
+            return results
 
-        # Multiple occurrences increase score
-        score += title_lower.count(topic_lower) * 2
+    def _term_matches(self, titles: pd.Series, terms: List[str]):
+        """
+        Count whole-word occurrences of every term in the lower-cased titles.
 
-        # Topic at beginning of title gets bonus
-        if title_lower.startswith(topic_lower):
-            score += 3
+        A single alternation regex over all terms scans the full column once to
+        find candidate titles; per-term counts then only run on the candidates
+        that contain the term, which for selective queries is a small fraction
+        of the corpus.
 
-        return score
+        Returns:
+            (counts, starts): DataFrames indexed by the candidate titles with one
+            column per term, holding occurrence counts and start-of-title flags
+        """
+        alternation = '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+        candidates = titles[titles.str.contains(r'\b(?:' + alternation + r')\b', regex=True)]
+
+        counts = pd.DataFrame(0, index=candidates.index, columns=terms)
+        starts = pd.DataFrame(False, index=candidates.index, columns=terms)
+        for term in terms:
+            # Cheap substring test first, so the regex only runs where the term can occur
+            containing = candidates[candidates.str.contains(term, regex=False)]
+            pattern = r'\b' + re.escape(term) + r'\b'
+            counts.loc[containing.index, term] = containing.str.count(pattern)
+            starts.loc[containing.index, term] = containing.str.match(pattern)
+        return counts, starts
 
     def get_all_articles(self, max_articles: int = None) -> List[Dict]:
         """Get all PubMed articles from CSV (without topic filtering)"""
-        articles = []
-
         try:
-            df = pd.read_csv(self.csv_path)
-
-            # Validate required columns
-            if 'Title' not in df.columns or 'Link' not in df.columns:
-                raise ValueError("CSV must contain 'Title' and 'Link' columns")
-
-            # Filter for PubMed Central articles and limit if specified
-            for _, row in df.iterrows():
-                link = str(row['Link'])
-                if 'ncbi.nlm.nih.gov/pmc/articles' in link:
-                    articles.append({
-                        'Title': row['Title'],
-                        'Link': link
-                    })
+            df = self._load_articles()
 
             # Apply max articles limit
-            if max_articles and len(articles) > max_articles:
-                articles = articles[:max_articles]
+            if max_articles:
+                df = df.head(max_articles)
+            articles = df[['Title', 'Link']].to_dict('records')
 
             print(f"Loaded {len(articles)} PubMed articles from CSV")
             return articles
@@ -380,7 +442,8 @@ async def process_articles_from_csv(csv_path: str, topic: Optional[str] = None,
 
     Args:
         csv_path: Path to the CSV file with articles
-        topic: Optional topic to filter articles by (word or phrase)
+        topic: Optional topic query to filter articles by (word, phrase, or terms
+            combined with quotes and AND/OR, see parse_topic_query)
         max_articles: Maximum number of articles to process (default: 10)
     """
     try:
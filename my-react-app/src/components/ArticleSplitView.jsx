@@ -4,6 +4,12 @@ import { ArrowLeft, ExternalLink } from 'lucide-react';
 import { Button } from './ui/button';
 import { Card } from './ui/card';
 
+// Same wording as the templates in Backend/analysis.py; only used when the server has no text for the article
+const ANALYSIS_PROMPTS = {
+  insights: 'You are an expert in obtaining insights and key words.',
+  risks: 'You are an expert at identifying risks and proposing practical mitigations from a scientific abstract. Respond concisely in Markdown with two sections:\n\n## Risks\n- bullet list\n\n## Mitigations\n- bullet list',
+};
+
 export function ArticleSplitView({ article, onBack }) {
   if (!article) return null;
 
@@ -31,54 +37,57 @@ export function ArticleSplitView({ article, onBack }) {
     }
   }, [article.link, useTextProxy]);
 
+  // Analyses run server-side on the stored abstract or page text (prompt templates live in the backend)
+  const fetchAnalysis = async (kind) => {
+    const res = await fetch(`http://192.168.137.229:8000/articles/${article.id}/${kind}`);
+    if (res.status === 404) {
+      return fetchAnalysisFromTextProxy(kind);
+    }
+    if (!res.ok) {
+      throw new Error(`Analysis request failed (status ${res.status})`);
+    }
+    const json = await res.json();
+    return json?.content || "";
+  };
+
+  // No abstract or stored page on the server: analyze the text proxy of the article link
+  const fetchAnalysisFromTextProxy = async (kind) => {
+    let articleText = "";
+    if (article?.link) {
+      try {
+        const url = new URL(article.link);
+        const proxyUrl = `https://r.jina.ai/http://${url.host}${url.pathname}${url.search}`;
+        articleText = await fetch(proxyUrl).then(r => r.text());
+      } catch {}
+    }
+    if (!articleText) {
+      throw new Error("No abstract or text view available for this article");
+    }
+    // /chat trims the prompt to the model's token budget
+    const chatRes = await fetch(`http://192.168.137.229:8000/chat`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        messages: [
+          { role: 'system', content: ANALYSIS_PROMPTS[kind] },
+          { role: 'user', content: articleText }
+        ]
+      })
+    });
+    if (!chatRes.ok) {
+      throw new Error(`Chat request failed (status ${chatRes.status})`);
+    }
+    const chatJson = await chatRes.json();
+    return chatJson?.content || "";
+  };
+
   const handleGenerateInsights = async () => {
     if (!article?.id) return;
     setInsightsLoading(true);
     setInsightsError(null);
     setInsightsContent("");
     try {
-      // 1) Fetch abstract text by article id; if unavailable, fall back to text proxy
-      const articleAbstract = await (async () => {
-        try {
-          const absRes = await fetch(`http://192.168.137.229:8000/abstracts/${article.id}`);
-          if (absRes.ok) {
-            const absJson = await absRes.json();
-            if (absJson?.abstract) return absJson.abstract;
-          }
-        } catch {}
-        // Fallback to text proxy of the article link
-        if (article?.link) {
-          try {
-            const url = new URL(article.link);
-            const proxyUrl = `https://r.jina.ai/http://${url.host}${url.pathname}${url.search}`;
-            const txt = await fetch(proxyUrl).then(r => r.text());
-            // Trim very large text to keep prompt size reasonable
-            return (txt || "").slice(0, 12000);
-          } catch {}
-        }
-        return "";
-      })();
-
-      if (!articleAbstract) {
-        throw new Error("No abstract or text view available for this article");
-      }
-
-      // 2) Call chat endpoint with specified messages
-      const chatRes = await fetch(`http://192.168.137.229:8000/chat`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          messages: [
-            { role: 'system', content: 'You are a expert in obtaining insights and key words.' },
-            { role: 'user', content: articleAbstract }
-          ]
-        })
-      });
-      if (!chatRes.ok) {
-        throw new Error(`Chat request failed (status ${chatRes.status})`);
-      }
-      const chatJson = await chatRes.json();
-      setInsightsContent(chatJson?.content || "");
+      setInsightsContent(await fetchAnalysis('insights'));
     } catch (err) {
       setInsightsError(err?.message || 'Failed to generate insights');
     } finally {
@@ -92,46 +101,7 @@ export function ArticleSplitView({ article, onBack }) {
     setRisksError(null);
     setRisksContent("");
     try {
-      // 1) Fetch abstract text by article id; if unavailable, fall back to text proxy
-      const articleAbstract = await (async () => {
-        try {
-          const absRes = await fetch(`http://192.168.137.229:8000/abstracts/${article.id}`);
-          if (absRes.ok) {
-            const absJson = await absRes.json();
-            if (absJson?.abstract) return absJson.abstract;
-          }
-        } catch {}
-        if (article?.link) {
-          try {
-            const url = new URL(article.link);
-            const proxyUrl = `https://r.jina.ai/http://${url.host}${url.pathname}${url.search}`;
-            const txt = await fetch(proxyUrl).then(r => r.text());
-            return (txt || "").slice(0, 12000);
-          } catch {}
-        }
-        return "";
-      })();
-
-      if (!articleAbstract) {
-        throw new Error("No abstract or text view available for this article");
-      }
-
-      // 2) Call chat endpoint requesting risks and mitigations in markdown
-      const chatRes = await fetch(`http://192.168.137.229:8000/chat`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          messages: [
-            { role: 'system', content: 'You are an expert at identifying risks and proposing practical mitigations from a scientific abstract. Respond concisely in Markdown with two sections:\n\n## Risks\n- bullet list\n\n## Mitigations\n- bullet list' },
-            { role: 'user', content: articleAbstract }
-          ]
-        })
-      });
-      if (!chatRes.ok) {
-        throw new Error(`Chat request failed (status ${chatRes.status})`);
-      }
-      const chatJson = await chatRes.json();
-      setRisksContent(chatJson?.content || "");
+      setRisksContent(await fetchAnalysis('risks'));
     } catch (err) {
       setRisksError(err?.message || 'Failed to generate risks & mitigations');
     } finally {